@@ -9,7 +9,7 @@ db = SQLAlchemy()
 migrate = Migrate()
 cors = CORS()
 
-def create_app():
+def create_app(test_config=None):
 
     app = Flask(__name__)
 
@@ -26,13 +26,30 @@ def create_app():
         from app.config import Config
         app.config.from_object(Config)
 
+    # Overrides for tests and scripts, applied on top of the config class
+    if test_config:
+        app.config.update(test_config)
+
+    from app.utils.json_provider import init_json_provider
+    init_json_provider(app)
+
+    from app.utils.db_pool import engine_options, init_db_pool
+    app.config.setdefault("SQLALCHEMY_ENGINE_OPTIONS", engine_options(app.config))
+
     # Initialize extensions
     db.init_app(app)
+    init_db_pool(app)
+
+    from app.utils.instrumentation import init_instrumentation
+    init_instrumentation(app)
+
+    from app.utils.lookups import init_lookups
+    init_lookups(app)
     migrate.init_app(app, db)
     cors.init_app(app, resources={r"/api/*": {"origins": "*"}})
 
     # Register blueprints
-    from .routes import main as main_blueprint
-    app.register_blueprint(main_blueprint)
+    from .api import api as api_blueprint
+    app.register_blueprint(api_blueprint)
 
     return app
@@ -4,8 +4,11 @@ from flask import Blueprint
 api = Blueprint("api", __name__, url_prefix="/api")
 
 # Import route modules to register them
-from . import users
 from . import sources
 from . import individuals
 from . import relationships
-from . import research
+from . import export
+from . import search
+from . import bulk
+from . import monitoring
+from . import jobs
@@ -0,0 +1,52 @@
+from flask import abort, current_app, request, jsonify
+from sqlalchemy.exc import IntegrityError
+from app import db
+from app.services.bulk import KINDS, bulk_upsert, parse_ndjson
+from app.services.family_graph import reset_family_graph
+from app.utils.cache import invalidate
+from app.utils.pagination import NDJSON_MIMETYPE
+from . import api
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+
+def read_items():
+    """Return the request's items from a JSON array or an NDJSON body, or None if it is neither."""
+    if request.mimetype == NDJSON_MIMETYPE:
+        return parse_ndjson(request.get_data(as_text=True))
+    items = request.get_json(silent=True)
+    return items if isinstance(items, list) else None
+
+
+# ------------------------------
+# Bulk Routes
+# ------------------------------
+
+@api.route("/bulk/<kind>", methods=["POST"])
+def bulk_create(kind):
+    if kind not in KINDS:
+        abort(404)
+    items = read_items()
+    if items is None:
+        return jsonify({"error": "Body must be a JSON array or NDJSON."}), 400
+    max_items = current_app.config["BULK_MAX_ITEMS"]
+    if len(items) > max_items:
+        return jsonify({"error": f"At most {max_items} items per request."}), 413
+
+    atomic = request.args.get("atomic", "false").lower() == "true"
+    summary = bulk_upsert(kind, items, atomic=atomic)
+    try:
+        db.session.commit()
+    except IntegrityError as exc:
+        db.session.rollback()
+        return jsonify({"error": "Batch conflicts with existing data.", "detail": str(exc.orig)}), 409
+
+    if kind == "relationships" and summary["created"] + summary["updated"]:
+        reset_family_graph()
+    if kind == "individuals" and summary["created"] + summary["updated"]:
+        invalidate("individual", all_rows=bool(summary["updated"]))
+    if atomic and summary["errors"]:
+        return jsonify(summary), 422
+    return jsonify(summary)
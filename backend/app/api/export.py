@@ -0,0 +1,17 @@
+from flask import Response, current_app, stream_with_context
+from app.services.gedcom_export import chunked, export_gedcom
+from . import api
+
+
+# ------------------------------
+# Export Routes
+# ------------------------------
+
+@api.route("/export/gedcom", methods=["GET"])
+def get_gedcom_export():
+    lines = export_gedcom(batch_size=current_app.config["STREAM_BATCH_SIZE"])
+    return Response(
+        stream_with_context(chunked(lines)),
+        mimetype="text/x-gedcom",
+        headers={"Content-Disposition": "attachment; filename=export.ged"}
+    )
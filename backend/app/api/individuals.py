@@ -1,48 +1,36 @@
-from flask import request, jsonify, abort
+from flask import current_app, request, jsonify, abort
 from uuid import UUID
 from app.models import (
-    db, Individual, Fact, Citation, ExternalLink
+    db, Individual, Fact, FactType, Citation, ExternalLink, IndividualProfile
 )
+from app.services.family_graph import STEP_NAMES, describe_path, get_family_graph, reset_family_graph
+from app.services.merge import MergeError, merge_individuals
+from app.services.pedigree import ANCESTORS, DESCENDANTS, pedigree
+from app.services.search import find_by_name
+from app.utils.cache import cached, invalidate
+from app.utils.loading import strict_loading
+from app.utils.lookups import lookup
+from app.utils.pagination import paginated_response, parse_limit
+from app.utils.serialization import UnknownFields, compile_serializer, sparse_fieldset
 from . import api
+from .relationships import serialize_citation
 
 
 # ------------------------------
 # Helpers
 # ------------------------------
 
-def serialize_individual(ind):
-    return {
-        "id": str(ind.id),
-        "given_names": ind.given_names,
-        "surname": ind.surname,
-        "preferred_name": ind.preferred_name,
-        "gender": ind.gender.value if ind.gender else None,
-        "birth_date_estimated": ind.birth_date_estimated.isoformat() if ind.birth_date_estimated else None,
-        "death_date_estimated": ind.death_date_estimated.isoformat() if ind.death_date_estimated else None,
-        "birth_place": ind.birth_place,
-        "death_place": ind.death_place,
-        "notes": ind.notes,
-        "is_living": ind.is_living,
-        "created_at": ind.created_at.isoformat(),
-        "updated_at": ind.updated_at.isoformat() if ind.updated_at else None,
-        "created_by_user_id": str(ind.created_by_user_id)
-    }
+serialize_individual = compile_serializer(Individual, exclude=(
+    "surname_soundex", "surname_metaphone", "surname_metaphone_alt", "given_name_metaphone",
+))
 
-def serialize_fact(fact):
-    return {
-        "id": str(fact.id),
-        "individual_id": str(fact.individual_id),
-        "fact_type": fact.fact_type.value,
-        "fact_value": fact.fact_value,
-        "fact_date": fact.fact_date.isoformat() if fact.fact_date else None,
-        "fact_place": fact.fact_place,
-        "description": fact.description,
-        "confidence_level": fact.confidence_level.value if fact.confidence_level else None,
-        "is_primary": fact.is_primary,
-        "created_at": fact.created_at.isoformat(),
-        "updated_at": fact.updated_at.isoformat() if fact.updated_at else None,
-        "created_by_user_id": str(fact.created_by_user_id)
-    }
+serialize_fact = compile_serializer(
+    Fact, exclude=("fact_type_id",),
+    extra={"fact_type": lambda fact: lookup(FactType).key_of(fact.fact_type_id)},
+    depends={"fact_type": ("fact_type_id",)},
+)
+
+serialize_profile = compile_serializer(IndividualProfile)
 
 def serialize_external_link(link):
     return {
@@ -65,16 +53,113 @@ def serialize_external_link(link):
 
 @api.route("/individuals", methods=["GET"])
 def get_individuals():
-    individuals = Individual.query.all()
-    return jsonify([serialize_individual(i) for i in individuals])
+    try:
+        query, serializer = sparse_fieldset(
+            strict_loading(Individual.query), serialize_individual, request.args.get("fields"))
+    except UnknownFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    return paginated_response(query, Individual, serializer)
+
+
+@api.route("/individuals/search", methods=["GET"])
+def search_individuals():
+    name = (request.args.get("name") or "").strip()
+    if not name:
+        return jsonify({"error": "Missing 'name' parameter."}), 400
+    try:
+        limit = parse_limit(request.args.get("limit")) or current_app.config["PAGINATION_DEFAULT_LIMIT"]
+    except ValueError:
+        return jsonify({"error": "'limit' must be a positive integer."}), 400
+
+    return jsonify([
+        {"score": score, "individual": serialize_individual(ind)}
+        for ind, score in find_by_name(name, limit)
+    ])
 
 
 @api.route("/individuals/<uuid:individual_id>", methods=["GET"])
+@cached("individual", "individual_id")
 def get_individual(individual_id):
     individual = Individual.query.get_or_404(individual_id)
     return jsonify(serialize_individual(individual))
 
 
+@api.route("/individuals/<uuid:individual_id>/profile", methods=["GET"])
+def get_individual_profile(individual_id):
+    profile = db.session.get(IndividualProfile, individual_id)
+    if profile is None:
+        abort(404)
+    return jsonify(serialize_profile(profile))
+
+
+@api.route("/individuals/<uuid:individual_id>/ancestors", methods=["GET"])
+def get_ancestors(individual_id):
+    return pedigree_response(individual_id, ANCESTORS)
+
+
+@api.route("/individuals/<uuid:individual_id>/descendants", methods=["GET"])
+def get_descendants(individual_id):
+    return pedigree_response(individual_id, DESCENDANTS)
+
+
+def pedigree_response(individual_id, direction):
+    root = Individual.query.get_or_404(individual_id)
+    max_generations = current_app.config["PEDIGREE_MAX_GENERATIONS"]
+    try:
+        generations = int(request.args.get("generations", max_generations))
+    except ValueError:
+        return jsonify({"error": "'generations' must be an integer."}), 400
+    if not 1 <= generations <= max_generations:
+        return jsonify({"error": f"'generations' must be between 1 and {max_generations}."}), 400
+
+    individuals, edges, seen = {}, [], set()
+    for ind, linked_id, generation in pedigree(root.id, direction, generations):
+        if ind.id not in individuals:
+            individuals[ind.id] = {**serialize_individual(ind), "generation": generation}
+        edge = (ind.id, linked_id) if direction == ANCESTORS else (linked_id, ind.id)
+        # With pedigree collapse the same edge is reached along several lines
+        if edge not in seen:
+            seen.add(edge)
+            edges.append({"parent_id": str(edge[0]), "child_id": str(edge[1])})
+
+    return jsonify({
+        "root": serialize_individual(root),
+        "direction": direction,
+        "generations": generations,
+        "individuals": list(individuals.values()),
+        "edges": edges
+    })
+
+
+@api.route("/individuals/<uuid:individual_id>/relation-to/<uuid:other_id>", methods=["GET"])
+def get_relation(individual_id, other_id):
+    Individual.query.get_or_404(individual_id)
+    Individual.query.get_or_404(other_id)
+
+    path = get_family_graph().shortest_path(
+        individual_id, other_id, current_app.config["FAMILY_GRAPH_MAX_DEPTH"])
+    if path is None:
+        return jsonify({
+            "individual_id": str(individual_id),
+            "other_id": str(other_id),
+            "related": False
+        })
+
+    relationship, common_ancestor_id = describe_path(path)
+    return jsonify({
+        "individual_id": str(individual_id),
+        "other_id": str(other_id),
+        "related": True,
+        "relationship": relationship,
+        "common_ancestor_id": str(common_ancestor_id) if common_ancestor_id else None,
+        "distance": len(path) - 1,
+        "path": [
+            {"individual_id": str(i), "step": STEP_NAMES.get(kind)}
+            for i, kind in path
+        ]
+    })
+
+
 @api.route("/individuals", methods=["POST"])
 def create_individual():
     data = request.get_json()
@@ -93,6 +178,7 @@ def create_individual():
     )
     db.session.add(ind)
     db.session.commit()
+    invalidate("individual")
     return jsonify(serialize_individual(ind)), 201
 
 
@@ -108,21 +194,45 @@ def update_individual(individual_id):
         if field in data:
             setattr(ind, field, data[field])
     db.session.commit()
+    invalidate("individual", individual_id)
     return jsonify(serialize_individual(ind))
 
 
+@api.route("/individuals/<uuid:keep_id>/merge/<uuid:drop_id>", methods=["POST"])
+def merge_individual(keep_id, drop_id):
+    try:
+        summary = merge_individuals(keep_id, drop_id)
+    except MergeError as exc:
+        return jsonify({"error": str(exc)}), 400
+    if summary is None:
+        abort(404)
+    db.session.commit()
+    reset_family_graph()
+    invalidate("individual", keep_id, drop_id)
+
+    keep = db.session.get(Individual, keep_id)
+    return jsonify({"individual": serialize_individual(keep), "dropped_id": str(drop_id), "moved": summary})
+
+
 @api.route("/individuals/<uuid:individual_id>/facts", methods=["GET"])
 def get_facts(individual_id):
-    facts = Fact.query.filter_by(individual_id=individual_id).all()
-    return jsonify([serialize_fact(f) for f in facts])
+    try:
+        query, serializer = sparse_fieldset(strict_loading(Fact.query), serialize_fact, request.args.get("fields"))
+    except UnknownFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    facts = query.filter_by(individual_id=individual_id).all()
+    return jsonify([serializer(f) for f in facts])
 
 
 @api.route("/individuals/<uuid:individual_id>/facts", methods=["POST"])
 def create_fact(individual_id):
     data = request.get_json()
+    fact_type_id = lookup(FactType).id_of(data.get("fact_type"))
+    if fact_type_id is None:
+        return jsonify({"error": f"Unknown fact type {data.get('fact_type')!r}."}), 400
     fact = Fact(
         individual_id=individual_id,
-        fact_type=data["fact_type"],
+        fact_type_id=fact_type_id,
         fact_value=data.get("fact_value"),
         fact_date=data.get("fact_date"),
         fact_place=data.get("fact_place"),
@@ -137,16 +247,19 @@ def create_fact(individual_id):
 
 
 @api.route("/facts/<uuid:fact_id>/sources", methods=["GET"])
-def get_citations(fact_id):
-    sources = Citation.query.filter_by(fact_id=fact_id).all()
-    return jsonify([serialize_citation(s) for s in sources])
+def get_fact_citations(fact_id):
+    citations = strict_loading(Citation.query).filter_by(
+        cited_object_type="fact",
+        cited_object_id=fact_id).all()
+    return jsonify([serialize_citation(c) for c in citations])
 
 
 @api.route("/facts/<uuid:fact_id>/sources", methods=["POST"])
 def add_fact_citation(fact_id):
     data = request.get_json()
     link = Citation(
-        fact_id=fact_id,
+        cited_object_type="fact",
+        cited_object_id=fact_id,
         source_id=data["source_id"],
         evidence_type=data.get("evidence_type"),
         source_notes=data.get("source_notes"),
@@ -162,7 +275,7 @@ def add_fact_citation(fact_id):
 
 @api.route("/individuals/<uuid:individual_id>/links", methods=["GET"])
 def get_external_links(individual_id):
-    links = ExternalLink.query.filter_by(individual_id=individual_id).all()
+    links = strict_loading(ExternalLink.query).filter_by(individual_id=individual_id).all()
     return jsonify([serialize_external_link(l) for l in links])
 
 
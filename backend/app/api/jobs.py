@@ -0,0 +1,77 @@
+import os
+from uuid import UUID
+from flask import current_app, request, jsonify, abort, send_file, url_for
+from app.models import db, Job
+from app.models.enums import JobStatus
+from app.services.jobs import JobError, enqueue, job_file
+from app.utils.loading import strict_loading
+from app.utils.pagination import paginated_response
+from app.utils.serialization import compile_serializer
+from . import api
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+
+serialize_job = compile_serializer(Job)
+
+FINISHED = (JobStatus.completed, JobStatus.failed)
+
+
+# ------------------------------
+# Job Routes
+# ------------------------------
+
+@api.route("/jobs", methods=["GET"])
+def get_jobs():
+    query = strict_loading(Job.query)
+    if "status" in request.args:
+        try:
+            query = query.filter_by(status=JobStatus(request.args["status"]))
+        except ValueError:
+            return jsonify({"error": f"'status' must be one of: {', '.join(s.value for s in JobStatus)}."}), 400
+    if "kind" in request.args:
+        query = query.filter_by(kind=request.args["kind"])
+    return paginated_response(query, Job, serialize_job)
+
+
+@api.route("/jobs", methods=["POST"])
+def create_job():
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({"error": "Body must be a JSON object."}), 400
+    try:
+        user_id = UUID(str(data["created_by_user_id"]))
+    except (KeyError, ValueError):
+        return jsonify({"error": "'created_by_user_id' must be a UUID."}), 400
+    try:
+        job = enqueue(data.get("kind"), data.get("params"), user_id)
+    except JobError as exc:
+        return jsonify({"error": str(exc)}), 400
+    db.session.commit()
+    response = jsonify(serialize_job(job))
+    response.headers["Location"] = url_for("api.get_job", job_id=job.id)
+    return response, 202
+
+
+@api.route("/jobs/<uuid:job_id>", methods=["GET"])
+def get_job(job_id):
+    job = Job.query.get_or_404(job_id)
+    response = jsonify(serialize_job(job))
+    if job.status not in FINISHED:
+        response.headers["Retry-After"] = str(max(1, round(current_app.config["JOB_POLL_INTERVAL"])))
+    return response
+
+
+@api.route("/jobs/<uuid:job_id>/file", methods=["GET"])
+def get_job_file(job_id):
+    """The file a completed export job wrote."""
+    job = Job.query.get_or_404(job_id)
+    name = (job.result or {}).get("file") if job.status == JobStatus.completed else None
+    if name is None:
+        abort(404)
+    path = job_file(name)
+    if not os.path.exists(path):
+        abort(404)
+    return send_file(path, mimetype="text/x-gedcom", as_attachment=True, download_name="export.ged")
@@ -0,0 +1,22 @@
+from flask import Response, current_app, jsonify
+from app.utils.instrumentation import render_metrics
+from . import api
+
+
+# ------------------------------
+# Monitoring Routes
+# ------------------------------
+
+@api.route("/_pool", methods=["GET"])
+def get_pool_metrics():
+    """Connection pool counters of the worker serving the request."""
+    metrics = current_app.extensions.get("db_pool")
+    if metrics is None:
+        return jsonify({"error": "Pool metrics are not enabled."}), 404
+    return jsonify(metrics.snapshot())
+
+
+@api.route("/_metrics", methods=["GET"])
+def get_metrics():
+    """Request histograms and pool counters of the worker serving the request, for Prometheus."""
+    return Response(render_metrics(current_app), mimetype="text/plain; version=0.0.4")
@@ -3,6 +3,10 @@ from uuid import UUID
 from app.models import (
     db, Relationship, Citation, RelationshipQualifier
 )
+from app.services.family_graph import loaded_family_graph
+from app.utils.loading import strict_loading
+from app.utils.pagination import paginated_response
+from app.utils.serialization import UnknownFields, compile_serializer, sparse_fieldset
 from . import api
 
 
@@ -10,36 +14,10 @@ from . import api
 # Helpers
 # ------------------------------
 
-def serialize_relationship(rel):
-    return {
-        "id": str(rel.id),
-        "individual1_id": str(rel.individual1_id),
-        "individual2_id": str(rel.individual2_id),
-        "relationship_type": rel.relationship_type.value,
-        "relationship_start_date": rel.relationship_start_date.isoformat() if rel.relationship_start_date else None,
-        "relationship_end_date": rel.relationship_end_date.isoformat() if rel.relationship_end_date else None,
-        "relationship_notes": rel.relationship_notes,
-        "is_biological": rel.is_biological,
-        "is_legal": rel.is_legal,
-        "confidence_level": rel.confidence_level.value if rel.confidence_level else None,
-        "created_at": rel.created_at.isoformat(),
-        "updated_at": rel.updated_at.isoformat() if rel.updated_at else None,
-        "created_by_user_id": str(rel.created_by_user_id)
-    }
+serialize_relationship = compile_serializer(Relationship)
+
+serialize_citation = compile_serializer(Citation)
 
-def serialize_citation(rs):
-    return {
-        "id": str(rs.id),
-        "relationship_id": str(rs.relationship_id),
-        "source_id": str(rs.source_id),
-        "evidence_type": rs.evidence_type.value if rs.evidence_type else None,
-        "source_notes": rs.source_notes,
-        "page_number": rs.page_number,
-        "section_reference": rs.section_reference,
-        "supports_relationship": rs.supports_relationship.value if rs.supports_relationship else None,
-        "created_at": rs.created_at.isoformat(),
-        "created_by_user_id": str(rs.created_by_user_id)
-    }
 
 def serialize_qualifier(q):
     return {
@@ -57,8 +35,12 @@ def serialize_qualifier(q):
 
 @api.route("/relationships", methods=["GET"])
 def get_relationships():
-    relationships = Relationship.query.all()
-    return jsonify([serialize_relationship(r) for r in relationships])
+    try:
+        query, serializer = sparse_fieldset(
+            strict_loading(Relationship.query), serialize_relationship, request.args.get("fields"))
+    except UnknownFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    return paginated_response(query, Relationship, serializer)
 
 
 @api.route("/relationships/<uuid:relationship_id>", methods=["GET"])
@@ -77,13 +59,15 @@ def create_relationship():
         relationship_start_date=data.get("relationship_start_date"),
         relationship_end_date=data.get("relationship_end_date"),
         relationship_notes=data.get("relationship_notes"),
-        is_biological=data.get("is_biological"),
-        is_legal=data.get("is_legal"),
         confidence_level=data.get("confidence_level"),
         created_by_user_id=data["created_by_user_id"]
     )
     db.session.add(rel)
     db.session.commit()
+
+    graph = loaded_family_graph()
+    if graph is not None:
+        graph.add_relationship(rel.individual1_id, rel.individual2_id, rel.relationship_type)
     return jsonify(serialize_relationship(rel)), 201
 
 
@@ -91,15 +75,21 @@ def create_relationship():
 def update_relationship(relationship_id):
     rel = Relationship.query.get_or_404(relationship_id)
     data = request.get_json()
+    previous_type = rel.relationship_type
 
     for field in [
         "relationship_type", "relationship_start_date", "relationship_end_date",
-        "relationship_notes", "is_biological", "is_legal", "confidence_level"
+        "relationship_notes", "confidence_level"
     ]:
         if field in data:
             setattr(rel, field, data[field])
 
     db.session.commit()
+
+    graph = loaded_family_graph()
+    if graph is not None and rel.relationship_type != previous_type:
+        graph.remove_relationship(rel.individual1_id, rel.individual2_id, previous_type)
+        graph.add_relationship(rel.individual1_id, rel.individual2_id, rel.relationship_type)
     return jsonify(serialize_relationship(rel))
 
 
@@ -108,8 +98,8 @@ def update_relationship(relationship_id):
 # ------------------------------
 
 @api.route("/relationships/<uuid:relationship_id>/sources", methods=["GET"])
-def get_citations(relationship_id):
-    citations = Citation.query.filter_by(
+def get_relationship_citations(relationship_id):
+    citations = strict_loading(Citation.query).filter_by(
         cited_object_type="relationship",
         cited_object_id=relationship_id).all()
     return jsonify([serialize_citation(c) for c in citations])
@@ -139,7 +129,7 @@ def add_relationship_citation(relationship_id):
 
 @api.route("/relationships/<uuid:relationship_id>/qualifiers", methods=["GET"])
 def get_relationship_qualifiers(relationship_id):
-    qualifiers = RelationshipQualifier.query.filter_by(relationship_id=relationship_id).all()
+    qualifiers = strict_loading(RelationshipQualifier.query).filter_by(relationship_id=relationship_id).all()
     return jsonify([serialize_qualifier(q) for q in qualifiers])
 
 
@@ -0,0 +1,50 @@
+from flask import current_app, request, jsonify
+from app.services.search import KINDS, search
+from app.utils.pagination import InvalidCursor, parse_limit, set_next_page
+from . import api
+from .individuals import serialize_individual
+from .sources import serialize_source
+
+SERIALIZERS = {"source": serialize_source, "individual": serialize_individual}
+
+
+# ------------------------------
+# Helpers
+# ------------------------------
+
+def serialize_hit(hit):
+    return {
+        "type": hit.kind,
+        "id": str(hit.id),
+        "rank": hit.rank,
+        "snippet": hit.snippet,
+        hit.kind: SERIALIZERS[hit.kind](hit.obj),
+    }
+
+
+# ------------------------------
+# Search Routes
+# ------------------------------
+
+@api.route("/search", methods=["GET"])
+def get_search():
+    text = (request.args.get("q") or "").strip()
+    if not text:
+        return jsonify({"error": "Missing 'q' parameter."}), 400
+
+    kinds = list(dict.fromkeys(request.args.get("type", ",".join(KINDS)).split(",")))
+    if not kinds or any(kind not in KINDS for kind in kinds):
+        return jsonify({"error": f"'type' must be a comma-separated list of: {', '.join(KINDS)}."}), 400
+
+    try:
+        limit = parse_limit(request.args.get("limit")) or current_app.config["PAGINATION_DEFAULT_LIMIT"]
+        hits, has_more = search(text, kinds, limit, request.args.get("after"))
+    except InvalidCursor:
+        return jsonify({"error": "Invalid 'after' cursor."}), 400
+    except ValueError:
+        return jsonify({"error": "'limit' must be a positive integer."}), 400
+
+    response = jsonify([serialize_hit(hit) for hit in hits])
+    if has_more:
+        set_next_page(response, hits[-1].cursor, limit)
+    return response
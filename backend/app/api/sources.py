@@ -1,48 +1,36 @@
 from flask import request, jsonify, abort
 from uuid import UUID
 from app.models import (
-    db, Source, SourceCollection, SourceCollectionItem, SourceReliabilityHistory
+    db, Source, SourceType, SourceCollection, SourceCollectionClosure, SourceCollectionItem, SourceReliabilityHistory, Citation
 )
+from app.services.citations import resolve_cited_objects
+from app.utils.cache import cached, invalidate
+from app.utils.loading import strict_loading
+from app.utils.lookups import lookup
+from app.utils.pagination import paginated_response
+from app.utils.serialization import UnknownFields, compile_serializer, sparse_fieldset
 from . import api
+from .individuals import serialize_fact
+from .relationships import serialize_citation, serialize_relationship
 
 
 # ------------------------------
 # Helpers
 # ------------------------------
 
-def serialize_source(source):
-    return {
-        "id": str(source.id),
-        "title": source.title,
-        "description": source.description,
-        "source_type": source.source_type.value if source.source_type else None,
-        "file_path": source.file_path,
-        "external_url": source.external_url,
-        "source_text": source.source_text,
-        "source_date": source.source_date.isoformat() if source.source_date else None,
-        "location": source.location,
-        "confidence_level": source.confidence_level.value if source.confidence_level else None,
-        "notes": source.notes,
-        "is_active": source.is_active,
-        "created_at": source.created_at.isoformat() if source.created_at else None,
-        "updated_at": source.updated_at.isoformat() if source.updated_at else None,
-        "created_by_user_id": str(source.created_by_user_id),
-    }
+serialize_source = compile_serializer(
+    Source, exclude=("source_type_id",),
+    extra={"source_type": lambda source: lookup(SourceType).key_of(source.source_type_id)},
+    depends={"source_type": ("source_type_id",)},
+)
 
-def serialize_citation(c):
-    return {
-        "id": str(c.id),
-        "cited_object_id": str(c.cited_object_id),
-        "cited_object_type": c.cited_object_type,
-        "source_id": str(c.source_id),
-        "evidence_type": c.evidence_type.value if c.evidence_type else None,
-        "source_notes": c.source_notes,
-        "page_number": c.page_number,
-        "section_reference": c.section_reference,
-        "supports_claim": c.supports_claim.value if c.supports_claim else None,
-        "created_at": c.created_at.isoformat(),
-        "created_by_user_id": str(c.created_by_user_id)
-    }
+def serialize_cited_object(c):
+    obj = c.cited_object
+    if obj is None:
+        return None
+    if c.cited_object_type == "fact":
+        return serialize_fact(obj)
+    return serialize_relationship(obj)
 
 def serialize_history(entry):
     return {
@@ -64,6 +52,16 @@ def serialize_collection(col):
         "created_by_user_id": str(col.created_by_user_id)
     }
 
+def parse_parent_collection_id(value):
+    """Return ``(parent_id, error)`` for a ``parent_collection_id`` value; ``error`` is a message or None."""
+    try:
+        parent_id = UUID(str(value))
+    except ValueError:
+        return None, "'parent_collection_id' must be a UUID."
+    if db.session.get(SourceCollection, parent_id) is None:
+        return None, "Parent collection does not exist."
+    return parent_id, None
+
 def serialize_collection_item(item):
     return {
         "source_id": str(item.source_id),
@@ -77,25 +75,34 @@ def serialize_collection_item(item):
 # ------------------------------
 
 @api.route("/sources", methods=["GET"])
+@cached("source")
 def get_sources():
-    sources = Source.query.filter_by(is_active=True).all()
-    return jsonify([serialize_source(s) for s in sources])
+    try:
+        query, serializer = sparse_fieldset(
+            strict_loading(Source.query), serialize_source, request.args.get("fields"))
+    except UnknownFields as exc:
+        return jsonify({"error": str(exc)}), 400
+    return paginated_response(query.filter_by(is_active=True), Source, serializer)
 
 
 @api.route("/sources/<uuid:source_id>", methods=["GET"])
+@cached("source", "source_id")
 def get_source(source_id):
-    source = Source.query.get_or_404(source_id)
+    source = strict_loading(Source.query).get_or_404(source_id)
     return jsonify(serialize_source(source))
 
 
 @api.route("/sources", methods=["POST"])
 def create_source():
     data = request.get_json()
+    source_type_id = lookup(SourceType).id_of(data.get("source_type"))
+    if source_type_id is None:
+        return jsonify({"error": f"Unknown source type {data.get('source_type')!r}."}), 400
 
     source = Source(
         title=data["title"],
         description=data.get("description"),
-        source_type=data.get("source_type"),
+        source_type_id=source_type_id,
         file_path=data.get("file_path"),
         external_url=data.get("external_url"),
         source_text=data.get("source_text"),
@@ -108,6 +115,7 @@ def create_source():
     )
     db.session.add(source)
     db.session.commit()
+    invalidate("source")
     return jsonify(serialize_source(source)), 201
 
 
@@ -116,6 +124,12 @@ def update_source(source_id):
     source = Source.query.get_or_404(source_id)
     data = request.get_json()
 
+    if "source_type" in data:
+        source_type_id = lookup(SourceType).id_of(data["source_type"])
+        if source_type_id is None:
+            return jsonify({"error": f"Unknown source type {data['source_type']!r}."}), 400
+        source.source_type_id = source_type_id
+
     if "confidence_level" in data:
         source.update_confidence_level(
             data["confidence_level"],
@@ -124,13 +138,14 @@ def update_source(source_id):
         )
 
     for field in [
-        "title", "description", "source_type", "file_path", "external_url",
+        "title", "description", "file_path", "external_url",
         "source_text", "source_date", "location", "notes", "is_active"
     ]:
         if field in data:
             setattr(source, field, data[field])
 
     db.session.commit()
+    invalidate("source", source_id)
     return jsonify(serialize_source(source))
 
 
@@ -139,13 +154,29 @@ def delete_source(source_id):
     source = Source.query.get_or_404(source_id)
     source.is_active = False  # soft delete
     db.session.commit()
+    invalidate("source", source_id)
     return jsonify({"message": f"Source {source_id} marked as inactive."})
 
 
+@api.route("/sources/<uuid:source_id>/citations", methods=["GET"])
+def get_source_citations(source_id):
+    source = Source.query.get_or_404(source_id)
+    query = strict_loading(Citation.query).filter_by(source_id=source.id)
+
+    if request.args.get("expand") == "object":
+        return paginated_response(
+            query, Citation,
+            lambda c: {**serialize_citation(c), "cited_object": serialize_cited_object(c)},
+            prepare=resolve_cited_objects
+        )
+    return paginated_response(query, Citation, serialize_citation)
+
+
 @api.route("/sources/<uuid:source_id>/reliability-history", methods=["GET"])
+@cached("source", "source_id")
 def get_source_reliability_history(source_id):
     source = Source.query.get_or_404(source_id)
-    history = SourceReliabilityHistory.query.filter_by(source_id=source.id).order_by(SourceReliabilityHistory.changed_at.desc()).all()
+    history = strict_loading(SourceReliabilityHistory.query).filter_by(source_id=source.id).order_by(SourceReliabilityHistory.changed_at.desc()).all()
     return jsonify([serialize_history(h) for h in history])
 
 
@@ -155,17 +186,21 @@ def get_source_reliability_history(source_id):
 
 @api.route("/collections", methods=["GET"])
 def get_collections():
-    collections = SourceCollection.query.all()
-    return jsonify([serialize_collection(c) for c in collections])
+    return paginated_response(strict_loading(SourceCollection.query), SourceCollection, serialize_collection)
 
 
 @api.route("/collections", methods=["POST"])
 def create_collection():
     data = request.get_json()
+    parent_id = None
+    if data.get("parent_collection_id") is not None:
+        parent_id, error = parse_parent_collection_id(data["parent_collection_id"])
+        if error:
+            return jsonify({"error": error}), 400
     col = SourceCollection(
         name=data["name"],
         description=data.get("description"),
-        parent_collection_id=data.get("parent_collection_id"),
+        parent_collection_id=parent_id,
         created_by_user_id=data["created_by_user_id"]
     )
     db.session.add(col)
@@ -173,9 +208,67 @@ def create_collection():
     return jsonify(serialize_collection(col)), 201
 
 
+@api.route("/collections/<uuid:collection_id>", methods=["PUT"])
+def update_collection(collection_id):
+    col = SourceCollection.query.get_or_404(collection_id)
+    data = request.get_json()
+    if data.get("parent_collection_id") is not None:
+        parent_id, error = parse_parent_collection_id(data["parent_collection_id"])
+        if error:
+            return jsonify({"error": error}), 400
+        # A collection cannot move under itself or one of its descendants
+        if db.session.get(SourceCollectionClosure, (collection_id, parent_id)) is not None:
+            return jsonify({"error": "A collection cannot be moved into its own subtree."}), 400
+        col.parent_collection_id = parent_id
+    elif "parent_collection_id" in data:
+        col.parent_collection_id = None
+
+    for field in ["name", "description"]:
+        if field in data:
+            setattr(col, field, data[field])
+    db.session.commit()
+    return jsonify(serialize_collection(col))
+
+
+@api.route("/collections/<uuid:collection_id>/tree", methods=["GET"])
+def get_collection_tree(collection_id):
+    rows = (
+        strict_loading(db.session.query(SourceCollection, SourceCollectionClosure.depth))
+        .join(SourceCollectionClosure, SourceCollectionClosure.descendant_id == SourceCollection.id)
+        .filter(SourceCollectionClosure.ancestor_id == collection_id)
+        .order_by(SourceCollectionClosure.depth, SourceCollection.name, SourceCollection.id)
+        .all()
+    )
+    if not rows:
+        abort(404)
+
+    # Rows come parents first, so every parent's node exists before its children
+    nodes = {}
+    for col, depth in rows:
+        nodes[col.id] = {**serialize_collection(col), "depth": depth, "subcollections": []}
+        if depth > 0:
+            nodes[col.parent_collection_id]["subcollections"].append(nodes[col.id])
+    return jsonify(nodes[collection_id])
+
+
+@api.route("/collections/<uuid:collection_id>/sources", methods=["GET"])
+def get_collection_sources(collection_id):
+    SourceCollection.query.get_or_404(collection_id)
+    if request.args.get("recursive", "false").lower() == "true":
+        in_collection = (
+            db.session.query(SourceCollectionItem.source_id)
+            .join(SourceCollectionClosure, SourceCollectionClosure.descendant_id == SourceCollectionItem.collection_id)
+            .filter(SourceCollectionClosure.ancestor_id == collection_id)
+        )
+    else:
+        in_collection = db.session.query(SourceCollectionItem.source_id).filter_by(collection_id=collection_id)
+    query = strict_loading(Source.query).filter(Source.id.in_(in_collection), Source.is_active.is_(True))
+    return paginated_response(query, Source, serialize_source)
+
+
 @api.route("/collections/<uuid:collection_id>/items", methods=["GET"])
 def get_collection_items(collection_id):
-    items = SourceCollectionItem.query.filter_by(collection_id=collection_id).all()
+    items = strict_loading(SourceCollectionItem.query).filter_by(collection_id=collection_id).all()
     return jsonify([serialize_collection_item(i) for i in items])
 
 
@@ -14,10 +14,54 @@ class Config:
                                       f"postgresql://{os.getenv('PRODUCTION_USER', 'postgres')}:{os.getenv('PRODUCTION_PASSWORD', 'secret')}@{os.getenv('PRODUCTION_HOST', 'localhost')}:{os.getenv('PRODUCTION_PORT', '5432')}/{os.getenv('PRODUCTION_DB', 'genealogy_db')}")
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
+
+    # Connection pool settings, turned into SQLALCHEMY_ENGINE_OPTIONS for PostgreSQL (see app.utils.db_pool)
+    DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+    DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '10'))
+    DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '10'))      # seconds to wait for a free connection
+    DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '1800'))    # seconds before a connection is replaced
+    DB_POOL_PRE_PING = os.getenv('DB_POOL_PRE_PING', 'true').lower() == 'true'
+    DB_STATEMENT_TIMEOUT = int(os.getenv('DB_STATEMENT_TIMEOUT', '0'))  # milliseconds, 0 disables
+    DB_PGBOUNCER = os.getenv('DB_PGBOUNCER', 'false').lower() == 'true'
     
     # CORS settings
     CORS_HEADERS = 'Content-Type'
 
+    # Collection endpoint settings
+    PAGINATION_DEFAULT_LIMIT = int(os.getenv('PAGINATION_DEFAULT_LIMIT', '100'))
+    PAGINATION_MAX_LIMIT = int(os.getenv('PAGINATION_MAX_LIMIT', '1000'))
+    STREAM_BATCH_SIZE = int(os.getenv('STREAM_BATCH_SIZE', '1000'))
+    EAGER_LOADING_STRICT = os.getenv('EAGER_LOADING_STRICT', 'false').lower() == 'true'
+    PEDIGREE_MAX_GENERATIONS = int(os.getenv('PEDIGREE_MAX_GENERATIONS', '10'))
+    JSON_PROVIDER = os.getenv('JSON_PROVIDER', 'default')  # default or orjson
+    QUERY_INSTRUMENTATION = os.getenv('QUERY_INSTRUMENTATION', 'false').lower() == 'true'
+    SLOW_QUERY_MS = int(os.getenv('SLOW_QUERY_MS', '500'))  # 0 disables the slow-query log
+    LOOKUP_CACHE_CHECK_INTERVAL = float(os.getenv('LOOKUP_CACHE_CHECK_INTERVAL', '5'))  # seconds
+
+    # Family graph settings
+    FAMILY_GRAPH_MAX_AGE = int(os.getenv('FAMILY_GRAPH_MAX_AGE', '300'))
+    FAMILY_GRAPH_MAX_DEPTH = int(os.getenv('FAMILY_GRAPH_MAX_DEPTH', '40'))
+
+    # Duplicate detection settings
+    DUPLICATE_MIN_SCORE = float(os.getenv('DUPLICATE_MIN_SCORE', '0.75'))
+    DUPLICATE_MAX_BLOCK_SIZE = int(os.getenv('DUPLICATE_MAX_BLOCK_SIZE', '500'))
+
+    # Bulk endpoint settings
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', '5000'))
+
+    # Background job settings (see app.services.jobs)
+    JOB_FILES_DIR = os.getenv('JOB_FILES_DIR')  # GEDCOM files imported and exported by jobs; default: instance/jobs
+    JOB_POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', '2'))  # seconds between polls of an empty queue
+    JOB_HEARTBEAT_INTERVAL = int(os.getenv('JOB_HEARTBEAT_INTERVAL', '15'))  # seconds
+    JOB_STALE_AFTER = int(os.getenv('JOB_STALE_AFTER', '120'))  # seconds without a heartbeat before failing a job
+
+    # Response cache settings
+    RESPONSE_CACHE_REDIS_URL = os.getenv('RESPONSE_CACHE_REDIS_URL')
+    # redis, memory (per worker; only safe with a single process writing) or none; default: redis if a URL is set
+    RESPONSE_CACHE_BACKEND = os.getenv('RESPONSE_CACHE_BACKEND', 'redis' if RESPONSE_CACHE_REDIS_URL else 'none')
+    RESPONSE_CACHE_TTL = int(os.getenv('RESPONSE_CACHE_TTL', '30'))
+    RESPONSE_CACHE_MAX_ENTRIES = int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2048'))
+
     @staticmethod
     def build_db_uri(prefix="POSTGRES"):
         user = os.getenv(f"{prefix}_USER", "postgres")
@@ -36,3 +80,5 @@ class DevelopmentConfig(Config):
 class TestingConfig(Config):
     SQLALCHEMY_DATABASE_URI = Config.build_db_uri("TEST")
     TESTING = True
+    EAGER_LOADING_STRICT = True
+    RESPONSE_CACHE_BACKEND = 'none'
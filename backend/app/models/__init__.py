@@ -8,15 +8,29 @@ This package contains all SQLAlchemy models organized by domain:
 - individual: Individual records and facts
 - relationship: Family relationships
 - audit: Change tracking and history
-- research: Research notes and conflict resolution
+- research: Research notes, conflict resolution and duplicate review
+- imports: Progress checkpoints for bulk imports
+- search: Full-text search columns and indexes
+- profile: Denormalised per-individual summaries for person cards
+- lookup: Version counters for the cached lookup tables
+- jobs: Queue of background jobs run by ``flask worker``
 """
 
+from .. import db
 from .base import BaseModel
 from .user import User
-from .source import Source, SourceType, Citation, SourceReliabilityHistory, SourceCollection, SourceCollectionItem
+from .source import (
+    Source, SourceType, Citation, SourceReliabilityHistory, SourceCollection, SourceCollectionClosure,
+    SourceCollectionItem
+)
 from .individual import Individual, Fact, FactType, ExternalLink
 from .relationship import Relationship, RelationshipQualifier
-from .research import ResearchNote, ConflictingFact
+from .research import ResearchNote, ConflictingFact, ConflictScan, DuplicateCandidate
+from .imports import GedcomImport
+from .profile import IndividualProfile
+from .lookup import LookupVersion
+from .jobs import Job
+from . import search
 
 __all__ = [
     'BaseModel',
@@ -25,6 +39,7 @@ __all__ = [
     'SourceType',
     'SourceReliabilityHistory', 
     'SourceCollection',
+    'SourceCollectionClosure',
     'SourceCollectionItem',
     'Individual',
     'Fact',
@@ -33,5 +48,11 @@ __all__ = [
     'ExternalLink',
     'Relationship',
     'ResearchNote',
-    'ConflictingFact'
+    'ConflictingFact',
+    'ConflictScan',
+    'DuplicateCandidate',
+    'GedcomImport',
+    'IndividualProfile',
+    'LookupVersion',
+    'Job'
 ]
@@ -8,6 +8,7 @@ from sqlalchemy import Column, String, DateTime, Boolean
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.ext.declarative import declared_attr
 from .. import db
+from ..utils.serialization import compile_serializer
 
 
 class BaseModel(db.Model):
@@ -39,16 +40,12 @@ class BaseModel(db.Model):
     
     def to_dict(self, include_relationships=False):
         """Convert model instance to dictionary."""
-        result = {}
-        for column in self.__table__.columns:
-            value = getattr(self, column.name)
-            if isinstance(value, datetime):
-                result[column.name] = value.isoformat()
-            elif isinstance(value, uuid.UUID):
-                result[column.name] = str(value)
-            else:
-                result[column.name] = value
-        
+        serializer = type(self).__dict__.get("_column_serializer")
+        if serializer is None:
+            serializer = compile_serializer(type(self))
+            type(self)._column_serializer = serializer
+        result = serializer(self)
+
         if include_relationships:
             for relationship in self.__mapper__.relationships:
                 if hasattr(self, relationship.key):
@@ -89,6 +89,19 @@ class ResolutionStatus(enum.Enum):
     dismissed = "dismissed"
 
 
+class ImportStatus(enum.Enum):
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
+class JobStatus(enum.Enum):
+    queued = "queued"
+    running = "running"
+    completed = "completed"
+    failed = "failed"
+
+
 __all__ = [
     "ConfidenceLevel",
     "EvidenceType",
@@ -101,4 +114,6 @@ __all__ = [
     "NotePriority",
     "NoteStatus",
     "ResolutionStatus",
+    "ImportStatus",
+    "JobStatus",
 ]
@@ -0,0 +1,31 @@
+import uuid
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Enum
+from .. import db
+from .user import User
+from .enums import ImportStatus
+
+
+# ===== MODELS =====
+
+class GedcomImport(db.Model):
+    __tablename__ = "gedcom_imports"
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    file_name = db.Column(db.String, nullable=False)
+    file_size = db.Column(db.BigInteger, nullable=False)
+
+    # Checkpoint: records of ``phase`` already committed
+    phase = db.Column(db.String(8), nullable=False)
+    records_done = db.Column(db.Integer, nullable=False, default=0)
+    status = db.Column(Enum(ImportStatus), nullable=False, default=ImportStatus.running)
+    error = db.Column(db.Text)
+
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+    updated_at = db.Column(db.DateTime, onupdate=db.func.now())
+    created_by_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), nullable=False)
+
+    created_by_user = db.relationship("User", backref="gedcom_imports")
+
+    def __repr__(self):
+        return f"<GedcomImport {self.file_name} {self.phase}:{self.records_done}>"
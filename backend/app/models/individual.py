@@ -1,7 +1,7 @@
 import enum
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Enum
+from sqlalchemy import DDL, Enum, event, inspect
 from .enums import (
     ConfidenceLevel,
     Gender,
@@ -9,12 +9,19 @@ from .enums import (
 )
 from .. import db
 from .user import User
+from ..utils.phonetic import name_keys
 
 
 # ===== MODELS =====
 
 class Individual(db.Model):
     __tablename__ = "individuals"
+    __table_args__ = (
+        db.Index("ix_individuals_created_at_id", "created_at", "id"),
+        # Trigram similarity (``%``) lookups; needs the pg_trgm extension
+        db.Index("ix_individuals_surname_trgm", "surname",
+                 postgresql_using="gin", postgresql_ops={"surname": "gin_trgm_ops"}),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     given_names = db.Column(db.String(255), nullable=False)
@@ -29,16 +36,44 @@ class Individual(db.Model):
     notes = db.Column(db.Text)
     is_living = db.Column(db.Boolean, default=True)
 
+    # Phonetic keys derived from the name columns, see app.utils.phonetic
+    surname_soundex = db.Column(db.String(4), index=True, default=lambda ctx: _name_key(ctx, "surname_soundex"))
+    surname_metaphone = db.Column(db.String(4), index=True, default=lambda ctx: _name_key(ctx, "surname_metaphone"))
+    surname_metaphone_alt = db.Column(db.String(4), index=True,
+                                      default=lambda ctx: _name_key(ctx, "surname_metaphone_alt"))
+    given_name_metaphone = db.Column(db.String(4), default=lambda ctx: _name_key(ctx, "given_name_metaphone"))
+
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     updated_at = db.Column(db.DateTime, onupdate=db.func.now())
     created_by_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), nullable=False)
 
     created_by_user = db.relationship("User", backref="created_individuals")
 
+    def update_name_keys(self):
+        for key, value in name_keys(self.given_names, self.surname).items():
+            setattr(self, key, value)
+
     def __repr__(self):
         return f"<Individual {self.preferred_name or (self.given_names + ' ' + self.surname)}>"
 
 
+def _name_key(context, key):
+    # Column defaults also run for Core/bulk inserts, which bypass ORM events
+    params = context.get_current_parameters()
+    return name_keys(params.get("given_names"), params.get("surname"))[key]
+
+
+@event.listens_for(Individual, "before_update")
+def _update_name_keys(mapper, connection, target):
+    state = inspect(target)
+    if state.attrs.given_names.history.has_changes() or state.attrs.surname.history.has_changes():
+        target.update_name_keys()
+
+
+event.listen(Individual.__table__, "before_create",
+             DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"))
+
+
 class FactType(db.Model):
     __tablename__ = "fact_types"
 
@@ -57,7 +92,7 @@ class Fact(db.Model):
     __tablename__ = "facts"
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False)
+    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False, index=True)
     fact_type_id = db.Column(db.Integer, db.ForeignKey("fact_types.id"), nullable=False)
     fact_type = db.relationship("FactType", back_populates="facts")
     fact_value = db.Column(db.String)
@@ -82,7 +117,7 @@ class ExternalLink(db.Model):
     __tablename__ = "external_links"
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False)
+    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False, index=True)
     platform = db.Column(Enum(ExternalPlatform), nullable=False)
     external_id = db.Column(db.String, nullable=False)
     external_url = db.Column(db.String)
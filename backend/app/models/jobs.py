@@ -0,0 +1,49 @@
+import uuid
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy import Enum
+from .. import db
+from .user import User
+from .enums import JobStatus
+
+
+# ===== BACKGROUND JOBS =====
+#
+# The ``jobs`` table is the queue of work too slow for a request (imports,
+# exports, duplicate and conflict scans). Requests insert ``queued`` rows;
+# ``flask worker`` processes claim them with ``SELECT ... FOR UPDATE SKIP
+# LOCKED`` (see app.services.jobs), so several workers never take the same
+# job, and record progress, the result or the error on the row.
+
+class Job(db.Model):
+    __tablename__ = "jobs"
+    __table_args__ = (
+        # Claiming scans queued rows oldest first; finished rows stay out of the index
+        db.Index("ix_jobs_queued_created_at", "created_at",
+                 postgresql_where=db.text("status = 'queued'"), sqlite_where=db.text("status = 'queued'")),
+        db.Index("ix_jobs_created_at_id", "created_at", "id"),
+    )
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    kind = db.Column(db.String(64), nullable=False)
+    params = db.Column(db.JSON, nullable=False, default=dict)
+    status = db.Column(Enum(JobStatus), nullable=False, default=JobStatus.queued)
+
+    progress_done = db.Column(db.Integer, nullable=False, default=0)
+    progress_total = db.Column(db.Integer)
+    progress_message = db.Column(db.String(255))
+    result = db.Column(db.JSON)
+    error = db.Column(db.Text)
+
+    # Worker running the job and when it last reported being alive
+    worker = db.Column(db.String(255))
+    heartbeat_at = db.Column(db.DateTime)
+
+    created_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+    started_at = db.Column(db.DateTime)
+    finished_at = db.Column(db.DateTime)
+    created_by_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), nullable=False)
+
+    created_by_user = db.relationship("User", backref="jobs")
+
+    def __repr__(self):
+        return f"<Job {self.kind} {self.status.value}>"
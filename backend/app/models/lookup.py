@@ -0,0 +1,59 @@
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.dialects import postgresql, sqlite
+
+from .. import db
+from .individual import FactType
+from .source import SourceType
+
+
+# ===== LOOKUP VERSIONS =====
+#
+# ``source_types`` and ``fact_types`` are cached in every worker (see
+# app.utils.lookups). Each table has a row here whose version is bumped
+# whenever the table is written, which is how workers learn their copy is
+# stale. ORM writes bump it automatically; Core writes (the seed upsert) call
+# ``bump_lookup_versions`` themselves.
+
+LOOKUP_MODELS = (SourceType, FactType)
+
+
+class LookupVersion(db.Model):
+    __tablename__ = "lookup_versions"
+
+    table_name = db.Column(db.String(64), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, server_default=db.func.now(), onupdate=db.func.now())
+
+    def __repr__(self):
+        return f"<LookupVersion {self.table_name}={self.version}>"
+
+
+def bump_lookup_versions(connection, *models):
+    """Increment the versions of ``models``' tables (all lookup tables by default)."""
+    insert = (postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert)(LookupVersion)
+    connection.execute(
+        insert.on_conflict_do_update(
+            index_elements=["table_name"],
+            set_={"version": LookupVersion.version + 1, "updated_at": db.func.now()},
+        ),
+        [{"table_name": model.__tablename__, "version": 1} for model in models or LOOKUP_MODELS],
+    )
+    # Once the bump is committed, this process's cache rechecks the versions on its next
+    # use instead of after its interval; expiring earlier would let it reload the old rows.
+    if not event.contains(connection, "commit", _expire_lookups):
+        event.listen(connection, "commit", _expire_lookups)
+
+
+def _expire_lookups(connection):
+    if has_app_context() and "lookups" in current_app.extensions:
+        current_app.extensions["lookups"].expire()
+
+
+def _lookup_changed(mapper, connection, target):
+    bump_lookup_versions(connection, type(target))
+
+
+for _model in LOOKUP_MODELS:
+    for _event in ("after_insert", "after_update", "after_delete"):
+        event.listen(_model, _event, _lookup_changed)
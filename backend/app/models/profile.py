@@ -0,0 +1,288 @@
+from sqlalchemy import delete, event, func, inspect, or_, select, union_all
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.orm import Session
+
+from .. import db
+from .enums import RelationshipType
+from .individual import Fact, FactType, Individual
+from .relationship import Relationship
+from .source import Citation
+
+
+# ===== INDIVIDUAL PROFILES =====
+#
+# One denormalised row per individual with everything a person card shows:
+# display fields, primary facts, parents, spouses and fact/citation counts,
+# so the card is served from a single primary-key read.
+#
+# Rows are rebuilt, never patched. ORM writes to individuals, facts,
+# relationships and citations record the individuals they affect in
+# ``session.info`` and the rows of those individuals are rebuilt at the end of
+# the flush, in the same transaction. Core writes that bypass the ORM
+# (bulk upserts, merges, GEDCOM imports) call ``refresh_profiles`` themselves.
+# Individuals without a row (e.g. created before the table existed) get one
+# from ``flask refresh-profiles --missing``; until then their profile is a 404.
+
+# Rows rebuilt per round of queries
+PROFILE_BATCH_SIZE = 500
+
+PARENT_TYPES = (RelationshipType.parent, RelationshipType.child)
+SPOUSE_TYPES = (RelationshipType.spouse, RelationshipType.partner)
+
+
+class IndividualProfile(db.Model):
+    __tablename__ = "individual_profiles"
+
+    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id", ondelete="CASCADE"),
+                              primary_key=True)
+    display_name = db.Column(db.String(511), nullable=False)
+    gender = db.Column(db.String(16))
+    is_living = db.Column(db.Boolean)
+
+    # From the primary birth/death fact, else the individual's estimates
+    birth_date = db.Column(db.Date)
+    birth_place = db.Column(db.String)
+    death_date = db.Column(db.Date)
+    death_place = db.Column(db.String)
+
+    # [{"id", "fact_type", "fact_date", "fact_place", "fact_value"}]
+    primary_facts = db.Column(db.JSON, nullable=False, default=list)
+    # [{"id", "name"}], plus "relationship_type" for spouses
+    parents = db.Column(db.JSON, nullable=False, default=list)
+    spouses = db.Column(db.JSON, nullable=False, default=list)
+
+    fact_count = db.Column(db.Integer, nullable=False, default=0)
+    citation_count = db.Column(db.Integer, nullable=False, default=0)
+    refreshed_at = db.Column(db.DateTime, nullable=False, default=db.func.now())
+
+    def __repr__(self):
+        return f"<IndividualProfile {self.display_name}>"
+
+
+def _display_name(given_names, surname, preferred_name):
+    return preferred_name or f"{given_names} {surname}"
+
+
+def _chunks(values):
+    values = list(values)
+    for start in range(0, len(values), PROFILE_BATCH_SIZE):
+        yield values[start:start + PROFILE_BATCH_SIZE]
+
+
+def stale_profile_ids(connection, individuals=(), renamed=(), cited=()):
+    """
+    Return the ids of individuals whose profiles a write made stale.
+
+    ``individuals`` changed themselves; ``renamed`` also appear on their
+    relatives' profiles, which are included; ``cited`` are the
+    ``(cited_object_type, cited_object_id)`` pairs of changed citations.
+    """
+    ids = set(individuals) | set(renamed)
+    for chunk in _chunks(renamed):
+        ids.update(connection.scalars(union_all(
+            select(Relationship.individual2_id).where(Relationship.individual1_id.in_(chunk)),
+            select(Relationship.individual1_id).where(Relationship.individual2_id.in_(chunk)),
+        )))
+    fact_ids = [object_id for object_type, object_id in cited if object_type == "fact"]
+    relationship_ids = [object_id for object_type, object_id in cited if object_type == "relationship"]
+    for chunk in _chunks(fact_ids):
+        ids.update(connection.scalars(select(Fact.individual_id).where(Fact.id.in_(chunk))))
+    for chunk in _chunks(relationship_ids):
+        for first, second in connection.execute(
+            select(Relationship.individual1_id, Relationship.individual2_id).where(Relationship.id.in_(chunk))
+        ):
+            ids.update((first, second))
+    ids.discard(None)
+    return ids
+
+
+def refresh_profiles(connection, individual_ids):
+    """Rebuild the profiles of ``individual_ids`` with a few set-based queries per batch."""
+    for chunk in _chunks(individual_ids):
+        _refresh(connection, chunk)
+
+
+def _refresh(connection, ids):
+    profiles = {}
+    for row in connection.execute(
+        select(
+            Individual.id, Individual.given_names, Individual.surname, Individual.preferred_name,
+            Individual.gender, Individual.is_living, Individual.birth_date_estimated, Individual.birth_place,
+            Individual.death_date_estimated, Individual.death_place,
+        ).where(Individual.id.in_(ids))
+    ):
+        profiles[row.id] = {
+            "individual_id": row.id,
+            "display_name": _display_name(row.given_names, row.surname, row.preferred_name),
+            "gender": row.gender.value if row.gender else None,
+            "is_living": row.is_living,
+            "birth_date": row.birth_date_estimated,
+            "birth_place": row.birth_place,
+            "death_date": row.death_date_estimated,
+            "death_place": row.death_place,
+            "primary_facts": [],
+            "parents": [],
+            "spouses": [],
+            "fact_count": 0,
+            "citation_count": 0,
+        }
+
+    gone = [individual_id for individual_id in ids if individual_id not in profiles]
+    if gone:
+        connection.execute(delete(IndividualProfile).where(IndividualProfile.individual_id.in_(gone)))
+    if not profiles:
+        return
+    ids = list(profiles)
+
+    for row in connection.execute(
+        select(Fact.id, Fact.individual_id, FactType.key, Fact.fact_date, Fact.fact_place, Fact.fact_value)
+        .join(FactType, FactType.id == Fact.fact_type_id)
+        .where(Fact.individual_id.in_(ids), Fact.is_primary.is_(True))
+        .order_by(Fact.fact_date, Fact.id)
+    ):
+        profile = profiles[row.individual_id]
+        profile["primary_facts"].append({
+            "id": str(row.id),
+            "fact_type": row.key,
+            "fact_date": row.fact_date.isoformat() if row.fact_date else None,
+            "fact_place": row.fact_place,
+            "fact_value": row.fact_value,
+        })
+        if row.key in ("birth", "death"):
+            profile[f"{row.key}_date"] = row.fact_date or profile[f"{row.key}_date"]
+            profile[f"{row.key}_place"] = row.fact_place or profile[f"{row.key}_place"]
+
+    for individual_id, count in connection.execute(
+        select(Fact.individual_id, func.count()).where(Fact.individual_id.in_(ids)).group_by(Fact.individual_id)
+    ):
+        profiles[individual_id]["fact_count"] = count
+
+    # Citations of the individual's facts and of the relationships they are part of
+    cited = union_all(
+        select(Fact.individual_id.label("individual_id"))
+        .join(Citation, (Citation.cited_object_type == "fact") & (Citation.cited_object_id == Fact.id))
+        .where(Fact.individual_id.in_(ids)),
+        select(Relationship.individual1_id)
+        .join(Citation, (Citation.cited_object_type == "relationship") & (Citation.cited_object_id == Relationship.id))
+        .where(Relationship.individual1_id.in_(ids)),
+        select(Relationship.individual2_id)
+        .join(Citation, (Citation.cited_object_type == "relationship") & (Citation.cited_object_id == Relationship.id))
+        .where(Relationship.individual2_id.in_(ids)),
+    ).subquery("cited")
+    for individual_id, count in connection.execute(
+        select(cited.c.individual_id, func.count()).group_by(cited.c.individual_id)
+    ):
+        profiles[individual_id]["citation_count"] = count
+
+    # A "parent" row reads individual1 is the parent of individual2, a "child" row the reverse
+    relatives = []
+    for first, second, relationship_type in connection.execute(
+        select(Relationship.individual1_id, Relationship.individual2_id, Relationship.relationship_type).where(
+            Relationship.relationship_type.in_(PARENT_TYPES + SPOUSE_TYPES),
+            or_(Relationship.individual1_id.in_(ids), Relationship.individual2_id.in_(ids)),
+        )
+    ):
+        if relationship_type in SPOUSE_TYPES:
+            relatives += [(first, "spouses", second, relationship_type), (second, "spouses", first, relationship_type)]
+        else:
+            parent, child = (first, second) if relationship_type == RelationshipType.parent else (second, first)
+            relatives.append((child, "parents", parent, None))
+    relatives = [relative for relative in relatives if relative[0] in profiles]
+
+    names = {}
+    for chunk in _chunks({other for _, _, other, _ in relatives}):
+        for row in connection.execute(
+            select(Individual.id, Individual.given_names, Individual.surname, Individual.preferred_name)
+            .where(Individual.id.in_(chunk))
+        ):
+            names[row.id] = _display_name(row.given_names, row.surname, row.preferred_name)
+    for individual_id, key, other_id, relationship_type in relatives:
+        entry = {"id": str(other_id), "name": names.get(other_id)}
+        if relationship_type is not None:
+            entry["relationship_type"] = relationship_type.value
+        if entry not in profiles[individual_id][key]:
+            profiles[individual_id][key].append(entry)
+    for profile in profiles.values():
+        for key in ("parents", "spouses"):
+            profile[key].sort(key=lambda entry: (entry["name"] or "", entry["id"]))
+
+    insert = (postgresql.insert if connection.dialect.name == "postgresql" else sqlite.insert)(IndividualProfile)
+    replaced = {
+        column.name: insert.excluded[column.name]
+        for column in IndividualProfile.__table__.columns if column.name not in ("individual_id", "refreshed_at")
+    }
+    replaced["refreshed_at"] = func.now()
+    connection.execute(
+        insert.on_conflict_do_update(index_elements=["individual_id"], set_=replaced),
+        list(profiles.values()),
+    )
+
+
+# ----- Change tracking -----
+
+def _stale(target):
+    session = Session.object_session(target)
+    if session is None:
+        return None
+    return session.info.setdefault("stale_profiles", {"individuals": set(), "renamed": set(), "cited": set()})
+
+
+def _values(target, *keys):
+    """Current and, after an update, previous values of ``keys`` on ``target``."""
+    state = inspect(target)
+    values = set()
+    for key in keys:
+        values.add(getattr(target, key))
+        values.update(state.attrs[key].history.deleted or ())
+    values.discard(None)
+    return values
+
+
+@event.listens_for(Individual, "after_insert")
+@event.listens_for(Individual, "after_update")
+@event.listens_for(Individual, "after_delete")
+def _individual_changed(mapper, connection, target):
+    stale = _stale(target)
+    if stale is not None:
+        state = inspect(target)
+        renamed = state.deleted or any(
+            state.attrs[key].history.has_changes() for key in ("given_names", "surname", "preferred_name"))
+        stale["renamed" if renamed else "individuals"].add(target.id)
+
+
+@event.listens_for(Fact, "after_insert")
+@event.listens_for(Fact, "after_update")
+@event.listens_for(Fact, "after_delete")
+def _fact_changed(mapper, connection, target):
+    stale = _stale(target)
+    if stale is not None:
+        stale["individuals"].update(_values(target, "individual_id"))
+
+
+@event.listens_for(Relationship, "after_insert")
+@event.listens_for(Relationship, "after_update")
+@event.listens_for(Relationship, "after_delete")
+def _relationship_changed(mapper, connection, target):
+    stale = _stale(target)
+    if stale is not None:
+        stale["individuals"].update(_values(target, "individual1_id", "individual2_id"))
+
+
+@event.listens_for(Citation, "after_insert")
+@event.listens_for(Citation, "after_update")
+@event.listens_for(Citation, "after_delete")
+def _citation_changed(mapper, connection, target):
+    stale = _stale(target)
+    if stale is not None:
+        stale["cited"].add((target.cited_object_type, target.cited_object_id))
+        history = inspect(target).attrs.cited_object_id.history
+        stale["cited"].update((target.cited_object_type, object_id) for object_id in history.deleted or ())
+
+
+@event.listens_for(db.session, "after_flush_postexec")
+def _refresh_stale_profiles(session, flush_context):
+    stale = session.info.pop("stale_profiles", None)
+    if stale:
+        connection = session.connection()
+        refresh_profiles(connection, stale_profile_ids(connection, **stale))
@@ -15,10 +15,13 @@ from .individual import Individual
 
 class Relationship(db.Model):
     __tablename__ = "relationships"
+    __table_args__ = (
+        db.Index("ix_relationships_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    individual1_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False)
-    individual2_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False)
+    individual1_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False, index=True)
+    individual2_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False, index=True)
     relationship_type = db.Column(Enum(RelationshipType), nullable=False)
     relationship_start_date = db.Column(db.Date)
     relationship_end_date = db.Column(db.Date)
@@ -41,7 +44,7 @@ class RelationshipQualifier(db.Model):
     __tablename__ = "relationship_qualifiers"
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    relationship_id = db.Column(UUID(as_uuid=True), db.ForeignKey("relationships.id"), nullable=False)
+    relationship_id = db.Column(UUID(as_uuid=True), db.ForeignKey("relationships.id"), nullable=False, index=True)
     qualifier = db.Column(Enum(Qualifier), nullable=False)
     created_at = db.Column(db.DateTime, server_default=db.func.now())
     created_by_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), nullable=False)
@@ -13,7 +13,7 @@ class ResearchNote(db.Model):
     __tablename__ = "research_notes"
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
-    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False)
+    individual_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False, index=True)
     title = db.Column(db.String(255), nullable=False)
     content = db.Column(db.Text)
 
@@ -33,10 +33,13 @@ class ResearchNote(db.Model):
 
 class ConflictingFact(db.Model):
     __tablename__ = "conflicting_facts"
+    __table_args__ = (
+        db.UniqueConstraint("fact1_id", "fact2_id", name="uq_conflicting_facts_pair"),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     fact1_id = db.Column(UUID(as_uuid=True), db.ForeignKey("facts.id"), nullable=False)
-    fact2_id = db.Column(UUID(as_uuid=True), db.ForeignKey("facts.id"), nullable=False)
+    fact2_id = db.Column(UUID(as_uuid=True), db.ForeignKey("facts.id"), nullable=False, index=True)
     conflict_description = db.Column(db.Text, nullable=False)
 
     resolution_status = db.Column(Enum(ResolutionStatus), default=ResolutionStatus.unresolved)
@@ -54,3 +57,55 @@ class ConflictingFact(db.Model):
 
     def __repr__(self):
         return f"<ConflictingFact {self.fact1_id} vs {self.fact2_id}>"
+
+
+class ConflictScan(db.Model):
+    """One run of the conflicting-fact detector; the next run rechecks what changed since ``started_at``."""
+    __tablename__ = "conflict_scans"
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    started_at = db.Column(db.DateTime, nullable=False, server_default=db.func.now())
+    finished_at = db.Column(db.DateTime)
+    individuals_scanned = db.Column(db.Integer)
+    conflicts_found = db.Column(db.Integer)
+
+    created_by_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"), nullable=False)
+
+    created_by_user = db.relationship("User", backref="conflict_scans")
+
+    def __repr__(self):
+        return f"<ConflictScan {self.started_at}>"
+
+
+class DuplicateCandidate(db.Model):
+    __tablename__ = "duplicate_candidates"
+    __table_args__ = (
+        # Pairs are stored once, ordered by id
+        db.UniqueConstraint("individual1_id", "individual2_id", name="uq_duplicate_candidates_pair"),
+        db.CheckConstraint("individual1_id < individual2_id", name="ck_duplicate_candidates_order"),
+        db.Index("ix_duplicate_candidates_status_score", "resolution_status", "score"),
+    )
+
+    id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    individual1_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False)
+    individual2_id = db.Column(UUID(as_uuid=True), db.ForeignKey("individuals.id"), nullable=False, index=True)
+
+    # Overall score and its components, each between 0 and 1
+    score = db.Column(db.Float, nullable=False)
+    name_score = db.Column(db.Float, nullable=False)
+    date_score = db.Column(db.Float, nullable=False)
+    place_score = db.Column(db.Float, nullable=False)
+
+    resolution_status = db.Column(Enum(ResolutionStatus), nullable=False, default=ResolutionStatus.unresolved)
+    resolution_notes = db.Column(db.Text)
+    resolved_by_user_id = db.Column(UUID(as_uuid=True), db.ForeignKey("users.id"))
+    resolved_at = db.Column(db.DateTime)
+
+    created_at = db.Column(db.DateTime, server_default=db.func.now())
+
+    individual1 = db.relationship("Individual", foreign_keys=[individual1_id])
+    individual2 = db.relationship("Individual", foreign_keys=[individual2_id])
+    resolved_by_user = db.relationship("User", foreign_keys=[resolved_by_user_id], backref="resolved_duplicates")
+
+    def __repr__(self):
+        return f"<DuplicateCandidate {self.individual1_id} ~ {self.individual2_id} ({self.score:.2f})>"
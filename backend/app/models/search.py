@@ -0,0 +1,73 @@
+from sqlalchemy import DDL, event
+from .source import Source
+from .individual import Individual
+
+
+# ===== FULL-TEXT SEARCH =====
+#
+# On PostgreSQL each searchable table carries a generated ``search_vector``
+# tsvector column with a GIN index (see migration 5b7e0c2d9f14). SQLite, used
+# by the test config, has no tsvector, so an external-content FTS5 table kept
+# in sync by triggers stands in for it. Neither is mapped on the model: both
+# are created alongside the table by ``db.create_all`` and queried through
+# ``app.services.search``.
+
+SEARCH_CONFIG = "english"
+
+# Table -> [(column, weight)], most significant first
+SEARCH_COLUMNS = {
+    Source.__tablename__: [("title", "A"), ("description", "B"), ("source_text", "C"), ("notes", "D")],
+    Individual.__tablename__: [("given_names", "A"), ("surname", "A"), ("preferred_name", "A"), ("notes", "D")],
+}
+
+# Database objects created outside the model metadata, skipped by autogenerate
+SEARCH_OBJECTS = {"search_vector"} | {f"ix_{table}_search_vector" for table in SEARCH_COLUMNS}
+
+
+def fts_table(table):
+    return f"{table}_fts"
+
+
+def tsvector_expression(table):
+    return " || ".join(
+        f"setweight(to_tsvector('{SEARCH_CONFIG}', coalesce({column}, '')), '{weight}')"
+        for column, weight in SEARCH_COLUMNS[table]
+    )
+
+
+def _postgres_ddl(table):
+    return [
+        DDL(f"ALTER TABLE {table} ADD COLUMN search_vector tsvector "
+            f"GENERATED ALWAYS AS ({tsvector_expression(table)}) STORED"),
+        DDL(f"CREATE INDEX ix_{table}_search_vector ON {table} USING gin (search_vector)"),
+    ]
+
+
+def _sqlite_ddl(table):
+    fts = fts_table(table)
+    columns = [column for column, _ in SEARCH_COLUMNS[table]]
+    names = ", ".join(columns)
+    new = ", ".join(f"new.{column}" for column in columns)
+    old = ", ".join(f"old.{column}" for column in columns)
+    return [
+        DDL(f"CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            f"{names}, content='{table}', content_rowid='rowid', tokenize='porter unicode61')"),
+        DDL(f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new}); END"),
+        DDL(f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old}); END"),
+        DDL(f"CREATE TRIGGER {fts}_au AFTER UPDATE ON {table} BEGIN "
+            f"INSERT INTO {fts}({fts}, rowid, {names}) VALUES ('delete', old.rowid, {old}); "
+            f"INSERT INTO {fts}(rowid, {names}) VALUES (new.rowid, {new}); END"),
+    ]
+
+
+for _model in (Source, Individual):
+    _table = _model.__tablename__
+    for _ddl in _postgres_ddl(_table):
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="postgresql"))
+    for _ddl in _sqlite_ddl(_table):
+        event.listen(_model.__table__, "after_create", _ddl.execute_if(dialect="sqlite"))
+    # Triggers go with the table; the FTS5 table has to be dropped explicitly
+    event.listen(_model.__table__, "after_drop",
+                 DDL(f"DROP TABLE IF EXISTS {fts_table(_table)}").execute_if(dialect="sqlite"))
@@ -1,6 +1,7 @@
 import uuid
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy import Enum
+from sqlalchemy import Enum, delete, event, insert, inspect, select
+from sqlalchemy.orm import aliased
 from .enums import (
     ConfidenceLevel,
     ReliabilityStatus,
@@ -27,6 +28,12 @@ class SourceType(db.Model):
 
 class Source(db.Model):
     __tablename__ = "sources"
+    __table_args__ = (
+        # Active-source listing in keyset order; inactive rows stay out of the index. SQLite only
+        # uses a partial index whose predicate matches the query's, which it renders as is_active = 1
+        db.Index("ix_sources_active_created_at_id", "created_at", "id",
+                 postgresql_where=db.text("is_active"), sqlite_where=db.text("is_active = 1")),
+    )
 
     # Columns
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
@@ -85,6 +92,9 @@ class SourceReliabilityHistory(db.Model):
 
 class SourceCollection(db.Model):
     __tablename__ = "source_collections"
+    __table_args__ = (
+        db.Index("ix_source_collections_created_at_id", "created_at", "id"),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     name = db.Column(db.String(255), nullable=False)
@@ -100,6 +110,56 @@ class SourceCollection(db.Model):
         return f"<SourceCollection {self.name}>"
 
 
+class SourceCollectionClosure(db.Model):
+    """Every (ancestor, descendant) pair of the collection tree, including each collection with itself at depth 0."""
+    __tablename__ = "source_collection_closure"
+
+    ancestor_id = db.Column(UUID(as_uuid=True), db.ForeignKey("source_collections.id", ondelete="CASCADE"),
+                            primary_key=True)
+    descendant_id = db.Column(UUID(as_uuid=True), db.ForeignKey("source_collections.id", ondelete="CASCADE"),
+                              primary_key=True, index=True)
+    depth = db.Column(db.Integer, nullable=False)
+
+    def __repr__(self):
+        return f"<SourceCollectionClosure {self.ancestor_id} > {self.descendant_id} ({self.depth})>"
+
+
+def _link_subtree(connection, collection_id, parent_id):
+    """Add closure rows from ``parent_id`` and its ancestors to ``collection_id`` and its descendants."""
+    above, below = aliased(SourceCollectionClosure), aliased(SourceCollectionClosure)
+    connection.execute(insert(SourceCollectionClosure).from_select(
+        ["ancestor_id", "descendant_id", "depth"],
+        select(above.ancestor_id, below.descendant_id, above.depth + below.depth + 1)
+        .join(below, below.ancestor_id == collection_id)
+        .where(above.descendant_id == parent_id),
+    ))
+
+
+@event.listens_for(SourceCollection, "after_insert")
+def _add_closure_rows(mapper, connection, target):
+    connection.execute(insert(SourceCollectionClosure).values(
+        ancestor_id=target.id, descendant_id=target.id, depth=0))
+    if target.parent_collection_id is not None:
+        _link_subtree(connection, target.id, target.parent_collection_id)
+
+
+@event.listens_for(SourceCollection, "after_update")
+def _move_closure_rows(mapper, connection, target):
+    # Renames and other edits leave the tree alone
+    if not inspect(target).attrs.parent_collection_id.history.has_changes():
+        return
+
+    closure = SourceCollectionClosure.__table__.c
+    # Detach the subtree from its old ancestors, then hang it under the new parent
+    subtree = select(closure.descendant_id).where(closure.ancestor_id == target.id)
+    connection.execute(delete(SourceCollectionClosure).where(
+        closure.descendant_id.in_(subtree),
+        closure.ancestor_id.not_in(subtree),
+    ))
+    if target.parent_collection_id is not None:
+        _link_subtree(connection, target.id, target.parent_collection_id)
+
+
 class SourceCollectionItem(db.Model):
     __tablename__ = "source_collection_items"
 
@@ -118,6 +178,10 @@ class SourceCollectionItem(db.Model):
 
 class Citation(db.Model):
     __tablename__ = "citations"
+    __table_args__ = (
+        db.Index("ix_citations_cited_object", "cited_object_type", "cited_object_id"),
+        db.Index("ix_citations_source_id_created_at_id", "source_id", "created_at", "id"),
+    )
 
     id = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     cited_object_id = db.Column(UUID(as_uuid=True), nullable=False)
@@ -137,11 +201,17 @@ class Citation(db.Model):
 
     @property
     def cited_object(self):
+        if "_cited_object" in self.__dict__:
+            return self._cited_object
         if self.cited_object_type == "fact":
             return db.session.get(Fact, self.cited_object_id)
         elif self.cited_object_type == "relationship":
             return db.session.get(Relationship, self.cited_object_id)
         return None
 
+    def set_cited_object(self, obj):
+        """Cache an already-loaded cited object, e.g. from a bulk resolver."""
+        self._cited_object = obj
+
     def __repr__(self):
         return f"<Citation {self.cited_object_type}={self.cited_object_id} source={self.source_id}>"
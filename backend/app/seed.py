@@ -1,7 +1,16 @@
+from app import db
+from app.models.lookup import bump_lookup_versions
 from .seeds.source_types import seed_source_types
 from .seeds.fact_types import seed_fact_types  # if you have this
 
 def seed():
-    seed_source_types()
-    seed_fact_types()
-    # Add more as you modularize
+    """Seed the lookup tables in one transaction and return what changed, by table."""
+    summary = {
+        "source_types": seed_source_types(),
+        "fact_types": seed_fact_types(),
+        # Add more as you modularize
+    }
+    if any(counts["inserted"] or counts["updated"] for counts in summary.values()):
+        bump_lookup_versions(db.session.connection())
+    db.session.commit()
+    return summary
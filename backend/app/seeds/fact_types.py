@@ -1,5 +1,5 @@
 from app.models.individual import FactType
-from app import db
+from app.seeds.lookup import seed_lookup_table
 
 def seed_fact_types():
     types = [
@@ -33,9 +33,6 @@ def seed_fact_types():
         ("other", "Other", "A fact that doesn't fit predefined categories."),
     ]
 
-    for key, label, description in types:
-        existing = FactType.query.filter_by(key=key).first()
-        if not existing:
-            db.session.add(FactType(key=key, label=label, description=description))
-
-    db.session.commit()
+    return seed_lookup_table(FactType, [
+        {"key": key, "label": label, "description": description} for key, label, description in types
+    ])
@@ -0,0 +1,55 @@
+"""
+Idempotent seeding of lookup tables.
+
+``seed_lookup_table`` writes a whole table with one
+``INSERT ... ON CONFLICT (key) DO UPDATE`` (PostgreSQL, with the same syntax
+on SQLite) instead of a SELECT per row. One SELECT of the current rows
+beforehand tells which seeded rows are new, changed or already up to date;
+only new and changed rows are sent, and the conflict clause only rewrites a
+row whose seeded columns actually differ, so re-running the seed with
+nothing to do writes nothing. Columns that are not seeded (e.g.
+``SourceType.is_active``) are never touched.
+"""
+
+from sqlalchemy import or_, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+
+
+def seed_lookup_table(model, rows, key="key"):
+    """
+    Upsert ``rows`` (dicts with the same columns, including ``key``) into ``model``'s table.
+
+    Does not commit. Returns the number of rows ``inserted``, ``updated``
+    and ``unchanged``.
+    """
+    columns = [name for name in rows[0] if name != key] if rows else []
+    table = model.__table__
+    existing = {
+        row[0]: tuple(row[1:])
+        for row in db.session.execute(select(table.c[key], *(table.c[name] for name in columns)))
+    }
+
+    inserted, updated = [], []
+    for row in rows:
+        if row[key] not in existing:
+            inserted.append(row)
+        elif existing[row[key]] != tuple(row[name] for name in columns):
+            updated.append(row)
+
+    if inserted or updated:
+        dialect = db.session.get_bind().dialect.name
+        statement = (postgresql.insert if dialect == "postgresql" else sqlite.insert)(model)
+        statement = statement.on_conflict_do_update(
+            index_elements=[key],
+            set_={name: statement.excluded[name] for name in columns},
+            where=or_(*(table.c[name].is_distinct_from(statement.excluded[name]) for name in columns)),
+        )
+        db.session.execute(statement, inserted + updated)
+
+    return {
+        "inserted": len(inserted),
+        "updated": len(updated),
+        "unchanged": len(rows) - len(inserted) - len(updated),
+    }
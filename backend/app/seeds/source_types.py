@@ -1,5 +1,5 @@
-from app import db
 from app.models import SourceType
+from app.seeds.lookup import seed_lookup_table
 
 def seed_source_types():
     types = [
@@ -37,10 +37,6 @@ def seed_source_types():
         ("other", "Other", "A source that doesn't fit existing categories."),
     ]
 
-    for key, label, description in types:
-        existing = SourceType.query.filter_by(key=key).first()
-        if not existing:
-            db.session.add(SourceType(key=key, label=label, description=description))
-
-    db.session.commit()
-    
\ No newline at end of file
+    return seed_lookup_table(SourceType, [
+        {"key": key, "label": label, "description": description} for key, label, description in types
+    ])
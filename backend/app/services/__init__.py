@@ -0,0 +1,3 @@
+"""
+Business logic that spans several models or needs hand-written SQL.
+"""
@@ -0,0 +1,343 @@
+"""
+Bulk create/upsert of individuals, facts, relationships and citations.
+
+A batch is validated as a whole before anything is written: every item is
+converted field by field, then every foreign key of the batch is checked with
+one ``SELECT ... WHERE id IN`` per referenced table rather than one lookup per
+item. Items that fail are reported by position and skipped; the rest are
+written with batched multi-row ``INSERT`` statements that upsert on the
+primary key (``ON CONFLICT (id) DO UPDATE``), all in the caller's transaction.
+The profiles of the individuals affected before and after the write are then
+rebuilt, since Core statements skip the ORM hooks that normally do it.
+
+An item may carry its own ``id``; an item whose id already exists updates
+the fields it carries (``null`` included) and leaves the others as stored,
+so re-sending a batch is safe and a partial item is a patch. The creator and
+creation time are never overwritten. Items without an id get a new one.
+"""
+
+import json
+import uuid
+from datetime import date
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from app import db
+from app.models import Citation, Fact, FactType, Individual, Relationship, Source, User
+from app.models.profile import refresh_profiles, stale_profile_ids
+from app.utils.lookups import lookup
+from app.models.enums import ConfidenceLevel, EvidenceType, Gender, RelationshipType, SupportsClaim
+
+# Rows per INSERT statement, well under the bind parameter limits of PostgreSQL and SQLite
+ROWS_PER_STATEMENT = 1000
+
+# Columns an upsert never overwrites
+PRESERVED_COLUMNS = ("id", "created_at", "created_by_user_id", "updated_at")
+
+
+class BulkItemError(ValueError):
+    """Raised when one item of a batch is invalid."""
+
+
+# ------------------------------
+# Field conversion
+# ------------------------------
+
+def _text(value):
+    if not isinstance(value, str):
+        raise ValueError("expected a string")
+    return value
+
+
+def _uuid(value):
+    return uuid.UUID(_text(value))
+
+
+def _date(value):
+    return date.fromisoformat(_text(value))
+
+
+def _integer(value):
+    if isinstance(value, bool) or not isinstance(value, int):
+        raise ValueError("expected an integer")
+    return value
+
+
+def _boolean(value):
+    if not isinstance(value, bool):
+        raise ValueError("expected true or false")
+    return value
+
+
+def _choice(*choices):
+    def convert(value):
+        if value not in choices:
+            raise ValueError(f"expected one of: {', '.join(choices)}")
+        return value
+    return convert
+
+
+def _enum(enum_class):
+    def convert(value):
+        try:
+            return enum_class(value)
+        except ValueError:
+            raise ValueError(f"expected one of: {', '.join(member.value for member in enum_class)}") from None
+    return convert
+
+
+class Field:
+    """One accepted item field: its converter, default and the model its value must exist in."""
+
+    __slots__ = ("name", "convert", "required", "default", "references")
+
+    def __init__(self, name, convert=_text, required=False, default=None, references=None):
+        self.name = name
+        self.convert = convert
+        self.required = required
+        self.default = default
+        # A model, or a function of the converted row returning one
+        self.references = references
+
+
+class BulkKind:
+    """How items of one kind are converted, checked and written."""
+
+    def __init__(self, model, fields, check=None, prepare=None):
+        self.model = model
+        self.fields = fields
+        self.check = check
+        self.prepare = prepare
+
+    def convert(self, item):
+        """Return the row for ``item`` and the names of the fields the item carries."""
+        if isinstance(item, BulkItemError):
+            raise item
+        if not isinstance(item, dict):
+            raise BulkItemError("Item must be a JSON object.")
+        try:
+            row = {"id": _uuid(item["id"]) if item.get("id") is not None else uuid.uuid4()}
+        except ValueError:
+            raise BulkItemError("Invalid 'id': expected a UUID.") from None
+        for field in self.fields:
+            value = item.get(field.name)
+            if value is None:
+                if field.required:
+                    raise BulkItemError(f"Missing '{field.name}'.")
+                row[field.name] = field.default
+                continue
+            try:
+                row[field.name] = field.convert(value)
+            except ValueError as exc:
+                raise BulkItemError(f"Invalid '{field.name}': {exc}.") from None
+        if self.check:
+            self.check(row)
+        return row, frozenset(field.name for field in self.fields if field.name in item)
+
+
+def _fact_type_ids(items):
+    """Let fact items name their type by key (``fact_type``) instead of ``fact_type_id``."""
+    fact_types = lookup(FactType)
+    prepared = []
+    for item in items:
+        if isinstance(item, dict) and item.get("fact_type_id") is None and "fact_type" in item:
+            fact_type_id = fact_types.id_of(item["fact_type"]) if isinstance(item["fact_type"], str) else None
+            if fact_type_id is None:
+                item = BulkItemError(f"Unknown fact type {item['fact_type']!r}.")
+            else:
+                item = {**item, "fact_type_id": fact_type_id}
+        prepared.append(item)
+    return prepared
+
+
+def _check_relationship(row):
+    if row["individual1_id"] == row["individual2_id"]:
+        raise BulkItemError("A relationship needs two different individuals.")
+
+
+def _cited_model(row):
+    return Fact if row["cited_object_type"] == "fact" else Relationship
+
+
+def _creator():
+    return Field("created_by_user_id", _uuid, required=True, references=User)
+
+
+KINDS = {
+    "individuals": BulkKind(Individual, [
+        Field("given_names", required=True),
+        Field("surname", required=True),
+        Field("preferred_name"),
+        Field("gender", _enum(Gender), default=Gender.unknown),
+        Field("birth_date_estimated", _date),
+        Field("death_date_estimated", _date),
+        Field("birth_place"),
+        Field("death_place"),
+        Field("notes"),
+        Field("is_living", _boolean, default=True),
+        _creator(),
+    ]),
+    "facts": BulkKind(Fact, [
+        Field("individual_id", _uuid, required=True, references=Individual),
+        Field("fact_type_id", _integer, required=True, references=FactType),
+        Field("fact_value"),
+        Field("fact_date", _date),
+        Field("fact_place"),
+        Field("description"),
+        Field("confidence_level", _enum(ConfidenceLevel)),
+        Field("is_primary", _boolean, default=False),
+        _creator(),
+    ], prepare=_fact_type_ids),
+    "relationships": BulkKind(Relationship, [
+        Field("individual1_id", _uuid, required=True, references=Individual),
+        Field("individual2_id", _uuid, required=True, references=Individual),
+        Field("relationship_type", _enum(RelationshipType), required=True),
+        Field("relationship_start_date", _date),
+        Field("relationship_end_date", _date),
+        Field("relationship_notes"),
+        Field("confidence_level", _enum(ConfidenceLevel)),
+        _creator(),
+    ], check=_check_relationship),
+    "citations": BulkKind(Citation, [
+        Field("cited_object_type", _choice("fact", "relationship"), required=True),
+        Field("cited_object_id", _uuid, required=True, references=_cited_model),
+        Field("source_id", _uuid, required=True, references=Source),
+        Field("evidence_type", _enum(EvidenceType)),
+        Field("source_notes"),
+        Field("page_number", _integer),
+        Field("section_reference"),
+        Field("supports_claim", _enum(SupportsClaim)),
+        _creator(),
+    ]),
+}
+
+
+# ------------------------------
+# Parsing
+# ------------------------------
+
+def parse_ndjson(text):
+    """Return the items of an NDJSON body; a line that is not JSON becomes a ``BulkItemError``."""
+    items = []
+    for number, line in enumerate(text.splitlines(), 1):
+        if not line.strip():
+            continue
+        try:
+            items.append(json.loads(line))
+        except ValueError:
+            items.append(BulkItemError(f"Line {number} is not valid JSON."))
+    return items
+
+
+# ------------------------------
+# Writing
+# ------------------------------
+
+def _existing_ids(model, ids):
+    """Return which of ``ids`` exist in ``model``'s table, one query per chunk."""
+    ids, found = list(ids), set()
+    for start in range(0, len(ids), ROWS_PER_STATEMENT):
+        found.update(db.session.scalars(select(model.id).where(model.id.in_(ids[start:start + ROWS_PER_STATEMENT]))))
+    return found
+
+
+def _upsert(spec, rows, provided):
+    """Insert ``rows``; an existing row only gets the fields its item carried (``provided``, aligned with ``rows``)."""
+    model = spec.model
+    dialect = db.session.get_bind().dialect.name
+    insert = postgresql.insert if dialect == "postgresql" else sqlite.insert
+    # Columns that are not item fields are derived from them (e.g. phonetic name keys) and always refreshed
+    fields = {field.name for field in spec.fields}
+    derived = [column.name for column in model.__table__.columns
+               if column.name not in PRESERVED_COLUMNS and column.name not in fields]
+
+    # One statement per set of carried fields; a uniform batch is a single group
+    groups = {}
+    for row, names in zip(rows, provided):
+        groups.setdefault(names, []).append(row)
+    for names, group in groups.items():
+        statement = insert(model)
+        replaced = {name: statement.excluded[name] for name in (*sorted(names - set(PRESERVED_COLUMNS)), *derived)}
+        if "updated_at" in model.__table__.columns:
+            replaced["updated_at"] = func.now()
+        statement = statement.on_conflict_do_update(index_elements=["id"], set_=replaced)
+        # Executed with a list of rows, which SQLAlchemy sends as multi-row VALUES
+        # batches; column defaults (e.g. phonetic name keys) still run per row
+        for start in range(0, len(group), ROWS_PER_STATEMENT):
+            db.session.execute(statement, group[start:start + ROWS_PER_STATEMENT])
+
+
+def _stale_profiles(kind, rows):
+    """Return the ids of individuals whose profiles depend on ``rows`` of ``kind`` as currently stored."""
+    connection = db.session.connection()
+    ids = [row["id"] for row in rows]
+    if kind == "individuals":
+        return stale_profile_ids(connection, renamed=ids)
+    if kind == "citations":
+        cited = set()
+        for start in range(0, len(ids), ROWS_PER_STATEMENT):
+            cited.update(db.session.execute(
+                select(Citation.cited_object_type, Citation.cited_object_id)
+                .where(Citation.id.in_(ids[start:start + ROWS_PER_STATEMENT]))
+            ).all())
+        return stale_profile_ids(connection, cited=cited)
+    object_type = "fact" if kind == "facts" else "relationship"
+    return stale_profile_ids(connection, cited=[(object_type, row_id) for row_id in ids])
+
+
+def bulk_upsert(kind, items, atomic=False):
+    """
+    Validate ``items`` of ``kind`` (a key of ``KINDS``), upsert the valid ones and return a summary.
+
+    The summary lists per-item ``errors`` (``{"index", "error"}``) and ``ids``,
+    which is aligned with ``items`` and None where an item failed. With
+    ``atomic`` nothing is written when any item fails.
+    """
+    spec = KINDS[kind]
+    if spec.prepare:
+        items = spec.prepare(items)
+
+    rows, provided, errors, seen = {}, {}, {}, set()
+    for index, item in enumerate(items):
+        try:
+            row, provided[index] = spec.convert(item)
+        except BulkItemError as exc:
+            errors[index] = str(exc)
+            continue
+        if row["id"] in seen:
+            errors[index] = f"Duplicate id {row['id']} in batch."
+            continue
+        seen.add(row["id"])
+        rows[index] = row
+
+    # Every foreign key of the batch, one query per referenced table
+    references = {}
+    for index, row in rows.items():
+        for field in spec.fields:
+            if field.references is not None and row[field.name] is not None:
+                model = field.references if isinstance(field.references, type) else field.references(row)
+                references.setdefault(model, {}).setdefault(row[field.name], []).append((index, field.name))
+    for model, wanted in references.items():
+        found = _existing_ids(model, wanted)
+        for value, uses in wanted.items():
+            if value not in found:
+                for index, name in uses:
+                    errors.setdefault(index, f"'{name}' {value} does not exist.")
+    for index in errors:
+        rows.pop(index, None)
+
+    written = [] if atomic and errors else [rows[index] for index in sorted(rows)]
+    updated = len(_existing_ids(spec.model, [row["id"] for row in written])) if written else 0
+    if written:
+        # Rows being replaced may have belonged to other individuals
+        stale = _stale_profiles(kind, written) if updated and kind != "individuals" else set()
+        _upsert(spec, written, [provided[index] for index in sorted(rows)])
+        refresh_profiles(db.session.connection(), stale | _stale_profiles(kind, written))
+
+    return {
+        "created": len(written) - updated,
+        "updated": updated,
+        "ids": [str(rows[index]["id"]) if written and index in rows else None for index in range(len(items))],
+        "errors": [{"index": index, "error": errors[index]} for index in sorted(errors)],
+    }
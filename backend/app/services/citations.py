@@ -0,0 +1,38 @@
+"""
+Bulk resolution of the polymorphic ``Citation.cited_object``.
+"""
+
+from collections import defaultdict
+
+from app.models import Fact, Relationship
+from app.utils.loading import strict_loading
+
+# cited_object_type -> model
+CITED_OBJECT_MODELS = {
+    "fact": Fact,
+    "relationship": Relationship,
+}
+
+
+def resolve_cited_objects(citations):
+    """
+    Populate ``cited_object`` on every citation with one ``IN`` query per object type.
+
+    Citations whose object type is unknown or whose object no longer exists
+    resolve to None. Returns ``citations`` for chaining.
+    """
+    ids_by_type = defaultdict(set)
+    for citation in citations:
+        ids_by_type[citation.cited_object_type].add(citation.cited_object_id)
+
+    resolved = {}
+    for object_type, ids in ids_by_type.items():
+        if object_type not in CITED_OBJECT_MODELS:
+            continue
+        model = CITED_OBJECT_MODELS[object_type]
+        for obj in strict_loading(model.query).filter(model.id.in_(ids)):
+            resolved[(object_type, obj.id)] = obj
+
+    for citation in citations:
+        citation.set_cited_object(resolved.get((citation.cited_object_type, citation.cited_object_id)))
+    return citations
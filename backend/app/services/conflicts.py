@@ -0,0 +1,225 @@
+"""
+Detection of conflicting facts.
+
+Three kinds of conflict are looked for, each with one set-based query:
+
+- two facts of a once-only event type (birth, death, ...) for the same
+  individual with different dates or places. A window over each individual's
+  facts of that type, ordered by date, compares every fact with the one before
+  it, so each group is checked in a single pass;
+- a death, burial or baptism dated before the individual's birth;
+- a parent born on or after their child's birth.
+
+Runs are incremental. Each run is recorded as a ``ConflictScan`` and the next
+one only rechecks individuals whose row, facts or relationships were created
+or updated since the previous scan started. For those individuals new pairs
+are inserted, unresolved conflicts that no longer hold are deleted, and pairs
+already stored (in either order, reviewed or not) are left alone, so running
+the job twice changes nothing the second time.
+"""
+
+from sqlalchemy import and_, delete, func, insert, or_, select, true, union, union_all
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models import ConflictingFact, ConflictScan, Fact, FactType, Individual, Relationship
+from app.models.enums import RelationshipType, ResolutionStatus
+
+# Fact types an individual can only have once
+SINGLE_EVENT_TYPES = ("birth", "death", "baptism", "burial")
+
+# Fact types that cannot be dated before birth
+AFTER_BIRTH_TYPES = ("death", "burial", "baptism")
+
+
+def touched_individuals(since):
+    """Select the ids of individuals whose row, facts or relationships changed at or after ``since``."""
+    def changed(model):
+        return or_(model.created_at >= since, model.updated_at >= since)
+
+    return union(
+        select(Individual.id).where(changed(Individual)),
+        select(Fact.individual_id).where(changed(Fact)),
+        select(Relationship.individual1_id).where(changed(Relationship)),
+        select(Relationship.individual2_id).where(changed(Relationship)),
+    )
+
+
+def _describe(date, place):
+    if date and place:
+        return f"{date.isoformat()} in {place}"
+    return date.isoformat() if date else place
+
+
+# ------------------------------
+# Rules
+# ------------------------------
+
+def _repeated_events(type_ids, in_scope):
+    """Yield ``(fact1_id, fact2_id, description)`` for once-only events recorded with different details."""
+    ids = [type_ids[key] for key in SINGLE_EVENT_TYPES if key in type_ids]
+    if not ids:
+        return
+
+    def previous(column):
+        return func.lag(column, type_=column.type).over(
+            partition_by=(Fact.individual_id, Fact.fact_type_id),
+            order_by=(Fact.fact_date, Fact.fact_place, Fact.id),
+        )
+
+    ordered = select(
+        Fact.id, Fact.fact_type_id, Fact.fact_date, Fact.fact_place,
+        previous(Fact.id).label("previous_id"),
+        previous(Fact.fact_date).label("previous_date"),
+        previous(Fact.fact_place).label("previous_place"),
+    ).where(Fact.fact_type_id.in_(ids), in_scope(Fact.individual_id)).subquery("ordered")
+
+    c = ordered.c
+    different_date = and_(c.fact_date.isnot(None), c.previous_date.isnot(None), c.fact_date != c.previous_date)
+    different_place = and_(
+        c.fact_place.isnot(None), c.previous_place.isnot(None),
+        func.lower(func.trim(c.fact_place)) != func.lower(func.trim(c.previous_place)),
+    )
+    query = select(ordered).where(c.previous_id.isnot(None), or_(different_date, different_place))
+
+    keys = {type_id: key for key, type_id in type_ids.items()}
+    for row in db.session.execute(query):
+        yield row.previous_id, row.id, (
+            f"Conflicting {keys[row.fact_type_id]} records: "
+            f"{_describe(row.previous_date, row.previous_place)} vs {_describe(row.fact_date, row.fact_place)}"
+        )
+
+
+def _events_before_birth(type_ids, in_scope):
+    """Yield ``(birth_id, event_id, description)`` for deaths, burials and baptisms dated before birth."""
+    ids = [type_ids[key] for key in AFTER_BIRTH_TYPES if key in type_ids]
+    if "birth" not in type_ids or not ids:
+        return
+
+    birth, event = aliased(Fact), aliased(Fact)
+    query = (
+        select(birth.id, event.id, birth.fact_date, event.fact_date, event.fact_type_id)
+        .join(event, event.individual_id == birth.individual_id)
+        .where(
+            birth.fact_type_id == type_ids["birth"],
+            event.fact_type_id.in_(ids),
+            event.fact_date < birth.fact_date,
+            in_scope(birth.individual_id),
+        )
+    )
+    keys = {type_id: key for key, type_id in type_ids.items()}
+    for birth_id, event_id, born, dated, type_id in db.session.execute(query):
+        label = keys[type_id].capitalize()
+        yield birth_id, event_id, f"{label} dated {dated.isoformat()}, before birth on {born.isoformat()}"
+
+
+def _parents_born_after_children(type_ids, in_scope):
+    """Yield ``(parent_birth_id, child_birth_id, description)`` for parents not born before their child."""
+    if "birth" not in type_ids:
+        return
+
+    # A "parent" row reads individual1 is the parent of individual2, a "child" row the reverse
+    parent_of = union_all(
+        select(Relationship.individual1_id.label("parent_id"), Relationship.individual2_id.label("child_id"))
+        .where(Relationship.relationship_type == RelationshipType.parent),
+        select(Relationship.individual2_id, Relationship.individual1_id)
+        .where(Relationship.relationship_type == RelationshipType.child),
+    ).subquery("parent_of")
+
+    parent_birth, child_birth = aliased(Fact), aliased(Fact)
+    query = (
+        select(parent_birth.id, child_birth.id, parent_birth.fact_date, child_birth.fact_date)
+        .select_from(parent_of)
+        .join(parent_birth, parent_birth.individual_id == parent_of.c.parent_id)
+        .join(child_birth, child_birth.individual_id == parent_of.c.child_id)
+        .where(
+            parent_birth.fact_type_id == type_ids["birth"],
+            child_birth.fact_type_id == type_ids["birth"],
+            parent_birth.fact_date >= child_birth.fact_date,
+            or_(in_scope(parent_of.c.parent_id), in_scope(parent_of.c.child_id)),
+        )
+    )
+    for parent_id, child_id, parent_born, child_born in db.session.execute(query):
+        yield parent_id, child_id, (
+            f"Parent born {parent_born.isoformat()}, not before their child born {child_born.isoformat()}"
+        )
+
+
+RULES = (_repeated_events, _events_before_birth, _parents_born_after_children)
+
+
+# ------------------------------
+# Job
+# ------------------------------
+
+def find_conflicts(user_id, full=False, batch_size=1000):
+    """
+    Detect conflicts among the facts of individuals changed since the last scan and return a summary.
+
+    ``full`` (or the absence of a finished scan) rechecks every individual.
+    """
+    previous = db.session.scalar(
+        select(func.max(ConflictScan.started_at)).where(ConflictScan.finished_at.isnot(None))
+    )
+    scan = ConflictScan(created_by_user_id=user_id)
+    db.session.add(scan)
+    db.session.flush()
+
+    touched = None if full or previous is None else touched_individuals(previous)
+
+    def in_scope(column):
+        return true() if touched is None else column.in_(touched)
+
+    type_ids = dict(db.session.execute(
+        select(FactType.key, FactType.id).where(FactType.key.in_(SINGLE_EVENT_TYPES + AFTER_BIRTH_TYPES))
+    ).all())
+
+    found = {}
+    for rule in RULES:
+        for first, second, description in rule(type_ids, in_scope):
+            if (second, first) not in found:
+                found.setdefault((first, second), description)
+
+    # Conflicts already stored for the facts being rechecked
+    scoped_facts = select(Fact.id).where(in_scope(Fact.individual_id))
+    stored = db.session.execute(
+        select(ConflictingFact.id, ConflictingFact.fact1_id, ConflictingFact.fact2_id, ConflictingFact.resolution_status)
+        .where(or_(ConflictingFact.fact1_id.in_(scoped_facts), ConflictingFact.fact2_id.in_(scoped_facts)))
+    ).all()
+    stale = []
+    for conflict_id, first, second, status in stored:
+        if (first, second) in found or (second, first) in found:
+            found.pop((first, second), None)
+            found.pop((second, first), None)
+        elif status in (ResolutionStatus.unresolved, None):
+            stale.append(conflict_id)
+
+    for start in range(0, len(stale), batch_size):
+        db.session.execute(delete(ConflictingFact).where(ConflictingFact.id.in_(stale[start:start + batch_size])))
+
+    rows = [
+        {
+            "fact1_id": first,
+            "fact2_id": second,
+            "conflict_description": description,
+            "resolution_status": ResolutionStatus.unresolved,
+            "created_by_user_id": user_id,
+        }
+        for (first, second), description in found.items()
+    ]
+    for start in range(0, len(rows), batch_size):
+        db.session.execute(insert(ConflictingFact), rows[start:start + batch_size])
+
+    scope = select(Individual.id) if touched is None else touched
+    individuals = db.session.scalar(select(func.count()).select_from(scope.subquery()))
+    scan.individuals_scanned = individuals
+    scan.conflicts_found = len(rows)
+    scan.finished_at = func.now()
+    db.session.commit()
+
+    return {
+        "full": touched is None,
+        "individuals": individuals,
+        "conflicts": len(rows),
+        "removed": len(stale),
+    }
@@ -0,0 +1,279 @@
+"""
+Batch detection of duplicate individuals.
+
+Comparing every pair of individuals is quadratic, so individuals are first
+grouped into blocks that share a blocking key (phonetic surname code, birth
+decade and first birth place token) and only pairs inside a block are scored.
+Each individual is blocked under both its primary and alternate Double
+Metaphone surname code so that, e.g., "Schmidt" and "Smith" meet. Blocks larger
+than ``max_block_size`` are skipped and reported rather than compared.
+
+Individuals are read in batches and every attribute is integer-coded once
+into NumPy arrays, so only the arrays, not the rows, are held in memory, and
+each score component is computed for all candidate pairs in a handful of
+vector operations. Pairs scoring at least ``min_score`` replace the unresolved
+``DuplicateCandidate`` rows; pairs a reviewer has already resolved or dismissed
+are left alone and never re-proposed.
+"""
+
+import re
+
+import numpy as np
+from sqlalchemy import delete, insert, select
+
+from app import db
+from app.models import DuplicateCandidate, Individual
+from app.models.enums import Gender, ResolutionStatus
+
+# Weights of the name, date and place components in the overall score
+WEIGHTS = (0.45, 0.35, 0.2)
+
+# Component score when either individual lacks the data being compared
+UNKNOWN = 0.5
+
+# Dates this many years apart score zero
+DATE_TOLERANCE_YEARS = 5.0
+
+GENDER_CODES = {Gender.male: 0, Gender.female: 1}
+
+
+def place_token(place):
+    """First word of the most specific part of a place, e.g. ``springfield`` for "Springfield, IL"."""
+    words = re.findall(r"[a-z]+", (place or "").split(",")[0].lower())
+    return words[0] if words else None
+
+
+def _normalize(value):
+    """Lower-case ``value`` keeping only its words, or None if it has none."""
+    words = re.findall(r"[a-z]+", (value or "").lower())
+    return " ".join(words) if words else None
+
+
+class _Coder:
+    """Integer-codes values so equal values share a code, across any number of chunks; None becomes -1."""
+
+    def __init__(self):
+        self.index = {}
+
+    def __call__(self, values):
+        index = self.index
+        return np.fromiter(
+            (-1 if value is None else index.setdefault(value, len(index)) for value in values),
+            dtype=np.int64, count=len(values),
+        )
+
+
+def _ordinals(dates):
+    return np.array([d.toordinal() if d else np.nan for d in dates], dtype=np.float64)
+
+
+def _years(ordinals):
+    return ordinals / 365.2425
+
+
+class IndividualTable:
+    """Column arrays over every individual, indexed by position in ``ids``."""
+
+    ARRAYS = ("surname", "given", "initial", "given_metaphone", "metaphone", "metaphone_alt",
+              "gender", "birth", "birth_year", "death", "birth_place", "place_token")
+
+    def __init__(self, chunks):
+        """Build the arrays from ``chunks``, an iterable of lists of rows, one chunk at a time."""
+        coders = {name: _Coder() for name in ("surname", "given", "initial", "given_metaphone", "birth_place",
+                                              "place_token")}
+        # Both surname codes share one coding so primary and alternate keys can meet
+        coders["metaphone"] = coders["metaphone_alt"] = _Coder()
+        self.ids = []
+        parts = {name: [] for name in self.ARRAYS}
+        for rows in chunks:
+            (ids, given_names, surnames, metaphones, metaphones_alt, given_metaphones,
+             genders, births, deaths, birth_places) = zip(*rows)
+            first_given = [(_normalize(name) or "").split(" ")[0] or None for name in given_names]
+            self.ids.extend(ids)
+            for name, array in (
+                ("surname", coders["surname"]([_normalize(name) for name in surnames])),
+                ("given", coders["given"](first_given)),
+                ("initial", coders["initial"]([name[0] if name else None for name in first_given])),
+                ("given_metaphone", coders["given_metaphone"](given_metaphones)),
+                ("metaphone", coders["metaphone"](metaphones)),
+                ("metaphone_alt", coders["metaphone_alt"](metaphones_alt)),
+                ("gender", np.array([GENDER_CODES.get(gender, -1) for gender in genders], dtype=np.int64)),
+                ("birth", _ordinals(births)),
+                ("birth_year", np.array([d.year if d else -1 for d in births], dtype=np.int64)),
+                ("death", _ordinals(deaths)),
+                ("birth_place", coders["birth_place"]([_normalize(place) for place in birth_places])),
+                ("place_token", coders["place_token"]([place_token(place) for place in birth_places])),
+            ):
+                parts[name].append(array)
+        for name, arrays in parts.items():
+            dtype = np.float64 if name in ("birth", "death") else np.int64
+            setattr(self, name, np.concatenate(arrays) if arrays else np.empty(0, dtype))
+
+    @classmethod
+    def from_database(cls, batch_size=10000):
+        """Read every individual ``batch_size`` rows at a time, so only one batch of rows is held at once."""
+        query = select(
+            Individual.id, Individual.given_names, Individual.surname,
+            Individual.surname_metaphone, Individual.surname_metaphone_alt, Individual.given_name_metaphone,
+            Individual.gender, Individual.birth_date_estimated, Individual.death_date_estimated,
+            Individual.birth_place,
+        ).order_by(Individual.id).execution_options(yield_per=batch_size)
+        return cls(db.session.execute(query).partitions())
+
+    def __len__(self):
+        return len(self.ids)
+
+
+# ------------------------------
+# Blocking
+# ------------------------------
+
+def candidate_pairs(table, max_block_size):
+    """
+    Return ``(left, right, stats)``: index arrays of every distinct pair sharing a block.
+
+    ``stats`` counts the blocks compared and the oversized blocks skipped.
+    """
+    count = len(table)
+    stats = {"blocks": 0, "skipped_blocks": 0}
+    empty = np.empty(0, np.int64)
+    if count < 2:
+        return empty, empty, stats
+
+    # One key per surname code; no code, no block
+    person = np.tile(np.arange(count), 2)
+    code = np.concatenate([table.metaphone, table.metaphone_alt])
+    valid = code >= 0
+    valid[count:] &= table.metaphone_alt != table.metaphone
+    person, code = person[valid], code[valid]
+
+    # Birth decades are taken twice, the second time offset by five years, so
+    # that births either side of a decade boundary still share a block
+    years = table.birth_year[person]
+    window = np.repeat(np.array([0, 1]), len(person))
+    decade = np.concatenate([np.where(years >= 0, years // 10, -1), np.where(years >= 0, (years + 5) // 10, -1)])
+    person, code = np.tile(person, 2), np.tile(code, 2)
+    token = table.place_token[person]
+
+    order = np.lexsort((token, decade, window, code))
+    person, code, window, decade, token = (a[order] for a in (person, code, window, decade, token))
+    changed = (code[1:] != code[:-1]) | (window[1:] != window[:-1]) | (decade[1:] != decade[:-1]) | (
+        token[1:] != token[:-1])
+    starts = np.flatnonzero(np.r_[True, changed])
+    sizes = np.diff(np.r_[starts, len(person)])
+
+    left, right, pairs_of_size = [], [], {}
+    for start, size in zip(starts[sizes > 1].tolist(), sizes[sizes > 1].tolist()):
+        if size > max_block_size:
+            stats["skipped_blocks"] += 1
+            continue
+        stats["blocks"] += 1
+        if size not in pairs_of_size:
+            pairs_of_size[size] = np.triu_indices(size, 1)
+        i, j = pairs_of_size[size]
+        left.append(person[start + i])
+        right.append(person[start + j])
+    if not left:
+        return empty, empty, stats
+
+    left, right = np.concatenate(left), np.concatenate(right)
+    # The same pair can share several blocks
+    pair = np.unique(np.minimum(left, right) * count + np.maximum(left, right))
+    return pair // count, pair % count, stats
+
+
+# ------------------------------
+# Scoring
+# ------------------------------
+
+def _equal(codes, left, right):
+    """``(known, equal)`` masks for a coded column over the pairs."""
+    a, b = codes[left], codes[right]
+    known = (a >= 0) & (b >= 0)
+    return known, known & (a == b)
+
+
+def _date_score(ordinals, left, right):
+    difference = np.abs(_years(ordinals[left]) - _years(ordinals[right]))
+    with np.errstate(invalid="ignore"):
+        score = np.clip(1.0 - difference / DATE_TOLERANCE_YEARS, 0.0, 1.0)
+    return np.where(np.isnan(difference), UNKNOWN, score)
+
+
+def score_pairs(table, left, right):
+    """Return ``(score, name_score, date_score, place_score)`` arrays for the pairs."""
+    # Pairs share a phonetic surname code, so a different spelling still scores
+    _, same_surname = _equal(table.surname, left, right)
+    surname = np.where(same_surname, 1.0, 0.8)
+
+    known, same_given = _equal(table.given, left, right)
+    _, same_given_sound = _equal(table.given_metaphone, left, right)
+    _, same_initial = _equal(table.initial, left, right)
+    given = np.select([same_given, same_given_sound, same_initial, ~known], [1.0, 0.8, 0.5, UNKNOWN], 0.0)
+    name = (surname + given) / 2
+
+    date = (_date_score(table.birth, left, right) + _date_score(table.death, left, right)) / 2
+
+    known, same_place = _equal(table.birth_place, left, right)
+    _, same_token = _equal(table.place_token, left, right)
+    place = np.select([same_place, same_token, ~known], [1.0, 0.7, UNKNOWN], 0.0)
+
+    score = WEIGHTS[0] * name + WEIGHTS[1] * date + WEIGHTS[2] * place
+    known, same_gender = _equal(table.gender, left, right)
+    score[known & ~same_gender] = 0.0
+    return score, name, date, place
+
+
+# ------------------------------
+# Job
+# ------------------------------
+
+def find_duplicates(min_score, max_block_size, batch_size=1000):
+    """Score every blocked pair, store those scoring at least ``min_score`` and return a summary."""
+    table = IndividualTable.from_database()
+    left, right, stats = candidate_pairs(table, max_block_size)
+    score, name, date, place = score_pairs(table, left, right)
+
+    keep = np.flatnonzero(score >= min_score)
+    keep = keep[np.argsort(-score[keep], kind="stable")]
+
+    reviewed = {
+        (row.individual1_id, row.individual2_id) for row in db.session.execute(
+            select(DuplicateCandidate.individual1_id, DuplicateCandidate.individual2_id)
+            .where(DuplicateCandidate.resolution_status != ResolutionStatus.unresolved)
+        )
+    }
+    db.session.execute(
+        delete(DuplicateCandidate).where(DuplicateCandidate.resolution_status == ResolutionStatus.unresolved)
+    )
+
+    rows, stored = [], 0
+    for k in keep:
+        first, second = sorted((table.ids[left[k]], table.ids[right[k]]))
+        if (first, second) in reviewed:
+            continue
+        rows.append({
+            "individual1_id": first,
+            "individual2_id": second,
+            "score": float(score[k]),
+            "name_score": float(name[k]),
+            "date_score": float(date[k]),
+            "place_score": float(place[k]),
+            "resolution_status": ResolutionStatus.unresolved,
+        })
+        if len(rows) >= batch_size:
+            db.session.execute(insert(DuplicateCandidate), rows)
+            stored += len(rows)
+            rows = []
+    if rows:
+        db.session.execute(insert(DuplicateCandidate), rows)
+        stored += len(rows)
+    db.session.commit()
+
+    return {
+        "individuals": len(table),
+        "blocks": stats["blocks"],
+        "skipped_blocks": stats["skipped_blocks"],
+        "pairs_compared": len(left),
+        "candidates": stored,
+    }
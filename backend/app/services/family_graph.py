@@ -0,0 +1,326 @@
+"""
+In-process family graph used for kinship queries.
+
+Individuals are remapped from UUIDs to dense integers and their parent, child,
+spouse and sibling links are stored in compressed sparse row (CSR) form: one
+``offsets`` array indexed by node and flat ``neighbors``/``kinds`` arrays
+holding each node's edges back to back. The graph is loaded once per worker
+and patched in place as relationships are written; patches live in a small
+overlay that is folded back into the CSR arrays once it grows large.
+
+Patches are only applied in the worker that handled the write, so the graph is
+also reloaded once it is older than ``FAMILY_GRAPH_MAX_AGE`` seconds.
+"""
+
+import threading
+import time
+from array import array
+from collections import Counter, defaultdict
+
+from flask import current_app
+from sqlalchemy import select
+
+from app import db
+from app.models import Relationship
+from app.models.enums import RelationshipType
+
+# Edge kinds, read as "the neighbor is my ..."
+PARENT = 0
+CHILD = 1
+SPOUSE = 2
+SIBLING = 3
+
+INVERSE = {PARENT: CHILD, CHILD: PARENT, SPOUSE: SPOUSE, SIBLING: SIBLING}
+
+STEP_NAMES = {PARENT: "parent", CHILD: "child", SPOUSE: "spouse", SIBLING: "sibling"}
+
+ORDINALS = ["first", "second", "third", "fourth", "fifth", "sixth", "seventh", "eighth", "ninth", "tenth"]
+
+# Overlay edges tolerated, as a fraction of CSR edges, before compacting.
+COMPACT_RATIO = 0.1
+
+
+def relationship_edges(individual1_id, individual2_id, relationship_type):
+    """Return the directed ``(node_id, neighbor_id, kind)`` edges implied by one relationship row."""
+    relationship_type = RelationshipType(relationship_type)
+    if relationship_type == RelationshipType.parent:
+        return [(individual1_id, individual2_id, CHILD), (individual2_id, individual1_id, PARENT)]
+    if relationship_type == RelationshipType.child:
+        return [(individual1_id, individual2_id, PARENT), (individual2_id, individual1_id, CHILD)]
+    if relationship_type in (RelationshipType.spouse, RelationshipType.partner):
+        return [(individual1_id, individual2_id, SPOUSE), (individual2_id, individual1_id, SPOUSE)]
+    if relationship_type == RelationshipType.sibling:
+        return [(individual1_id, individual2_id, SIBLING), (individual2_id, individual1_id, SIBLING)]
+    return []
+
+
+class FamilyGraph:
+    """CSR adjacency over individuals with an overlay for incremental patches."""
+
+    def __init__(self, edges=()):
+        self.ids = []
+        self.index = {}
+        self._lock = threading.RLock()
+        self._build(edges)
+
+    @classmethod
+    def from_database(cls, batch_size=10000):
+        query = select(
+            Relationship.individual1_id,
+            Relationship.individual2_id,
+            Relationship.relationship_type,
+        ).execution_options(yield_per=batch_size)
+        rows = db.session.execute(query)
+        return cls(edge for row in rows for edge in relationship_edges(*row))
+
+    # ------------------------------
+    # Construction
+    # ------------------------------
+
+    def _node(self, individual_id):
+        node = self.index.get(individual_id)
+        if node is None:
+            node = self.index[individual_id] = len(self.ids)
+            self.ids.append(individual_id)
+        return node
+
+    def _build(self, edges):
+        sources, targets, kinds = array("l"), array("l"), array("b")
+        for individual_id, neighbor_id, kind in edges:
+            sources.append(self._node(individual_id))
+            targets.append(self._node(neighbor_id))
+            kinds.append(kind)
+
+        node_count = len(self.ids)
+        offsets = array("l", [0]) * (node_count + 1)
+        for source in sources:
+            offsets[source + 1] += 1
+        for node in range(node_count):
+            offsets[node + 1] += offsets[node]
+
+        cursor = array("l", offsets[:-1])
+        neighbors = array("l", [0]) * len(sources)
+        neighbor_kinds = array("b", [0]) * len(sources)
+        for source, target, kind in zip(sources, targets, kinds):
+            neighbors[cursor[source]] = target
+            neighbor_kinds[cursor[source]] = kind
+            cursor[source] += 1
+
+        self.offsets, self.neighbors, self.kinds = offsets, neighbors, neighbor_kinds
+        self._added = defaultdict(list)
+        self._removed = defaultdict(Counter)
+        self._overlay_size = 0
+        self.loaded_at = time.monotonic()
+
+    def _compact(self):
+        edges = [
+            (self.ids[node], self.ids[neighbor], kind)
+            for node in range(len(self.ids))
+            for neighbor, kind in self.edges(node)
+        ]
+        self.ids, self.index = [], {}
+        self._build(edges)
+
+    # ------------------------------
+    # Patching
+    # ------------------------------
+
+    def add_relationship(self, individual1_id, individual2_id, relationship_type):
+        with self._lock:
+            for individual_id, neighbor_id, kind in relationship_edges(
+                    individual1_id, individual2_id, relationship_type):
+                node, neighbor = self._node(individual_id), self._node(neighbor_id)
+                self._added[node].append((neighbor, kind))
+                self._overlay_size += 1
+            self._maybe_compact()
+
+    def remove_relationship(self, individual1_id, individual2_id, relationship_type):
+        with self._lock:
+            for individual_id, neighbor_id, kind in relationship_edges(
+                    individual1_id, individual2_id, relationship_type):
+                node, neighbor = self.index.get(individual_id), self.index.get(neighbor_id)
+                if node is None or neighbor is None:
+                    continue
+                if (neighbor, kind) in self._added[node]:
+                    self._added[node].remove((neighbor, kind))
+                    self._overlay_size -= 1
+                else:
+                    self._removed[node][(neighbor, kind)] += 1
+                    self._overlay_size += 1
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        if self._overlay_size > max(len(self.neighbors) * COMPACT_RATIO, 1000):
+            self._compact()
+
+    # ------------------------------
+    # Traversal
+    # ------------------------------
+
+    def edges(self, node):
+        """Yield ``(neighbor, kind)`` for every current edge of ``node``."""
+        removed = Counter(self._removed[node]) if node in self._removed else None
+        if node + 1 < len(self.offsets):
+            for pos in range(self.offsets[node], self.offsets[node + 1]):
+                edge = (self.neighbors[pos], self.kinds[pos])
+                if removed and removed[edge]:
+                    removed[edge] -= 1
+                    continue
+                yield edge
+        yield from self._added.get(node, ())
+
+    def shortest_path(self, start_id, goal_id, max_depth):
+        """
+        Return the shortest ``[(individual_id, kind), ...]`` path from ``start_id`` to ``goal_id``.
+
+        The first element carries ``kind=None``; each later element records
+        how it relates to the element before it. Uses a bidirectional BFS that
+        always expands the smaller frontier, and returns None when the two
+        individuals are not connected within ``max_depth`` steps.
+        """
+        with self._lock:
+            start, goal = self.index.get(start_id), self.index.get(goal_id)
+            if start_id == goal_id:
+                return [(start_id, None)]
+            if start is None or goal is None:
+                return None
+
+            forward, backward = {start: (None, None, 0)}, {goal: (None, None, 0)}
+            forward_frontier, backward_frontier = [start], [goal]
+            for _ in range(max_depth):
+                if not forward_frontier or not backward_frontier:
+                    return None
+                if len(forward_frontier) <= len(backward_frontier):
+                    forward_frontier, meeting = self._expand(forward_frontier, forward, backward)
+                else:
+                    backward_frontier, meeting = self._expand(backward_frontier, backward, forward)
+                if meeting is not None:
+                    return self._join(meeting, forward, backward)
+            return None
+
+    def _expand(self, frontier, seen, other):
+        """Expand one BFS level; return the next frontier and the closest meeting node, if any."""
+        next_frontier, meeting = [], None
+        for node in frontier:
+            depth = seen[node][2] + 1
+            for neighbor, kind in self.edges(node):
+                if neighbor in seen:
+                    continue
+                seen[neighbor] = (node, kind, depth)
+                next_frontier.append(neighbor)
+                if neighbor in other and (meeting is None or other[neighbor][2] < other[meeting][2]):
+                    meeting = neighbor
+        return next_frontier, meeting
+
+    def _join(self, meeting, forward, backward):
+        path = []
+        node = meeting
+        while node is not None:
+            previous, kind, _ = forward[node]
+            path.append((node, kind))
+            node = previous
+        path.reverse()
+
+        # The backward tree points toward the goal, so each edge is read in reverse.
+        node = meeting
+        while backward[node][0] is not None:
+            node, kind, _ = backward[node]
+            path.append((node, INVERSE[kind]))
+        return [(self.ids[node], kind) for node, kind in path]
+
+
+def describe_path(path):
+    """
+    Name the relationship of the last individual in ``path`` to the first.
+
+    Returns ``(description, common_ancestor_id)``. The description is None
+    unless the path is a blood line (up through parents, then down through
+    children, where a sibling step goes up to a shared parent and back down).
+    The common ancestor is None when it is a parent implied by a sibling step.
+    """
+    kinds = [kind for _, kind in path[1:]]
+    if kinds == [SPOUSE]:
+        return "spouse", None
+
+    ups = downs = 0
+    apex = path[0][0]
+    via_sibling = False
+    for individual_id, kind in path[1:]:
+        if kind == PARENT and downs == 0:
+            ups += 1
+            apex = individual_id
+        elif kind == PARENT and downs == 1 and via_sibling:
+            # A sibling's parent is the shared parent the sibling step went through.
+            downs = 0
+            apex = individual_id
+        elif kind == CHILD:
+            downs += 1
+        elif kind == SIBLING and downs == 0:
+            ups += 1
+            downs = 1
+            apex = None
+        elif kind != SIBLING:
+            return None, None
+        via_sibling = kind == SIBLING
+    return kinship_name(ups, downs), apex
+
+
+def kinship_name(ups, downs):
+    """Name a blood relative reached ``ups`` generations up and ``downs`` back down."""
+    if ups == 0 and downs == 0:
+        return "self"
+    if downs == 0:
+        return _generational(ups, "parent")
+    if ups == 0:
+        return _generational(downs, "child")
+    if ups == 1 and downs == 1:
+        return "sibling"
+    if downs == 1:
+        return "great-" * (ups - 2) + "aunt/uncle"
+    if ups == 1:
+        return "great-" * (downs - 2) + "niece/nephew"
+
+    degree, removed = min(ups, downs) - 1, abs(ups - downs)
+    name = f"{_ordinal(degree)} cousin"
+    if removed == 1:
+        name += " once removed"
+    elif removed == 2:
+        name += " twice removed"
+    elif removed:
+        name += f" {removed} times removed"
+    return name
+
+
+def _generational(generations, base):
+    if generations == 1:
+        return base
+    return "great-" * (generations - 2) + "grand" + base
+
+
+def _ordinal(n):
+    return ORDINALS[n - 1] if n <= len(ORDINALS) else f"{n}th"
+
+
+def get_family_graph():
+    """Return this worker's family graph, loading or reloading it when needed."""
+    state = current_app.extensions.setdefault("family_graph", {"graph": None, "lock": threading.Lock()})
+    max_age = current_app.config["FAMILY_GRAPH_MAX_AGE"]
+    with state["lock"]:
+        graph = state["graph"]
+        if graph is None or (max_age and time.monotonic() - graph.loaded_at > max_age):
+            graph = state["graph"] = FamilyGraph.from_database()
+    return graph
+
+
+def loaded_family_graph():
+    """Return the family graph if this worker has already loaded one, else None."""
+    state = current_app.extensions.get("family_graph")
+    return state["graph"] if state else None
+
+
+def reset_family_graph():
+    """Drop this worker's family graph so the next use reloads it, e.g. after a bulk rewrite."""
+    state = current_app.extensions.get("family_graph")
+    if state:
+        with state["lock"]:
+            state["graph"] = None
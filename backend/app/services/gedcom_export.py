@@ -0,0 +1,278 @@
+"""
+Streaming GEDCOM 5.5.1 export.
+
+Every table is read through a server-side cursor (``yield_per``) in a fixed
+order and individuals are merged with their facts, citations and family links
+in Python, so memory stays bounded by the batch size rather than the tree.
+
+GEDCOM groups parents and children into FAM records, which the relationship
+table does not store. A family is derived per child from each pair of its
+parents (or its single parent) plus every spouse/partner relationship, and
+keyed by the ordered ``(parent1_id, parent2_id)`` pair; a single-parent family
+uses the same id twice. Xrefs are derived from row ids so no id map is kept.
+"""
+
+import uuid
+from datetime import date
+
+from sqlalchemy import and_, case, exists, or_, select, union
+
+from app import db
+from app.models import Citation, Fact, FactType, Individual, Relationship, Source
+from app.models.enums import Gender, RelationshipType
+from app.services.pedigree import parent_child_edges
+from app.utils.gedcom import FACT_TYPE_EVENTS, format_date, format_line
+
+FAMILY_NAMESPACE = uuid.UUID("6f1d3c52-3a8e-4a36-9a2f-4f1b8f0f6d11")
+
+SEXES = {Gender.male: "M", Gender.female: "F"}
+
+# Fact types exported as GEDCOM attributes carry their value on the tag line
+ATTRIBUTE_TAGS = {"OCCU", "EDUC", "RELI", "PROP", "NATU"}
+
+
+def individual_xref(individual_id):
+    return f"@I{individual_id.hex}@"
+
+
+def source_xref(source_id):
+    return f"@S{source_id.hex}@"
+
+
+def family_xref(parent1_id, parent2_id):
+    return f"@F{uuid.uuid5(FAMILY_NAMESPACE, f'{parent1_id}:{parent2_id}').hex}@"
+
+
+# ------------------------------
+# Queries
+# ------------------------------
+
+def _family_children():
+    """``(child_id, parent1_id, parent2_id)`` for every family a child belongs to."""
+    edges = select(parent_child_edges()).distinct().cte("edges")
+    other = edges.alias("other")
+    pairs = select(
+        edges.c.child_id, edges.c.parent_id.label("parent1_id"), other.c.parent_id.label("parent2_id")
+    ).join(other, and_(edges.c.child_id == other.c.child_id, edges.c.parent_id < other.c.parent_id))
+    singles = select(edges.c.child_id, edges.c.parent_id, edges.c.parent_id).where(
+        ~exists().where(and_(other.c.child_id == edges.c.child_id, other.c.parent_id != edges.c.parent_id))
+    )
+    return union(pairs, singles).cte("family_children")
+
+
+def _families(family_children):
+    """``(parent1_id, parent2_id, start_date, end_date)`` for every family."""
+    rel = Relationship.__table__
+    couples = rel.c.relationship_type.in_([RelationshipType.spouse, RelationshipType.partner])
+    low = case((rel.c.individual1_id < rel.c.individual2_id, rel.c.individual1_id), else_=rel.c.individual2_id)
+    high = case((rel.c.individual1_id < rel.c.individual2_id, rel.c.individual2_id), else_=rel.c.individual1_id)
+    keys = union(
+        select(family_children.c.parent1_id, family_children.c.parent2_id),
+        select(low, high).where(couples),
+    ).subquery("family_keys")
+    return (
+        select(keys.c.parent1_id, keys.c.parent2_id, rel.c.relationship_start_date, rel.c.relationship_end_date)
+        .outerjoin(rel, and_(
+            couples,
+            or_(
+                and_(rel.c.individual1_id == keys.c.parent1_id, rel.c.individual2_id == keys.c.parent2_id),
+                and_(rel.c.individual1_id == keys.c.parent2_id, rel.c.individual2_id == keys.c.parent1_id),
+            ),
+        ))
+        .cte("families")
+    )
+
+
+def _stream(query, batch_size):
+    return db.session.execute(query.execution_options(yield_per=batch_size))
+
+
+class _Merge:
+    """Consume rows of a stream sorted by ``key`` in step with another sorted stream."""
+
+    def __init__(self, rows, key):
+        self.rows = iter(rows)
+        self.key = key
+        self.head = next(self.rows, None)
+
+    def take(self, value):
+        """Return every row whose key equals ``value``, skipping rows with smaller keys."""
+        taken = []
+        while self.head is not None and self.key(self.head) <= value:
+            if self.key(self.head) == value:
+                taken.append(self.head)
+            self.head = next(self.rows, None)
+        return taken
+
+
+# ------------------------------
+# Records
+# ------------------------------
+
+def _header():
+    yield format_line(0, "HEAD")
+    yield format_line(1, "SOUR", "GENSOURCE")
+    yield format_line(2, "NAME", "Genealogical Sources Management App")
+    yield format_line(1, "DATE", format_date(date.today()))
+    yield format_line(1, "GEDC")
+    yield format_line(2, "VERS", "5.5.1")
+    yield format_line(2, "FORM", "LINEAGE-LINKED")
+    yield format_line(1, "CHAR", "UTF-8")
+
+
+def _sources(batch_size):
+    query = select(
+        Source.id, Source.title, Source.description, Source.source_text, Source.notes
+    ).where(Source.is_active.is_(True)).order_by(Source.id)
+    for source in _stream(query, batch_size):
+        yield format_line(0, "SOUR", xref=source_xref(source.id))
+        yield format_line(1, "TITL", source.title)
+        if source.source_text:
+            yield format_line(1, "TEXT", source.source_text)
+        for note in (source.description, source.notes):
+            if note:
+                yield format_line(1, "NOTE", note)
+
+
+def _event(tag, value, when, where, level=1):
+    has_detail = when is not None or where
+    out = format_line(level, tag, value if value else (None if has_detail else "Y"))
+    if when is not None:
+        out += format_line(level + 1, "DATE", format_date(when))
+    if where:
+        out += format_line(level + 1, "PLAC", where)
+    return out
+
+
+def _fact_lines(fact_rows):
+    """Yield GEDCOM lines for one fact and its citations (rows joined fact x citation)."""
+    fact = fact_rows[0]
+    tag = FACT_TYPE_EVENTS.get(fact.fact_type_key, "EVEN")
+    value = fact.fact_value if tag in ATTRIBUTE_TAGS or tag == "EVEN" else None
+    yield _event(tag, value, fact.fact_date, fact.fact_place)
+    if tag == "EVEN":
+        yield format_line(2, "TYPE", fact.fact_type_label)
+    elif fact.fact_value and tag not in ATTRIBUTE_TAGS:
+        yield format_line(2, "NOTE", fact.fact_value)
+    if fact.description:
+        yield format_line(2, "NOTE", fact.description)
+    for row in fact_rows:
+        if row.source_id is not None:
+            yield format_line(2, "SOUR", source_xref(row.source_id))
+            if row.section_reference or row.page_number is not None:
+                yield format_line(3, "PAGE", row.section_reference or str(row.page_number))
+
+
+def _individuals(batch_size, family_children, families):
+    individuals = select(Individual).order_by(Individual.id)
+    facts = (
+        select(
+            Fact.individual_id, Fact.id, Fact.fact_value, Fact.fact_date, Fact.fact_place, Fact.description,
+            FactType.key.label("fact_type_key"), FactType.label.label("fact_type_label"),
+            Source.id.label("source_id"), Citation.section_reference, Citation.page_number,
+        )
+        .join(FactType, Fact.fact_type_id == FactType.id)
+        .outerjoin(Citation, and_(Citation.cited_object_type == "fact", Citation.cited_object_id == Fact.id))
+        # Only active sources get a SOUR record, so citations of the others are left out
+        .outerjoin(Source, and_(Source.id == Citation.source_id, Source.is_active.is_(True)))
+        .order_by(Fact.individual_id, Fact.fact_date, Fact.id)
+    )
+    child_of = select(family_children).order_by(
+        family_children.c.child_id, family_children.c.parent1_id, family_children.c.parent2_id)
+    spouse_in = union(
+        select(families.c.parent1_id.label("member_id"), families.c.parent1_id, families.c.parent2_id),
+        select(families.c.parent2_id, families.c.parent1_id, families.c.parent2_id),
+    ).subquery("memberships")
+    spouse_in = select(spouse_in).order_by(spouse_in.c.member_id, spouse_in.c.parent1_id, spouse_in.c.parent2_id)
+
+    fact_rows = _Merge(_stream(facts, batch_size), lambda row: row.individual_id)
+    famc = _Merge(_stream(child_of, batch_size), lambda row: row.child_id)
+    fams = _Merge(_stream(spouse_in, batch_size), lambda row: row.member_id)
+
+    for ind in db.session.scalars(individuals.execution_options(yield_per=batch_size)):
+        yield format_line(0, "INDI", xref=individual_xref(ind.id))
+        yield format_line(1, "NAME", f"{ind.given_names} /{ind.surname}/")
+        yield format_line(1, "SEX", SEXES.get(ind.gender, "U"))
+
+        rows = fact_rows.take(ind.id)
+        fact_keys = {row.fact_type_key for row in rows}
+        if "birth" not in fact_keys and (ind.birth_date_estimated or ind.birth_place):
+            yield _event("BIRT", None, ind.birth_date_estimated, ind.birth_place)
+        if "death" not in fact_keys and (ind.death_date_estimated or ind.death_place):
+            yield _event("DEAT", None, ind.death_date_estimated, ind.death_place)
+        start = 0
+        for end in range(1, len(rows) + 1):
+            if end == len(rows) or rows[end].id != rows[start].id:
+                yield from _fact_lines(rows[start:end])
+                start = end
+
+        if ind.notes:
+            yield format_line(1, "NOTE", ind.notes)
+        for row in famc.take(ind.id):
+            yield format_line(1, "FAMC", family_xref(row.parent1_id, row.parent2_id))
+        for row in fams.take(ind.id):
+            yield format_line(1, "FAMS", family_xref(row.parent1_id, row.parent2_id))
+        # Identity-map entries are only weakly referenced, but expunging keeps
+        # the session from holding every exported individual.
+        db.session.expunge(ind)
+
+
+def _family_records(batch_size, family_children, families):
+    parent1, parent2 = Individual.__table__.alias("parent1"), Individual.__table__.alias("parent2")
+    family_rows = (
+        select(families, parent1.c.gender.label("gender1"), parent2.c.gender.label("gender2"))
+        .join(parent1, parent1.c.id == families.c.parent1_id)
+        .join(parent2, parent2.c.id == families.c.parent2_id)
+        .order_by(families.c.parent1_id, families.c.parent2_id)
+    )
+    children = select(family_children).order_by(
+        family_children.c.parent1_id, family_children.c.parent2_id, family_children.c.child_id)
+    children = _Merge(_stream(children, batch_size), lambda row: (row.parent1_id, row.parent2_id))
+
+    previous = None
+    for family in _stream(family_rows, batch_size):
+        key = (family.parent1_id, family.parent2_id)
+        if key == previous:
+            continue  # several spouse relationships between the same pair
+        previous = key
+
+        yield format_line(0, "FAM", xref=family_xref(*key))
+        parents = [(family.parent1_id, family.gender1)]
+        if family.parent2_id != family.parent1_id:
+            parents.append((family.parent2_id, family.gender2))
+        if len(parents) == 2 and (parents[0][1] == Gender.female or parents[1][1] == Gender.male):
+            parents.reverse()
+        for (parent_id, gender), tag in zip(parents, ("HUSB", "WIFE")):
+            if len(parents) == 1 and gender == Gender.female:
+                tag = "WIFE"
+            yield format_line(1, tag, individual_xref(parent_id))
+        for child in children.take(key):
+            yield format_line(1, "CHIL", individual_xref(child.child_id))
+        if family.relationship_start_date:
+            yield _event("MARR", None, family.relationship_start_date, None)
+        if family.relationship_end_date:
+            yield _event("DIV", None, family.relationship_end_date, None)
+
+
+def export_gedcom(batch_size=1000):
+    """Yield a complete GEDCOM document as a sequence of newline-terminated strings."""
+    family_children = _family_children()
+    families = _families(family_children)
+    yield from _header()
+    yield from _sources(batch_size)
+    yield from _individuals(batch_size, family_children, families)
+    yield from _family_records(batch_size, family_children, families)
+    yield format_line(0, "TRLR")
+
+
+def chunked(lines, size=65536):
+    """Join small strings into chunks of roughly ``size`` characters for streaming."""
+    buffer, length = [], 0
+    for line in lines:
+        buffer.append(line)
+        length += len(line)
+        if length >= size:
+            yield "".join(buffer)
+            buffer, length = [], 0
+    if buffer:
+        yield "".join(buffer)
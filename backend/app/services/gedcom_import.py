@@ -0,0 +1,297 @@
+"""
+Streaming GEDCOM import.
+
+The file is read once per record type so every row is written after the rows
+it references: sources first, then individuals with their facts, then
+families. Rows are inserted in batches (one executemany per table) and the
+import's checkpoint is advanced in the same transaction, so an interrupted
+import resumes from its last committed batch. Each batch also rebuilds the
+profiles of the individuals it touched and drops the cached responses it
+makes stale; a batch of families also drops the worker's family graph so it
+is reloaded with the new relationships.
+
+Row ids are ``uuid5`` values derived from the import id and the GEDCOM xref,
+which lets families and citations point at individuals and sources without an
+in-memory xref map and keeps ids stable across a resume.
+"""
+
+import os
+import uuid
+from collections import defaultdict
+
+from sqlalchemy import insert, select
+
+from app import db
+from app.models import Citation, Fact, FactType, GedcomImport, Individual, Relationship, Source, SourceType
+from app.models.enums import Gender, ImportStatus, RelationshipType
+from app.models.profile import refresh_profiles
+from app.services.family_graph import reset_family_graph
+from app.utils.cache import invalidate
+from app.utils.gedcom import EVENT_FACT_TYPES, iter_records, parse_date, parse_name
+
+PHASES = ("SOUR", "INDI", "FAM")
+
+GENDERS = {"M": Gender.male, "F": Gender.female}
+
+
+class GedcomImportError(Exception):
+    """Raised when an import cannot be started or resumed."""
+
+
+class GedcomImporter:
+    """Import one GEDCOM file, checkpointing progress in a ``GedcomImport`` row."""
+
+    def __init__(self, path, import_record, batch_size=1000):
+        self.path = path
+        self.record = import_record
+        self.batch_size = batch_size
+        self.user_id = import_record.created_by_user_id
+
+        self.fact_types = dict(db.session.execute(select(FactType.key, FactType.id)).all())
+        self.source_type_id = db.session.scalar(select(SourceType.id).where(SourceType.key == "other"))
+        if self.source_type_id is None or not self.fact_types:
+            raise GedcomImportError("Lookup tables are empty; run 'flask seed' first.")
+
+    @classmethod
+    def start(cls, path, user_id, batch_size=1000):
+        record = GedcomImport(
+            file_name=os.path.basename(path),
+            file_size=os.path.getsize(path),
+            phase=PHASES[0],
+            records_done=0,
+            created_by_user_id=user_id,
+        )
+        db.session.add(record)
+        db.session.commit()
+        return cls(path, record, batch_size)
+
+    @classmethod
+    def resume(cls, path, import_id, batch_size=1000):
+        record = db.session.get(GedcomImport, import_id)
+        if record is None:
+            raise GedcomImportError(f"No import with id {import_id}.")
+        if record.status == ImportStatus.completed:
+            raise GedcomImportError(f"Import {import_id} already completed.")
+        if record.file_size != os.path.getsize(path):
+            raise GedcomImportError(f"{path} is not the file import {import_id} started with.")
+        record.status = ImportStatus.running
+        record.error = None
+        db.session.commit()
+        return cls(path, record, batch_size)
+
+    # ------------------------------
+    # Driver
+    # ------------------------------
+
+    def run(self, progress=None):
+        """Import every remaining phase; ``progress(phase, records_done)`` is called after each batch."""
+        try:
+            for phase in PHASES[PHASES.index(self.record.phase):]:
+                self._run_phase(phase, progress)
+            self.record.status = ImportStatus.completed
+            db.session.commit()
+        except Exception as exc:
+            db.session.rollback()
+            self.record.status = ImportStatus.failed
+            self.record.error = str(exc)
+            db.session.commit()
+            raise
+        return self.record
+
+    def _run_phase(self, phase, progress):
+        if self.record.phase != phase:
+            self.record.phase = phase
+            self.record.records_done = 0
+            db.session.commit()
+
+        skip = self.record.records_done
+        rows, pending = defaultdict(list), 0
+        for record in self._records(phase):
+            if skip:
+                skip -= 1
+                continue
+            if record.xref:
+                getattr(self, f"_convert_{phase.lower()}")(record, rows)
+            pending += 1
+            if pending >= self.batch_size:
+                self._flush(rows, pending)
+                rows, pending = defaultdict(list), 0
+                if progress:
+                    progress(phase, self.record.records_done)
+        self._flush(rows, pending)
+        if progress:
+            progress(phase, self.record.records_done)
+
+    def _records(self, tag):
+        with open(self.path, encoding="utf-8-sig", errors="replace") as handle:
+            for record in iter_records(handle):
+                if record.tag == tag:
+                    yield record
+
+    def _flush(self, rows, count):
+        self._drop_dangling(rows)
+        for model in (Source, Individual, Relationship, Fact, Citation):
+            if rows[model]:
+                db.session.execute(insert(model), rows[model])
+        touched = {r["id"] for r in rows[Individual]} | {r["individual_id"] for r in rows[Fact]}
+        for r in rows[Relationship]:
+            touched.update((r["individual1_id"], r["individual2_id"]))
+        refresh_profiles(db.session.connection(), touched)
+        self.record.records_done += count
+        db.session.commit()
+        if rows[Source]:
+            invalidate("source")
+        if rows[Individual]:
+            invalidate("individual")
+        if rows[Relationship]:
+            reset_family_graph()
+
+    def _drop_dangling(self, rows):
+        """Drop rows whose GEDCOM pointers name individuals or sources that were never imported."""
+        individual_ids = {r["individual_id"] for r in rows[Fact]}
+        for r in rows[Relationship]:
+            individual_ids.update((r["individual1_id"], r["individual2_id"]))
+        individual_ids -= {r["id"] for r in rows[Individual]}
+        source_ids = {r["source_id"] for r in rows[Citation]}
+
+        known = set()
+        if individual_ids:
+            known.update(db.session.scalars(select(Individual.id).where(Individual.id.in_(individual_ids))))
+        if source_ids:
+            known.update(db.session.scalars(select(Source.id).where(Source.id.in_(source_ids))))
+        known.update(r["id"] for r in rows[Individual])
+
+        rows[Fact] = [r for r in rows[Fact] if r["individual_id"] in known]
+        rows[Relationship] = [
+            r for r in rows[Relationship]
+            if r["individual1_id"] in known and r["individual2_id"] in known
+        ]
+        cited = {r["id"] for r in rows[Fact]} | {r["id"] for r in rows[Relationship]}
+        rows[Citation] = [
+            r for r in rows[Citation]
+            if r["source_id"] in known and r["cited_object_id"] in cited
+        ]
+
+    # ------------------------------
+    # Record conversion
+    # ------------------------------
+
+    def _id(self, *parts):
+        return uuid.uuid5(self.record.id, ":".join(str(part) for part in parts))
+
+    def _convert_sour(self, record, rows):
+        title = record.value_of("TITL") or record.value_of("ABBR") or record.xref
+        description = "\n".join(filter(None, [record.value_of("AUTH"), record.value_of("PUBL")]))
+        rows[Source].append({
+            "id": self._id(record.xref),
+            "title": title[:255],
+            "description": description or None,
+            "source_type_id": self.source_type_id,
+            "source_text": record.value_of("TEXT"),
+            "notes": _notes(record),
+            "is_active": True,
+            "created_by_user_id": self.user_id,
+        })
+
+    def _convert_indi(self, record, rows):
+        individual_id = self._id(record.xref)
+        name = record.first("NAME")
+        given_names, surname = parse_name(name.value if name else None)
+        birth, death = record.first("BIRT"), record.first("DEAT")
+        rows[Individual].append({
+            "id": individual_id,
+            "given_names": given_names[:255],
+            "surname": surname[:255],
+            "gender": GENDERS.get((record.value_of("SEX") or "").upper(), Gender.unknown),
+            "birth_date_estimated": parse_date(birth.value_of("DATE")) if birth else None,
+            "birth_place": _truncate(birth.value_of("PLAC")) if birth else None,
+            "death_date_estimated": parse_date(death.value_of("DATE")) if death else None,
+            "death_place": _truncate(death.value_of("PLAC")) if death else None,
+            "notes": _notes(record),
+            "is_living": death is None and record.first("BURI") is None,
+            "created_by_user_id": self.user_id,
+        })
+        self._convert_events(record, [individual_id], rows, cite=True)
+
+    def _convert_fam(self, record, rows):
+        husband, wife = record.value_of("HUSB"), record.value_of("WIFE")
+        # A repeated HUSB/WIFE or CHIL pointer would give two rows the same derived id
+        parents = list(dict.fromkeys(self._id(xref) for xref in (husband, wife) if xref))
+        children = list(dict.fromkeys(self._id(child.value) for child in record.all("CHIL") if child.value))
+
+        if len(parents) == 2:
+            marriage, divorce = record.first("MARR"), record.first("DIV")
+            relationship_id = self._id(record.xref, "spouse")
+            rows[Relationship].append({
+                "id": relationship_id,
+                "individual1_id": parents[0],
+                "individual2_id": parents[1],
+                "relationship_type": RelationshipType.spouse,
+                "relationship_start_date": parse_date(marriage.value_of("DATE")) if marriage else None,
+                "relationship_end_date": parse_date(divorce.value_of("DATE")) if divorce else None,
+                "created_by_user_id": self.user_id,
+            })
+            if marriage is not None:
+                self._convert_citations(marriage, "relationship", relationship_id, rows)
+
+        for parent_id in parents:
+            for child_id in children:
+                rows[Relationship].append({
+                    "id": self._id(record.xref, parent_id, child_id),
+                    "individual1_id": parent_id,
+                    "individual2_id": child_id,
+                    "relationship_type": RelationshipType.parent,
+                    "created_by_user_id": self.user_id,
+                })
+
+        # Family events (marriage, divorce, ...) become a fact on each spouse
+        self._convert_events(record, parents, rows, cite=False)
+
+    def _convert_events(self, record, individual_ids, rows, cite):
+        seen_types = set()
+        events = [child for child in record.children if child.tag in EVENT_FACT_TYPES]
+        for position, event in enumerate(events):
+            fact_type_id = self.fact_types.get(EVENT_FACT_TYPES[event.tag], self.fact_types.get("other"))
+            is_primary = fact_type_id not in seen_types
+            seen_types.add(fact_type_id)
+            for individual_id in individual_ids:
+                fact_id = self._id(record.xref, individual_id, "fact", position)
+                rows[Fact].append({
+                    "id": fact_id,
+                    "individual_id": individual_id,
+                    "fact_type_id": fact_type_id,
+                    "fact_value": event.value if event.value and event.value != "Y" else None,
+                    "fact_date": parse_date(event.value_of("DATE")),
+                    "fact_place": event.value_of("PLAC"),
+                    "description": _notes(event),
+                    "is_primary": is_primary,
+                    "created_by_user_id": self.user_id,
+                })
+                if cite:
+                    self._convert_citations(event, "fact", fact_id, rows)
+
+    def _convert_citations(self, node, object_type, object_id, rows):
+        for position, citation in enumerate(node.all("SOUR")):
+            # Only pointers to SOUR records are imported; inline source text has no row to cite.
+            if not citation.value or not citation.value.startswith("@"):
+                continue
+            page = citation.value_of("PAGE")
+            rows[Citation].append({
+                "id": self._id(object_type, object_id, "citation", position),
+                "cited_object_id": object_id,
+                "cited_object_type": object_type,
+                "source_id": self._id(citation.value),
+                "page_number": int(page) if page and page.isdigit() else None,
+                "section_reference": page,
+                "source_notes": _notes(citation),
+                "created_by_user_id": self.user_id,
+            })
+
+
+def _truncate(value, length=255):
+    return value[:length] if value else None
+
+
+def _notes(node):
+    notes = [note.value for note in node.all("NOTE") if note.value and not note.value.startswith("@")]
+    return "\n\n".join(notes) or None
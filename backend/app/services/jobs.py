@@ -0,0 +1,351 @@
+"""
+Background jobs: a durable queue in the ``jobs`` table and the worker that runs it.
+
+Requests call ``enqueue`` and return at once; ``flask worker`` processes loop
+over ``claim_job`` and ``run_job``. A job is claimed with a conditional
+``UPDATE ... WHERE status = 'queued'``, so of several workers picking the
+same job exactly one updates the row and the others pick again; any number
+of workers can poll the table, on SQLite too. On PostgreSQL the pick also
+uses ``FOR UPDATE SKIP LOCKED`` so workers skip the rows being claimed
+instead of waiting on each other's locks. Jobs survive restarts: rows stay
+queued until a worker is available.
+
+While a job runs, a thread of its worker refreshes ``heartbeat_at`` every
+``JOB_HEARTBEAT_INTERVAL`` seconds and the job reports progress through its
+``JobContext``; both are written on their own connection so they are visible
+while the job's transaction is still open. A running job whose heartbeat is
+older than ``JOB_STALE_AFTER`` seconds belonged to a worker that died and is
+marked failed (a GEDCOM import can then be resumed with a new job naming its
+``import_id``).
+
+Each kind of job is a function registered with ``job_kind`` that takes the
+context and the job's params and returns a JSON-ready result.
+"""
+
+import os
+import signal
+import threading
+import time
+import uuid
+from datetime import timedelta
+
+from flask import current_app
+from sqlalchemy import func, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models import Individual, Job
+from app.models.enums import JobStatus
+from app.models.profile import refresh_profiles
+from app.services.conflicts import find_conflicts
+from app.services.duplicates import find_duplicates
+from app.services.gedcom_export import chunked, export_gedcom
+from app.services.gedcom_import import GedcomImporter
+
+# Least time between two progress writes of one job
+PROGRESS_INTERVAL = 1.0
+
+# Longest error message stored on a failed job
+ERROR_CHARS = 4000
+
+
+class JobError(ValueError):
+    """Raised when a job cannot be enqueued."""
+
+
+class JobKind:
+    """A registered kind of job: the function running it and the params it accepts."""
+
+    def __init__(self, name, run, params, check=None):
+        self.name = name
+        self.run = run
+        # Param name -> (accepted types, required)
+        self.params = params
+        # Further validation of the params, raising JobError
+        self.extra_check = check
+
+    def check(self, params):
+        if not isinstance(params, dict):
+            raise JobError("'params' must be a JSON object.")
+        unknown = sorted(set(params) - set(self.params))
+        if unknown:
+            raise JobError(f"Unknown params for {self.name}: {', '.join(unknown)}.")
+        for name, (types, required) in self.params.items():
+            value = params.get(name)
+            if value is None:
+                if required:
+                    raise JobError(f"Missing param '{name}'.")
+            elif isinstance(value, bool) and bool not in types or not isinstance(value, types):
+                raise JobError(f"Invalid param '{name}'.")
+        if self.extra_check:
+            self.extra_check(params)
+        return params
+
+
+JOB_KINDS = {}
+
+
+def job_kind(name, check=None, **params):
+    """Register the decorated ``function(context, params)`` as the job kind ``name``."""
+    def register(function):
+        JOB_KINDS[name] = JobKind(name, function, params, check)
+        return function
+    return register
+
+
+def job_files_dir():
+    """Directory GEDCOM imports are read from and exports written to."""
+    return current_app.config["JOB_FILES_DIR"] or os.path.join(current_app.instance_path, "jobs")
+
+
+def job_file(name):
+    """Return the path of the file ``name`` in the job files directory, refusing other directories."""
+    if not name or os.path.basename(name) != name or name.startswith("."):
+        raise JobError(f"Invalid file name {name!r}.")
+    return os.path.join(job_files_dir(), name)
+
+
+# ------------------------------
+# Queue
+# ------------------------------
+
+def enqueue(kind, params, user_id):
+    """Add a queued job of ``kind`` to the session and return it; the caller commits."""
+    spec = JOB_KINDS.get(kind)
+    if spec is None:
+        raise JobError(f"Unknown job kind {kind!r}; expected one of: {', '.join(sorted(JOB_KINDS))}.")
+    job = Job(kind=kind, params=spec.check(params or {}), status=JobStatus.queued, created_by_user_id=user_id)
+    db.session.add(job)
+    return job
+
+
+def claim_job(worker):
+    """Mark the oldest queued job running for ``worker`` and return it, or None when the queue is empty."""
+    while True:
+        job_id = db.session.scalar(
+            select(Job.id)
+            .where(Job.status == JobStatus.queued, Job.kind.in_(JOB_KINDS))
+            .order_by(Job.created_at)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+        )
+        if job_id is None:
+            db.session.rollback()
+            return None
+        # Only one of the workers that picked this job still finds it queued
+        claimed = db.session.execute(
+            update(Job)
+            .where(Job.id == job_id, Job.status == JobStatus.queued)
+            .values(status=JobStatus.running, worker=worker, started_at=func.now(), heartbeat_at=func.now())
+        ).rowcount
+        db.session.commit()
+        if claimed:
+            return db.session.get(Job, job_id)
+
+
+def fail_stale_jobs(stale_after):
+    """Mark failed the running jobs whose worker stopped sending heartbeats; return how many."""
+    cutoff = db.session.scalar(select(func.now())) - timedelta(seconds=stale_after)
+    failed = db.session.execute(
+        update(Job)
+        .where(Job.status == JobStatus.running, Job.heartbeat_at < cutoff)
+        .values(status=JobStatus.failed, finished_at=func.now(),
+                error=f"The worker stopped responding for more than {stale_after} seconds.")
+    ).rowcount
+    db.session.commit()
+    return failed
+
+
+class JobContext:
+    """What a running job sees of itself: its id, creator and a way to report progress."""
+
+    def __init__(self, job):
+        self.job_id = job.id
+        self.user_id = job.created_by_user_id
+        self.engine = db.engine
+        self.reported_at = None
+
+    def progress(self, done, total=None, message=None):
+        """Record ``done`` of ``total`` units (and a short message), at most once per ``PROGRESS_INTERVAL``."""
+        now = time.monotonic()
+        if self.reported_at is not None and now - self.reported_at < PROGRESS_INTERVAL:
+            return
+        self.reported_at = now
+        values = {"progress_done": done, "heartbeat_at": func.now()}
+        if total is not None:
+            values["progress_total"] = total
+        if message is not None:
+            values["progress_message"] = message[:255]
+        with self.engine.begin() as connection:
+            connection.execute(update(Job).where(Job.id == self.job_id).values(**values))
+
+
+def run_job(job):
+    """Run a claimed job to completion and record its result or error; return whether it succeeded."""
+    job_id, spec = job.id, JOB_KINDS[job.kind]
+    context = JobContext(job)
+    try:
+        result = spec.run(context, dict(job.params))
+    except Exception as exc:
+        db.session.rollback()
+        current_app.logger.exception("Job %s (%s) failed", job_id, spec.name)
+        values = {"status": JobStatus.failed, "error": (str(exc) or exc.__class__.__name__)[:ERROR_CHARS]}
+    else:
+        # Progress writes are throttled, so the last one may be behind
+        values = {"status": JobStatus.completed, "result": result,
+                  "progress_done": func.coalesce(Job.progress_total, Job.progress_done)}
+    db.session.execute(update(Job).where(Job.id == job_id).values(finished_at=func.now(), **values))
+    db.session.commit()
+    return values["status"] == JobStatus.completed
+
+
+# ------------------------------
+# Worker
+# ------------------------------
+
+class Heartbeat(threading.Thread):
+    """Refreshes ``heartbeat_at`` of the job its worker is running, from a separate connection."""
+
+    def __init__(self, engine, interval, logger):
+        super().__init__(name="job-heartbeat", daemon=True)
+        self.engine = engine
+        self.interval = interval
+        self.logger = logger
+        self.job_id = None
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            job_id = self.job_id
+            if job_id is None:
+                continue
+            try:
+                with self.engine.begin() as connection:
+                    connection.execute(update(Job).where(Job.id == job_id).values(heartbeat_at=func.now()))
+            except SQLAlchemyError as exc:
+                self.logger.warning("Heartbeat of job %s failed: %s", job_id, exc)
+
+
+def run_worker(worker, poll_interval, heartbeat_interval, stale_after, once=False, max_jobs=None, echo=None):
+    """
+    Run queued jobs until stopped and return how many were run.
+
+    With ``once`` the worker exits when the queue is empty instead of polling
+    every ``poll_interval`` seconds. SIGTERM or Ctrl-C lets the current job
+    finish before exiting; a second Ctrl-C interrupts it.
+    """
+    stopping = threading.Event()
+
+    def stop(signum, frame):
+        stopping.set()
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        if echo:
+            echo("Stopping after the current job...")
+
+    previous = {signum: signal.signal(signum, stop) for signum in (signal.SIGTERM, signal.SIGINT)}
+    heartbeat = Heartbeat(db.engine, heartbeat_interval, current_app.logger)
+    heartbeat.start()
+    ran = 0
+    try:
+        while not stopping.is_set() and (max_jobs is None or ran < max_jobs):
+            failed = fail_stale_jobs(stale_after)
+            if failed and echo:
+                echo(f"Marked {failed} abandoned jobs failed.")
+            job = claim_job(worker)
+            if job is None:
+                if once:
+                    break
+                stopping.wait(poll_interval)
+                continue
+
+            job_id = job.id
+            if echo:
+                echo(f"Running job {job_id} ({job.kind})...")
+            heartbeat.job_id = job_id
+            try:
+                succeeded = run_job(job)
+            finally:
+                heartbeat.job_id = None
+                db.session.remove()
+            ran += 1
+            if echo:
+                echo(f"Job {job_id} {'completed' if succeeded else 'failed'}.")
+    finally:
+        heartbeat.stopped.set()
+        for signum, handler in previous.items():
+            signal.signal(signum, handler)
+    return ran
+
+
+# ------------------------------
+# Job Kinds
+# ------------------------------
+
+def _check_import(params):
+    if not os.path.isfile(job_file(params["file"])):
+        raise JobError(f"No file {params['file']!r} in the job files directory.")
+    if params.get("import_id"):
+        try:
+            uuid.UUID(params["import_id"])
+        except ValueError:
+            raise JobError("Invalid param 'import_id': expected a UUID.") from None
+
+
+@job_kind("import_gedcom", check=_check_import, file=((str,), True), import_id=((str,), False), batch_size=((int,), False))
+def _import_gedcom(context, params):
+    """Import ``file`` from the job files directory, or resume the import ``import_id`` of it."""
+    path = job_file(params["file"])
+    batch_size = params.get("batch_size") or 1000
+    if params.get("import_id"):
+        importer = GedcomImporter.resume(path, uuid.UUID(params["import_id"]), batch_size)
+    else:
+        importer = GedcomImporter.start(path, context.user_id, batch_size)
+    import_id = importer.record.id
+    # The message names the import so an interrupted job can be resumed
+    context.progress(importer.record.records_done, message=f"import {import_id}: {importer.record.phase}")
+    try:
+        importer.run(progress=lambda phase, done: context.progress(done, message=f"import {import_id}: {phase}"))
+    except Exception as exc:
+        raise RuntimeError(f"Import {import_id} failed: {exc}; resume it with 'import_id'.") from exc
+    return {"import_id": str(import_id)}
+
+
+@job_kind("export_gedcom", batch_size=((int,), False))
+def _export_gedcom(context, params):
+    """Write the whole database as GEDCOM to a file in the job files directory."""
+    name = f"export-{context.job_id}.ged"
+    path = job_file(name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    written = 0
+    with open(path + ".part", "w", encoding="utf-8") as output:
+        for chunk in chunked(export_gedcom(batch_size=params.get("batch_size") or 1000)):
+            output.write(chunk)
+            written += len(chunk)
+            context.progress(written, message="characters written")
+    os.replace(path + ".part", path)
+    return {"file": name, "size": os.path.getsize(path)}
+
+
+@job_kind("find_duplicates", min_score=((int, float), False), max_block_size=((int,), False))
+def _find_duplicates(context, params):
+    min_score = params.get("min_score")
+    return find_duplicates(
+        min_score if min_score is not None else current_app.config["DUPLICATE_MIN_SCORE"],
+        params.get("max_block_size") or current_app.config["DUPLICATE_MAX_BLOCK_SIZE"],
+    )
+
+
+@job_kind("find_conflicts", full=((bool,), False))
+def _find_conflicts(context, params):
+    return find_conflicts(context.user_id, full=bool(params.get("full")))
+
+
+@job_kind("refresh_profiles", batch_size=((int,), False))
+def _refresh_profiles(context, params):
+    batch_size = params.get("batch_size") or 1000
+    ids = db.session.scalars(select(Individual.id).order_by(Individual.id)).all()
+    for start in range(0, len(ids), batch_size):
+        refresh_profiles(db.session.connection(), ids[start:start + batch_size])
+        db.session.commit()
+        context.progress(min(start + batch_size, len(ids)), len(ids))
+    return {"profiles": len(ids)}
@@ -0,0 +1,152 @@
+"""
+Merging duplicate individuals.
+
+Every row pointing at the dropped individual is moved with one set-based
+``UPDATE ... WHERE`` per table, so the cost does not grow with the number of
+ORM objects involved. Relationships need care first: rows of either
+individual stored from the other end ("child", "ward") are flipped to the
+"parent"/"guardian" form so both read the same way, a relationship between
+the two individuals would become a self-relationship and is deleted, and a
+relationship of the dropped individual that the kept one already has (same
+other individual and type) is folded into the existing one. Citations and
+qualifiers of folded relationships are repointed to the survivor; those of
+deleted relationships are deleted with them.
+
+Everything runs in the caller's transaction; ``merge_individuals`` does not
+commit. The profiles of the kept individual and of everyone related to it
+are rebuilt at the end.
+"""
+
+from sqlalchemy import and_, delete, func, or_, select, update
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.models import (
+    Citation, DuplicateCandidate, ExternalLink, Fact, Individual, Relationship, RelationshipQualifier, ResearchNote
+)
+from app.models.enums import RelationshipType
+from app.models.profile import refresh_profiles, stale_profile_ids
+
+# Relationship types that read the same in both directions
+SYMMETRIC_TYPES = (RelationshipType.spouse, RelationshipType.partner, RelationshipType.sibling)
+
+# Relationship types stored from the other end, and the type they read as once flipped
+INVERSE_TYPES = {RelationshipType.child: RelationshipType.parent, RelationshipType.ward: RelationshipType.guardian}
+
+# Scalar fields copied from the dropped individual when the kept one lacks them
+FILLED_FIELDS = (
+    "preferred_name", "birth_date_estimated", "death_date_estimated", "birth_place", "death_place", "notes",
+)
+
+
+class MergeError(ValueError):
+    """Raised when two individuals cannot be merged."""
+
+
+def _execute(statement):
+    return db.session.execute(statement.execution_options(synchronize_session=False)).rowcount
+
+
+def _folded_relationships(keep_id, drop_id):
+    """Select ``(duplicate_id, survivor_id)`` for relationships of ``drop_id`` that ``keep_id`` already has."""
+    existing = aliased(Relationship)
+    same_type = existing.relationship_type == Relationship.relationship_type
+    symmetric = Relationship.relationship_type.in_(SYMMETRIC_TYPES)
+    as_first = and_(
+        Relationship.individual1_id == drop_id,
+        or_(
+            and_(existing.individual1_id == keep_id, existing.individual2_id == Relationship.individual2_id),
+            and_(symmetric, existing.individual2_id == keep_id, existing.individual1_id == Relationship.individual2_id),
+        ),
+    )
+    as_second = and_(
+        Relationship.individual2_id == drop_id,
+        or_(
+            and_(existing.individual2_id == keep_id, existing.individual1_id == Relationship.individual1_id),
+            and_(symmetric, existing.individual1_id == keep_id, existing.individual2_id == Relationship.individual1_id),
+        ),
+    )
+    return (
+        select(Relationship.id.label("duplicate_id"), func.min(existing.id).label("survivor_id"))
+        .join(existing, same_type)
+        .where(or_(as_first, as_second))
+        .group_by(Relationship.id)
+        .subquery("folded")
+    )
+
+
+def merge_individuals(keep_id, drop_id):
+    """Merge ``drop_id`` into ``keep_id`` and return a summary of the rows touched."""
+    if keep_id == drop_id:
+        raise MergeError("Cannot merge an individual into itself.")
+    keep, drop = db.session.get(Individual, keep_id), db.session.get(Individual, drop_id)
+    if keep is None or drop is None:
+        return None
+
+    summary = {}
+    # A "child" row of one and a "parent" row of the other only fold once they point the same way
+    for inverse, canonical in INVERSE_TYPES.items():
+        _execute(
+            update(Relationship)
+            .where(
+                Relationship.relationship_type == inverse,
+                or_(Relationship.individual1_id.in_((keep_id, drop_id)),
+                    Relationship.individual2_id.in_((keep_id, drop_id))),
+            )
+            .values(individual1_id=Relationship.individual2_id, individual2_id=Relationship.individual1_id,
+                    relationship_type=canonical)
+        )
+
+    between = or_(
+        and_(Relationship.individual1_id == keep_id, Relationship.individual2_id == drop_id),
+        and_(Relationship.individual1_id == drop_id, Relationship.individual2_id == keep_id),
+    )
+    loops = select(Relationship.id).where(between).scalar_subquery()
+    folded = _folded_relationships(keep_id, drop_id)
+    folded_ids = select(folded.c.duplicate_id).scalar_subquery()
+
+    def survivor_of(column):
+        return select(folded.c.survivor_id).where(folded.c.duplicate_id == column).scalar_subquery()
+
+    # Relationships between the two would become self-relationships
+    summary["citations_removed"] = _execute(delete(Citation).where(
+        Citation.cited_object_type == "relationship", Citation.cited_object_id.in_(loops)))
+    _execute(delete(RelationshipQualifier).where(RelationshipQualifier.relationship_id.in_(loops)))
+    removed = _execute(delete(Relationship).where(between))
+
+    # Relationships both individuals have are folded into the kept one's
+    summary["citations_repointed"] = _execute(
+        update(Citation)
+        .where(Citation.cited_object_type == "relationship", Citation.cited_object_id.in_(folded_ids))
+        .values(cited_object_id=survivor_of(Citation.cited_object_id))
+    )
+    _execute(
+        update(RelationshipQualifier)
+        .where(RelationshipQualifier.relationship_id.in_(folded_ids))
+        .values(relationship_id=survivor_of(RelationshipQualifier.relationship_id))
+    )
+    removed += _execute(delete(Relationship).where(Relationship.id.in_(folded_ids)))
+    summary["relationships_removed"] = removed
+
+    summary["relationships"] = (
+        _execute(update(Relationship).where(Relationship.individual1_id == drop_id).values(individual1_id=keep_id))
+        + _execute(update(Relationship).where(Relationship.individual2_id == drop_id).values(individual2_id=keep_id))
+    )
+    for key, model in (("facts", Fact), ("external_links", ExternalLink), ("research_notes", ResearchNote)):
+        summary[key] = _execute(update(model).where(model.individual_id == drop_id).values(individual_id=keep_id))
+
+    # Candidate pairs naming the dropped individual are settled by the merge
+    _execute(delete(DuplicateCandidate).where(
+        or_(DuplicateCandidate.individual1_id == drop_id, DuplicateCandidate.individual2_id == drop_id)))
+
+    for field in FILLED_FIELDS:
+        if getattr(keep, field) is None:
+            setattr(keep, field, getattr(drop, field))
+    keep.is_living = bool(keep.is_living and drop.is_living)
+
+    db.session.expunge(drop)
+    _execute(delete(Individual).where(Individual.id == drop_id))
+    db.session.flush()
+    connection = db.session.connection()
+    refresh_profiles(connection, stale_profile_ids(connection, renamed=[keep_id]) | {drop_id})
+    return summary
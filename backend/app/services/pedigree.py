@@ -0,0 +1,63 @@
+"""
+Ancestor and descendant traversal over parent/child relationships.
+
+A relationship's ``relationship_type`` describes ``individual1`` relative to
+``individual2``: a ``parent`` row means individual1 is the parent of
+individual2, and a ``child`` row means individual1 is the child of individual2.
+"""
+
+from sqlalchemy import literal, select, union_all
+
+from app import db
+from app.models import Individual, Relationship
+from app.models.enums import RelationshipType
+
+ANCESTORS = "ancestors"
+DESCENDANTS = "descendants"
+
+
+def parent_child_edges():
+    """Return a subquery of ``(parent_id, child_id)`` pairs from both relationship directions."""
+    rel = Relationship.__table__
+    as_parent = select(
+        rel.c.individual1_id.label("parent_id"),
+        rel.c.individual2_id.label("child_id"),
+    ).where(rel.c.relationship_type == RelationshipType.parent)
+    as_child = select(
+        rel.c.individual2_id.label("parent_id"),
+        rel.c.individual1_id.label("child_id"),
+    ).where(rel.c.relationship_type == RelationshipType.child)
+    return union_all(as_parent, as_child).subquery("parent_child")
+
+
+def pedigree(root_id, direction, generations):
+    """
+    Walk up to ``generations`` steps from ``root_id`` in a single ``WITH RECURSIVE`` query.
+
+    Returns ``(individual, linked_id, generation)`` rows where ``linked_id`` is
+    the individual one generation closer to the root. An individual reached
+    along several lines appears once per line.
+    """
+    edges = parent_child_edges()
+    if direction == ANCESTORS:
+        near, far = edges.c.child_id, edges.c.parent_id
+    else:
+        near, far = edges.c.parent_id, edges.c.child_id
+
+    tree = select(
+        far.label("individual_id"),
+        near.label("linked_id"),
+        literal(1).label("generation"),
+    ).where(near == root_id).cte("pedigree", recursive=True)
+
+    step = select(far, near, tree.c.generation + 1).select_from(
+        tree.join(edges, near == tree.c.individual_id)
+    ).where(tree.c.generation < generations)
+    tree = tree.union(step)
+
+    query = (
+        select(Individual, tree.c.linked_id, tree.c.generation)
+        .join(tree, Individual.id == tree.c.individual_id)
+        .order_by(tree.c.generation)
+    )
+    return db.session.execute(query).all()
@@ -0,0 +1,242 @@
+"""
+Ranked full-text search over sources and individuals.
+
+On PostgreSQL the query is parsed with ``websearch_to_tsquery``, matched
+against the generated ``search_vector`` columns (GIN indexed), ranked with
+``ts_rank_cd`` and highlighted with ``ts_headline``. On SQLite the FTS5 tables
+maintained by triggers are matched instead, ranked with ``bm25`` using the
+same column weights and highlighted with ``snippet``.
+
+Hits from every searched table are merged in one ``UNION ALL`` ordered by
+rank, and pages are resumed with a ``(rank, kind, id)`` keyset cursor.
+Highlights on PostgreSQL are only computed for the rows of the page.
+
+Name lookup (``find_by_name``) does not use full-text search: it matches the
+precomputed Soundex and Double Metaphone keys on ``Individual`` (plus
+``pg_trgm`` similarity on PostgreSQL), all of which are indexed.
+"""
+
+import base64
+import re
+from uuid import UUID
+
+from sqlalchemy import (
+    and_, case, cast, column, func, literal, literal_column, or_, select, table, tuple_, union_all
+)
+from sqlalchemy.dialects.postgresql import REGCONFIG
+
+from app import db
+from app.models import Individual, Source
+from app.models.search import SEARCH_COLUMNS, SEARCH_CONFIG, fts_table
+from app.utils.loading import strict_loading
+from app.utils.pagination import InvalidCursor
+from app.utils.phonetic import name_keys
+
+# Result type -> model
+KINDS = {"source": Source, "individual": Individual}
+
+HIGHLIGHT_START, HIGHLIGHT_STOP, ELLIPSIS = "<mark>", "</mark>", "…"
+
+# bm25 column weights standing in for the tsvector weight classes
+BM25_WEIGHTS = {"A": 10.0, "B": 5.0, "C": 2.0, "D": 1.0}
+
+
+def encode_cursor(rank, kind, row_id):
+    raw = f"{rank!r}|{kind}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        rank, kind, row_id = base64.urlsafe_b64decode(padded).decode().split("|", 2)
+        if kind not in KINDS:
+            raise ValueError(kind)
+        return float(rank), kind, UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+class SearchHit:
+    """One ranked match: ``kind`` is a key of ``KINDS`` and ``obj`` the matched row."""
+
+    __slots__ = ("kind", "id", "rank", "snippet", "obj")
+
+    def __init__(self, kind, row_id, rank, snippet=None):
+        self.kind = kind
+        self.id = row_id
+        self.rank = rank
+        self.snippet = snippet
+        self.obj = None
+
+    @property
+    def cursor(self):
+        return encode_cursor(self.rank, self.kind, self.id)
+
+
+# ------------------------------
+# PostgreSQL
+# ------------------------------
+
+def _tsquery(text):
+    return func.websearch_to_tsquery(cast(SEARCH_CONFIG, REGCONFIG), text)
+
+
+def _postgres_hits(kind, text):
+    model = KINDS[kind]
+    vector = literal_column(f"{model.__tablename__}.search_vector")
+    query = _tsquery(text)
+    hits = select(
+        literal(kind).label("kind"),
+        model.id.label("id"),
+        func.ts_rank_cd(vector, query).label("rank"),
+        literal(None).label("snippet"),
+    ).where(vector.op("@@")(query))
+    if model is Source:
+        hits = hits.where(Source.is_active.is_(True))
+    return hits
+
+
+def _postgres_headline(kind, text):
+    model = KINDS[kind]
+    document = func.concat_ws(f" {ELLIPSIS} ", *(
+        getattr(model, column) for column, _ in SEARCH_COLUMNS[model.__tablename__]
+    ))
+    options = f"StartSel={HIGHLIGHT_START}, StopSel={HIGHLIGHT_STOP}, MaxFragments=2"
+    return func.ts_headline(cast(SEARCH_CONFIG, REGCONFIG), document, _tsquery(text), options)
+
+
+# ------------------------------
+# SQLite
+# ------------------------------
+
+def _fts5_query(text):
+    """Quote each word so user input cannot be read as FTS5 query syntax; all words must match."""
+    return " ".join(f'"{word}"' for word in re.findall(r"\w+", text))
+
+
+def _sqlite_hits(kind, text):
+    model = KINDS[kind]
+    name = fts_table(model.__tablename__)
+    fts = table(name, column("rowid"))
+    # FTS5 auxiliary functions and MATCH take the table itself as their first operand
+    fts_ref = literal_column(name)
+    weights = [BM25_WEIGHTS[weight] for _, weight in SEARCH_COLUMNS[model.__tablename__]]
+    hits = (
+        select(
+            literal(kind).label("kind"),
+            model.id.label("id"),
+            # bm25 is lower for better matches
+            (-func.bm25(fts_ref, *weights)).label("rank"),
+            func.snippet(fts_ref, -1, HIGHLIGHT_START, HIGHLIGHT_STOP, ELLIPSIS, 16).label("snippet"),
+        )
+        .select_from(fts)
+        .join(model, literal_column(f"{model.__tablename__}.rowid") == fts.c.rowid)
+        .where(fts_ref.op("MATCH")(_fts5_query(text)))
+    )
+    if model is Source:
+        hits = hits.where(Source.is_active.is_(True))
+    return hits
+
+
+# ------------------------------
+# Search
+# ------------------------------
+
+def search(text, kinds, limit, after=None):
+    """
+    Return ``(hits, has_more)`` for one page of matches of ``text`` in ``kinds``.
+
+    Hits are ``SearchHit`` objects ordered best first, with ``obj`` loaded.
+    ``after`` is the ``cursor`` of the last hit of the previous page.
+    """
+    postgres = db.session.get_bind().dialect.name == "postgresql"
+    if not postgres and not _fts5_query(text):
+        return [], False
+
+    build = _postgres_hits if postgres else _sqlite_hits
+    hits = union_all(*(build(kind, text) for kind in kinds)).subquery("hits")
+    query = select(hits)
+    if after:
+        rank, kind, row_id = decode_cursor(after)
+        query = query.where(or_(
+            hits.c.rank < rank,
+            and_(hits.c.rank == rank, tuple_(hits.c.kind, hits.c.id) > (kind, row_id)),
+        ))
+    query = query.order_by(hits.c.rank.desc(), hits.c.kind, hits.c.id).limit(limit + 1)
+
+    page = [SearchHit(*row) for row in db.session.execute(query)]
+    has_more = len(page) > limit
+    page = page[:limit]
+    _load(page, text, postgres)
+    return page, has_more
+
+
+def _load(page, text, postgres):
+    """Attach each hit's row (and, on PostgreSQL, its highlight) with one query per kind."""
+    for kind, model in KINDS.items():
+        by_id = {hit.id: hit for hit in page if hit.kind == kind}
+        if not by_id:
+            continue
+        query = strict_loading(db.session.query(model)).filter(model.id.in_(by_id))
+        if postgres:
+            query = query.add_columns(_postgres_headline(kind, text))
+        for row in query:
+            obj, snippet = row if postgres else (row, None)
+            hit = by_id[obj.id]
+            hit.obj = obj
+            if postgres:
+                hit.snippet = snippet
+
+
+# ------------------------------
+# Name lookup
+# ------------------------------
+
+def find_by_name(name, limit):
+    """
+    Return up to ``limit`` ``(individual, score)`` pairs whose surname sounds like ``name``'s.
+
+    The last word of ``name`` is the surname and the first word, if there is
+    more than one, the given name, which only affects the score.
+    """
+    words = name.split()
+    if not words:
+        return []
+    surname, given = words[-1], words[0] if len(words) > 1 else None
+    keys = name_keys(given, surname)
+    codes = {keys["surname_metaphone"], keys["surname_metaphone_alt"]} - {None}
+    postgres = db.session.get_bind().dialect.name == "postgresql"
+
+    matches = [
+        Individual.surname_metaphone.in_(codes),
+        Individual.surname_metaphone_alt.in_(codes),
+        Individual.surname_soundex == keys["surname_soundex"],
+    ]
+    score = (
+        case((func.lower(Individual.surname) == surname.lower(), 4.0), else_=0.0)
+        + case(
+            (Individual.surname_metaphone == keys["surname_metaphone"], 2.0),
+            (or_(Individual.surname_metaphone.in_(codes), Individual.surname_metaphone_alt.in_(codes)), 1.0),
+            else_=0.0,
+        )
+        + case((Individual.surname_soundex == keys["surname_soundex"], 1.0), else_=0.0)
+    )
+    if postgres:
+        matches.append(Individual.surname.op("%")(surname))
+        score = score + func.similarity(Individual.surname, surname)
+    if given:
+        score = score + case(
+            (func.lower(Individual.given_names).startswith(given.lower(), autoescape=True), 2.0),
+            (Individual.given_name_metaphone == keys["given_name_metaphone"], 1.0),
+            else_=0.0,
+        )
+
+    score = score.label("score")
+    query = (
+        strict_loading(db.session.query(Individual, score))
+        .filter(or_(*matches))
+        .order_by(score.desc(), Individual.surname, Individual.given_names, Individual.id)
+        .limit(limit)
+    )
+    return query.all()
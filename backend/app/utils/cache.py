@@ -0,0 +1,215 @@
+"""
+Response cache for read endpoints.
+
+A cached view's key is its path and query string plus the current version of
+each of its tags, e.g. ``source:<id>`` for one source and ``source`` for the
+source listing. Every write to a cached table calls ``invalidate``, which
+bumps those versions: the write routes, bulk upserts, merges and the GEDCOM
+importer (from a request, ``flask import-gedcom`` or a job). Entries under the
+old versions are never looked up again and age out of the cache. Nothing has
+to be deleted, so invalidation costs one increment per tag.
+
+Responses carry an ETag hashed from the cached body and ``Cache-Control:
+no-cache``, so polling clients revalidate and get ``304 Not Modified``
+without a body for as long as the representation has not changed. The ETag
+is stored with the entry, so a revalidation answered from the cache runs no
+query and serializes nothing.
+
+``RESPONSE_CACHE_BACKEND`` chooses where entries live: ``redis`` (shared by
+all workers; needs the ``redis`` package and ``RESPONSE_CACHE_REDIS_URL``),
+``memory`` (a per-worker LRU with a TTL) or ``none``. Caching is off unless
+``RESPONSE_CACHE_REDIS_URL`` is set or a backend is chosen explicitly. The
+memory backend is only correct with a single process writing: a write only
+invalidates the worker that served it, so other workers, CLI commands and
+``flask worker`` jobs leave it serving the previous version for up to
+``RESPONSE_CACHE_TTL`` seconds.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import Response, current_app, request
+
+from app.utils.pagination import wants_ndjson
+
+try:
+    import redis
+except ImportError:  # optional, only needed for the redis backend
+    redis = None
+
+# Response headers stored with a cached body
+CACHED_HEADERS = ("X-Next-Cursor", "Link")
+
+
+class CacheEntry:
+    __slots__ = ("body", "mimetype", "etag", "headers")
+
+    def __init__(self, body, mimetype, etag, headers):
+        self.body = body
+        self.mimetype = mimetype
+        self.etag = etag
+        self.headers = headers
+
+
+class MemoryCache:
+    """LRU of at most ``max_entries`` entries, each kept for ``ttl`` seconds."""
+
+    def __init__(self, max_entries, ttl):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.tag_versions = {}
+        self.lock = threading.Lock()
+
+    def get(self, key):
+        with self.lock:
+            item = self.entries.get(key)
+            if item is None:
+                return None
+            expires, entry = item
+            if expires < time.monotonic():
+                del self.entries[key]
+                return None
+            self.entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self.lock:
+            self.entries[key] = (time.monotonic() + self.ttl, entry)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def versions(self, tags):
+        with self.lock:
+            return [self.tag_versions.get(tag, 0) for tag in tags]
+
+    def bump(self, tags):
+        with self.lock:
+            for tag in tags:
+                self.tag_versions[tag] = self.tag_versions.get(tag, 0) + 1
+
+
+class RedisCache:
+    """Entries and tag versions in Redis, shared by every worker."""
+
+    def __init__(self, url, ttl, prefix="response-cache:"):
+        if redis is None:
+            raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs the 'redis' package.")
+        self.client = redis.Redis.from_url(url)
+        self.ttl = ttl
+        self.prefix = prefix
+
+    def get(self, key):
+        try:
+            raw = self.client.get(self.prefix + key)
+        except redis.RedisError:
+            return None
+        if raw is None:
+            return None
+        data = json.loads(raw)
+        return CacheEntry(data["body"].encode(), data["mimetype"], data["etag"], data["headers"])
+
+    def set(self, key, entry):
+        data = {
+            "body": entry.body.decode(), "mimetype": entry.mimetype, "etag": entry.etag, "headers": entry.headers,
+        }
+        try:
+            self.client.set(self.prefix + key, json.dumps(data), ex=self.ttl)
+        except redis.RedisError:
+            pass
+
+    def versions(self, tags):
+        try:
+            values = self.client.mget([f"{self.prefix}tag:{tag}" for tag in tags])
+        except redis.RedisError:
+            return None
+        return [int(value or 0) for value in values]
+
+    def bump(self, tags):
+        try:
+            with self.client.pipeline(transaction=False) as pipeline:
+                for tag in tags:
+                    pipeline.incr(f"{self.prefix}tag:{tag}")
+                pipeline.execute()
+        except redis.RedisError:
+            current_app.logger.warning("Could not invalidate cached responses for %s", ", ".join(tags))
+
+
+def get_cache():
+    """Return this app's response cache, or None when caching is disabled."""
+    state = current_app.extensions.get("response_cache")
+    if state is None:
+        config = current_app.config
+        backend, ttl = config["RESPONSE_CACHE_BACKEND"], config["RESPONSE_CACHE_TTL"]
+        if backend == "none" or ttl <= 0:
+            cache = None
+        elif backend == "redis":
+            if not config["RESPONSE_CACHE_REDIS_URL"]:
+                raise RuntimeError("RESPONSE_CACHE_BACKEND=redis needs RESPONSE_CACHE_REDIS_URL.")
+            cache = RedisCache(config["RESPONSE_CACHE_REDIS_URL"], ttl)
+        else:
+            cache = MemoryCache(config["RESPONSE_CACHE_MAX_ENTRIES"], ttl)
+        state = current_app.extensions.setdefault("response_cache", {"cache": cache})
+    return state["cache"]
+
+
+def invalidate(kind, *row_ids, all_rows=False):
+    """
+    Drop cached responses of ``kind`` (e.g. ``"source"``) after a write.
+
+    Listings of ``kind`` are always dropped, along with the rows ``row_ids``,
+    or every row of ``kind`` when ``all_rows`` is set.
+    """
+    cache = get_cache()
+    if cache is None:
+        return
+    tags = [kind] + [f"{kind}:{row_id}" for row_id in row_ids]
+    if all_rows:
+        tags.append(f"{kind}:*")
+    cache.bump(tags)
+
+
+def cached(kind, row_arg=None):
+    """
+    Cache a GET view's successful JSON responses and answer conditional requests.
+
+    ``row_arg`` names the view argument holding a row id; the view is then
+    cached under that row of ``kind``, otherwise under the listing of ``kind``.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = get_cache()
+            if cache is None or wants_ndjson():
+                return view(*args, **kwargs)
+
+            tags = [f"{kind}:{kwargs[row_arg]}", f"{kind}:*"] if row_arg else [kind]
+            versions = cache.versions(tags)
+            if versions is None:
+                return view(*args, **kwargs)
+            params = "&".join(f"{name}={value}" for name, value in sorted(request.args.items(multi=True)))
+            key = f"{request.path}?{params}|{','.join(map(str, versions))}"
+
+            entry = cache.get(key)
+            if entry is None:
+                response = current_app.make_response(view(*args, **kwargs))
+                if response.status_code != 200 or response.mimetype != "application/json":
+                    return response
+                body = response.get_data()
+                entry = CacheEntry(
+                    body, response.mimetype, hashlib.sha1(body).hexdigest(),
+                    {name: response.headers[name] for name in CACHED_HEADERS if name in response.headers},
+                )
+                cache.set(key, entry)
+
+            response = Response(entry.body, mimetype=entry.mimetype, headers=entry.headers)
+            response.set_etag(entry.etag)
+            response.headers["Cache-Control"] = "no-cache"
+            return response.make_conditional(request)
+        return wrapper
+    return decorator
@@ -0,0 +1,131 @@
+"""
+Database engine options and connection pool metrics.
+
+SQLAlchemy's defaults (five pooled connections, no liveness check, no
+recycling) stall gunicorn workers under load and hand out connections that
+the server or a firewall has already closed. ``engine_options`` builds
+``SQLALCHEMY_ENGINE_OPTIONS`` from the ``DB_*`` settings instead: pool size
+and overflow, checkout timeout, pre-ping, recycling and a per-statement
+timeout. A ``SQLALCHEMY_ENGINE_OPTIONS`` set explicitly in the config wins.
+
+With ``DB_PGBOUNCER`` the application runs behind PgBouncer in transaction
+pooling mode: PgBouncer does the pooling, so SQLAlchemy opens a connection
+per checkout (``NullPool``), server-side prepared statements are turned off
+because consecutive transactions can land on different server connections,
+and the statement timeout is applied per transaction with ``SET LOCAL``
+because PgBouncer does not forward startup options.
+
+Only PostgreSQL URIs are tuned; other databases (SQLite in tests) keep
+SQLAlchemy's defaults.
+"""
+
+import threading
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool
+
+from app import db
+
+
+def engine_options(config):
+    """Return the ``create_engine`` options for ``config``'s database URI and ``DB_*`` settings."""
+    url = make_url(config["SQLALCHEMY_DATABASE_URI"])
+    if url.get_backend_name() != "postgresql":
+        return {}
+
+    if config["DB_PGBOUNCER"]:
+        options = {"poolclass": NullPool}
+        if url.get_driver_name() == "psycopg":
+            # psycopg 3 prepares repeated statements; psycopg2 never does
+            options["connect_args"] = {"prepare_threshold": None}
+        return options
+
+    options = {
+        "pool_size": config["DB_POOL_SIZE"],
+        "max_overflow": config["DB_MAX_OVERFLOW"],
+        "pool_timeout": config["DB_POOL_TIMEOUT"],
+        "pool_recycle": config["DB_POOL_RECYCLE"],
+        "pool_pre_ping": config["DB_POOL_PRE_PING"],
+    }
+    if config["DB_STATEMENT_TIMEOUT"]:
+        options["connect_args"] = {"options": f"-c statement_timeout={config['DB_STATEMENT_TIMEOUT']}"}
+    return options
+
+
+class PoolMetrics:
+    """Counts connection checkouts and how long connections are held, from pool events."""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.lock = threading.Lock()
+        self.checkouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.held_seconds = 0.0
+        self.max_held_seconds = 0.0
+
+        event.listen(engine, "connect", self._connect)
+        event.listen(engine, "checkout", self._checkout)
+        event.listen(engine, "checkin", self._checkin)
+        event.listen(engine, "invalidate", self._invalidate)
+
+    def _connect(self, dbapi_connection, connection_record):
+        with self.lock:
+            self.connects += 1
+
+    def _checkout(self, dbapi_connection, connection_record, connection_proxy):
+        connection_record.info["checked_out_at"] = time.perf_counter()
+        with self.lock:
+            self.checkouts += 1
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def _checkin(self, dbapi_connection, connection_record):
+        started = connection_record.info.pop("checked_out_at", None)
+        if started is None:
+            return
+        held = time.perf_counter() - started
+        with self.lock:
+            self.checked_out -= 1
+            self.held_seconds += held
+            self.max_held_seconds = max(self.max_held_seconds, held)
+
+    def _invalidate(self, dbapi_connection, connection_record, exception):
+        with self.lock:
+            self.invalidations += 1
+
+    def snapshot(self):
+        """Return the counters, plus the pool's own occupancy where the pool class reports it."""
+        pool = self.engine.pool
+        with self.lock:
+            data = {
+                "pool": type(pool).__name__,
+                "checkouts": self.checkouts,
+                "connects": self.connects,
+                "invalidations": self.invalidations,
+                "checked_out": self.checked_out,
+                "max_checked_out": self.max_checked_out,
+                "held_seconds_total": round(self.held_seconds, 6),
+                "held_seconds_max": round(self.max_held_seconds, 6),
+            }
+        for key in ("size", "checkedin", "overflow"):
+            if hasattr(pool, key):
+                data[f"pool_{key}"] = getattr(pool, key)()
+        return data
+
+
+def init_db_pool(app):
+    """Attach pool metrics (and, behind PgBouncer, the per-transaction statement timeout) to ``app``'s engine."""
+    with app.app_context():
+        engine = db.engine
+    app.extensions["db_pool"] = PoolMetrics(engine)
+
+    timeout = app.config["DB_STATEMENT_TIMEOUT"]
+    if app.config["DB_PGBOUNCER"] and timeout and engine.dialect.name == "postgresql":
+        @event.listens_for(engine, "begin")
+        def _statement_timeout(connection):
+            connection.exec_driver_sql(f"SET LOCAL statement_timeout = {int(timeout)}")
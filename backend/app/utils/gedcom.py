@@ -0,0 +1,184 @@
+"""
+GEDCOM 5.5.1 line-level parsing and formatting.
+
+Files are read one line at a time and assembled into one level-0 record at a
+time, so memory use depends on the largest record rather than the file size.
+"""
+
+import calendar
+import re
+from datetime import date
+
+MONTHS = {name.upper(): number for number, name in enumerate(calendar.month_abbr) if name}
+MONTH_NAMES = {number: name for name, number in MONTHS.items()}
+
+DATE_QUALIFIERS = ("ABT", "CAL", "EST", "BEF", "AFT", "FROM", "TO", "BET", "INT")
+
+LINE_RE = re.compile(r"^\s*(\d+)\s+(?:(@[^@]+@)\s+)?(\S+)(?:\s(.*))?$")
+
+# Individual/family event tags and the seeded FactType key they map to
+EVENT_FACT_TYPES = {
+    "BIRT": "birth",
+    "DEAT": "death",
+    "MARR": "marriage",
+    "DIV": "divorce",
+    "RESI": "residence",
+    "OCCU": "occupation",
+    "EDUC": "education",
+    "IMMI": "immigration",
+    "EMIG": "emigration",
+    "NATU": "naturalization",
+    "RELI": "religion",
+    "BAPM": "baptism",
+    "CHR": "baptism",
+    "BURI": "burial",
+    "ADOP": "adoption",
+    "CENS": "census",
+    "WILL": "will",
+    "PROP": "property",
+    "EVEN": "event",
+}
+
+# FactType key -> tag used on export; keys shared by several tags use the first
+FACT_TYPE_EVENTS = {}
+for _tag, _key in EVENT_FACT_TYPES.items():
+    FACT_TYPE_EVENTS.setdefault(_key, _tag)
+
+
+class GedcomSyntaxError(ValueError):
+    """Raised for a line that is not ``level [@xref@] TAG [value]``."""
+
+    def __init__(self, line_number, line):
+        super().__init__(f"Line {line_number}: cannot parse {line!r}")
+        self.line_number = line_number
+
+
+class GedcomNode:
+    """One GEDCOM line together with its subordinate lines."""
+
+    __slots__ = ("level", "xref", "tag", "value", "children")
+
+    def __init__(self, level, xref, tag, value):
+        self.level = level
+        self.xref = xref
+        self.tag = tag
+        self.value = value
+        self.children = []
+
+    def first(self, tag):
+        return next((child for child in self.children if child.tag == tag), None)
+
+    def all(self, tag):
+        return [child for child in self.children if child.tag == tag]
+
+    def value_of(self, tag):
+        child = self.first(tag)
+        return child.value if child is not None else None
+
+    def __repr__(self):
+        return f"<GedcomNode {self.level} {self.xref or ''} {self.tag}>"
+
+
+def iter_records(lines):
+    """
+    Yield each level-0 record of a GEDCOM stream as a ``GedcomNode`` tree.
+
+    ``CONT``/``CONC`` lines are folded into their parent's value. Blank lines
+    are skipped; anything else that does not parse raises ``GedcomSyntaxError``.
+    """
+    record = None
+    stack = []
+    for line_number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if not line.strip():
+            continue
+        match = LINE_RE.match(line)
+        if match is None:
+            raise GedcomSyntaxError(line_number, line)
+        level, xref, tag, value = int(match.group(1)), match.group(2), match.group(3), match.group(4)
+
+        if level == 0:
+            if record is not None:
+                yield record
+            record = GedcomNode(0, xref, tag, value)
+            stack = [record]
+            continue
+        if record is None:
+            raise GedcomSyntaxError(line_number, line)
+
+        while len(stack) > level:
+            stack.pop()
+        parent = stack[-1]
+        if tag in ("CONT", "CONC"):
+            separator = "\n" if tag == "CONT" else ""
+            parent.value = (parent.value or "") + separator + (value or "")
+            continue
+        node = GedcomNode(level, xref, tag, value)
+        parent.children.append(node)
+        stack.append(node)
+
+    if record is not None:
+        yield record
+
+
+def parse_name(value):
+    """Split a ``NAME`` value such as ``John Henry /Smith/`` into ``(given_names, surname)``."""
+    if not value:
+        return "", ""
+    match = re.match(r"^(.*?)/(.*?)/(.*)$", value)
+    if match is None:
+        return value.strip(), ""
+    given = " ".join(part.strip() for part in (match.group(1), match.group(3)) if part.strip())
+    return given, match.group(2).strip()
+
+
+def parse_date(value):
+    """
+    Return the earliest calendar date a GEDCOM date phrase can refer to, or None.
+
+    Qualifiers (``ABT``, ``BEF``, ``BET ... AND ...`` and so on) are dropped and
+    partial dates resolve to the first day of their month or year.
+    """
+    if not value:
+        return None
+    tokens = [token for token in value.upper().replace(",", " ").split() if token not in DATE_QUALIFIERS]
+    if "AND" in tokens:
+        tokens = tokens[:tokens.index("AND")]
+    try:
+        if len(tokens) >= 3 and tokens[1] in MONTHS:
+            return date(int(tokens[2]), MONTHS[tokens[1]], int(tokens[0]))
+        if len(tokens) >= 2 and tokens[0] in MONTHS:
+            return date(int(tokens[1]), MONTHS[tokens[0]], 1)
+        if tokens:
+            return date(int(tokens[0]), 1, 1)
+    except ValueError:
+        return None
+    return None
+
+
+def format_date(value):
+    """Format a ``date`` the way GEDCOM writes it, e.g. ``12 MAR 1890``."""
+    return f"{value.day} {MONTH_NAMES[value.month]} {value.year}"
+
+
+def format_line(level, tag, value=None, xref=None, max_length=248):
+    """
+    Return the GEDCOM line(s) for ``tag``, newline-terminated.
+
+    Embedded newlines become ``CONT`` lines and values longer than
+    ``max_length`` characters are continued with ``CONC``.
+    """
+    head = f"{level} {xref} {tag}" if xref else f"{level} {tag}"
+    if value is None or value == "":
+        return head + "\n"
+
+    lines = []
+    for paragraph, text in enumerate(str(value).split("\n")):
+        chunks = [text[i:i + max_length] for i in range(0, len(text), max_length)] or [""]
+        for position, chunk in enumerate(chunks):
+            if paragraph == 0 and position == 0:
+                lines.append(f"{head} {chunk}")
+            else:
+                continuation = f"{level + 1} {'CONC' if position else 'CONT'}"
+                lines.append(f"{continuation} {chunk}" if chunk else continuation)
+    return "\n".join(lines) + "\n"
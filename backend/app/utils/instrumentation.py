@@ -0,0 +1,236 @@
+"""
+Opt-in per-request query and serialization instrumentation.
+
+With ``QUERY_INSTRUMENTATION`` enabled, SQLAlchemy cursor events count every
+statement a request executes and time it, and the JSON provider and
+``paginated_response`` time serialization. Each response then carries a
+``Server-Timing`` header (``db``, ``serialize`` and ``total``, with the
+statement count in the ``db`` description) that browser dev tools show per
+request, and the figures are added to per-endpoint histograms served in
+Prometheus text format at ``/api/_metrics``.
+
+Statements slower than ``SLOW_QUERY_MS`` are logged with the endpoint (or
+CLI command) that issued them.
+
+The histograms live in the worker process, so with several gunicorn workers
+each scrape sees one worker's share. Streaming an NDJSON body happens after
+the response is returned and is not included.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import g, has_request_context, request
+from sqlalchemy import event
+
+from app import db
+
+REQUEST_SECONDS_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200, 500)
+
+# Longest statement text written to the slow-query log
+SLOW_QUERY_LOG_CHARS = 2000
+
+
+class RequestStats:
+    """Figures for the request being served, kept on ``flask.g``."""
+
+    __slots__ = ("started", "queries", "db_seconds", "serialize_seconds", "serialize_depth")
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+        self.serialize_depth = 0
+
+
+class Histogram:
+    """A Prometheus histogram with one series per tuple of label values."""
+
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, labels, value):
+        series = self.series.setdefault(labels, {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0})
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                series["buckets"][index] += 1
+        series["sum"] += value
+        series["count"] += 1
+
+    def render(self, label_names):
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        for labels, series in sorted(self.series.items()):
+            pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(label_names, labels))
+            for bound, count in zip(self.buckets, series["buckets"]):
+                lines.append(f'{self.name}_bucket{{{pairs},le="{bound:g}"}} {count}')
+            lines.append(f'{self.name}_bucket{{{pairs},le="+Inf"}} {series["count"]}')
+            lines.append(f'{self.name}_sum{{{pairs}}} {series["sum"]:.6f}')
+            lines.append(f'{self.name}_count{{{pairs}}} {series["count"]}')
+        return lines
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class RequestMetrics:
+    """Per-endpoint histograms of request, database and serialization time and statement counts."""
+
+    LABELS = ("endpoint", "method")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.histograms = {
+            "total": Histogram("http_request_duration_seconds", "Time to build a response.",
+                               REQUEST_SECONDS_BUCKETS),
+            "db": Histogram("http_request_db_seconds", "Time spent executing SQL statements per request.",
+                            REQUEST_SECONDS_BUCKETS),
+            "serialize": Histogram("http_request_serialize_seconds", "Time spent serializing per request.",
+                                   REQUEST_SECONDS_BUCKETS),
+            "queries": Histogram("http_request_db_statements", "SQL statements executed per request.",
+                                 QUERY_COUNT_BUCKETS),
+        }
+
+    def observe(self, endpoint, method, stats, total):
+        labels = (endpoint, method)
+        with self.lock:
+            self.histograms["total"].observe(labels, total)
+            self.histograms["db"].observe(labels, stats.db_seconds)
+            self.histograms["serialize"].observe(labels, stats.serialize_seconds)
+            self.histograms["queries"].observe(labels, stats.queries)
+
+    def render(self):
+        with self.lock:
+            lines = []
+            for histogram in self.histograms.values():
+                lines += histogram.render(self.LABELS)
+        return lines
+
+
+def render_metrics(app):
+    """Return ``app``'s request histograms and connection pool counters in Prometheus text format."""
+    lines = []
+    metrics = app.extensions.get("request_metrics")
+    if metrics is not None:
+        lines += metrics.render()
+
+    pool = app.extensions.get("db_pool")
+    if pool is not None:
+        snapshot = pool.snapshot()
+        for name, key, kind, help_text in (
+            ("db_pool_checkouts_total", "checkouts", "counter", "Connections checked out of the pool."),
+            ("db_pool_connects_total", "connects", "counter", "New database connections opened."),
+            ("db_pool_invalidations_total", "invalidations", "counter", "Connections invalidated after an error."),
+            ("db_pool_checked_out", "checked_out", "gauge", "Connections currently checked out."),
+            ("db_pool_held_seconds_total", "held_seconds_total", "counter", "Seconds connections were held."),
+        ):
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} {kind}", f"{name} {snapshot[key]}"]
+    return "\n".join(lines) + "\n"
+
+
+# ------------------------------
+# Timing
+# ------------------------------
+
+def _request_stats():
+    if has_request_context():
+        return g.get("request_stats")
+    return None
+
+
+@contextmanager
+def serializing():
+    """Count the enclosed block as serialization time of the current request; nested blocks count once."""
+    stats = _request_stats()
+    if stats is None:
+        yield
+        return
+    stats.serialize_depth += 1
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_depth -= 1
+        if stats.serialize_depth == 0:
+            stats.serialize_seconds += time.perf_counter() - started
+
+
+def _timed(method):
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        with serializing():
+            return method(*args, **kwargs)
+    return wrapper
+
+
+def _server_timing(stats, total):
+    return ", ".join([
+        f'db;dur={stats.db_seconds * 1000:.1f};desc="statements: {stats.queries}"',
+        f"serialize;dur={stats.serialize_seconds * 1000:.1f}",
+        f"total;dur={total * 1000:.1f}",
+    ])
+
+
+# ------------------------------
+# Setup
+# ------------------------------
+
+def init_instrumentation(app):
+    """Log slow statements of ``app``'s engine and, with ``QUERY_INSTRUMENTATION``, instrument its requests."""
+    with app.app_context():
+        engine = db.engine
+    threshold = app.config["SLOW_QUERY_MS"] / 1000
+    enabled = app.config["QUERY_INSTRUMENTATION"]
+    if not enabled and not threshold:
+        return
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_cursor_execute(connection, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - connection.info["query_started"].pop()
+        stats = _request_stats()
+        if stats is not None:
+            stats.queries += 1
+            stats.db_seconds += elapsed
+        if threshold and elapsed >= threshold:
+            source = f"{request.method} {request.endpoint}" if has_request_context() else "outside a request"
+            app.logger.warning("Slow query (%.0f ms) from %s: %s",
+                               elapsed * 1000, source, statement[:SLOW_QUERY_LOG_CHARS])
+
+    @event.listens_for(engine, "handle_error")
+    def _handle_error(context):
+        started = context.connection.info.get("query_started") if context.connection is not None else None
+        if started:
+            started.pop()
+
+    if not enabled:
+        return
+
+    metrics = app.extensions.setdefault("request_metrics", RequestMetrics())
+    app.json.response = _timed(app.json.response)
+    app.json.dumps = _timed(app.json.dumps)
+
+    @app.before_request
+    def _start_request_stats():
+        g.request_stats = RequestStats()
+
+    @app.after_request
+    def _record_request_stats(response):
+        stats = g.pop("request_stats", None)
+        if stats is None:
+            return response
+        total = time.perf_counter() - stats.started
+        response.headers["Server-Timing"] = _server_timing(stats, total)
+        if request.endpoint != "api.get_metrics":
+            metrics.observe(request.endpoint or "unmatched", request.method, stats, total)
+        return response
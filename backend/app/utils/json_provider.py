@@ -0,0 +1,43 @@
+"""
+orjson-backed Flask JSON provider.
+
+Enabled with ``JSON_PROVIDER=orjson``. orjson encodes dicts several times
+faster than the standard library and natively handles the UUIDs, dates and
+enums that would otherwise need converting, so ``jsonify`` and NDJSON
+streaming both get cheaper. Keys are not sorted, unlike Flask's default
+provider.
+"""
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # optional, only needed for JSON_PROVIDER=orjson
+    orjson = None
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """Encode and decode with orjson, falling back to Flask's conversions for other types."""
+
+    option = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, default=self.default, option=self.option).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        indent = (self.compact is None and self._app.debug) or self.compact is False
+        option = self.option | (orjson.OPT_INDENT_2 if indent else 0)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=option) + b"\n", mimetype=self.mimetype)
+
+
+def init_json_provider(app):
+    """Install the JSON provider named by ``JSON_PROVIDER`` (``default`` or ``orjson``)."""
+    if app.config["JSON_PROVIDER"] == "orjson":
+        if orjson is None:
+            raise RuntimeError("JSON_PROVIDER=orjson needs the 'orjson' package.")
+        app.json = OrjsonProvider(app)
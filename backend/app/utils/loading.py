@@ -0,0 +1,21 @@
+"""
+Lazy-load guard for API queries.
+
+The API serializers read columns only: they are compiled from the model's
+columns (app.utils.serialization) and fact and source types come from the
+lookup cache (app.utils.lookups), so listing rows needs no eager loading.
+
+With ``EAGER_LOADING_STRICT`` enabled every relationship is marked
+``raiseload`` so a serializer that starts reading one fails loudly instead of
+silently issuing one lazy SELECT per row.
+"""
+
+from flask import current_app
+from sqlalchemy.orm import raiseload
+
+
+def strict_loading(query):
+    """Mark every relationship of ``query``'s rows ``raiseload`` when ``EAGER_LOADING_STRICT`` is on."""
+    if current_app.config.get("EAGER_LOADING_STRICT"):
+        return query.options(raiseload("*"))
+    return query
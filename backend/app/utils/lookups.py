@@ -0,0 +1,111 @@
+"""
+Process-wide cache of the ``source_types`` and ``fact_types`` lookup tables.
+
+Both tables are tiny and change only when seeded or edited by an admin, yet
+every fact and source serialization and every write naming a type by key
+would otherwise go to the database for them. Each worker keeps the rows by id
+and by key, loaded when the app is created.
+
+Staleness is detected with the version counters in ``lookup_versions``
+(see app.models.lookup), which every write to these tables bumps. A worker
+compares its versions with the database at most once every
+``LOOKUP_CACHE_CHECK_INTERVAL`` seconds and reloads when they differ, so an
+edit reaches all workers within that interval. Writes made in the same
+process take effect immediately.
+"""
+
+import threading
+import time
+
+from flask import current_app
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+
+from app import db
+from app.models.lookup import LOOKUP_MODELS, LookupVersion
+
+
+class LookupRow:
+    """A detached copy of one lookup row, safe to share between requests."""
+
+    __slots__ = ("id", "key", "label", "description", "is_active")
+
+    def __init__(self, id, key, label, description, is_active=True):
+        self.id = id
+        self.key = key
+        self.label = label
+        self.description = description
+        self.is_active = is_active
+
+
+class LookupTable:
+    """The rows of one lookup table by id and by key."""
+
+    def __init__(self, rows):
+        self.by_id = {row.id: row for row in rows}
+        self.by_key = {row.key: row for row in rows}
+
+    def key_of(self, row_id):
+        row = self.by_id.get(row_id)
+        return row.key if row else None
+
+    def id_of(self, key):
+        row = self.by_key.get(key)
+        return row.id if row else None
+
+
+class LookupCache:
+    def __init__(self, check_interval):
+        self.check_interval = check_interval
+        self.tables = {}
+        self.versions = None
+        self.checked_at = None
+        self.lock = threading.Lock()
+
+    def table(self, model):
+        if self.checked_at is None or time.monotonic() - self.checked_at >= self.check_interval:
+            self.refresh()
+        return self.tables[model.__tablename__]
+
+    def refresh(self, force=False):
+        """Reload the tables if their versions changed (or always, with ``force``)."""
+        with self.lock:
+            versions = dict(db.session.execute(select(LookupVersion.table_name, LookupVersion.version)).all())
+            if force or versions != self.versions or not self.tables:
+                tables = {}
+                for model in LOOKUP_MODELS:
+                    columns = [model.id, model.key, model.label, model.description]
+                    if "is_active" in model.__mapper__.column_attrs:
+                        columns.append(model.is_active)
+                    tables[model.__tablename__] = LookupTable(
+                        [LookupRow(*row) for row in db.session.execute(select(*columns))])
+                self.tables = tables
+            self.versions = versions
+            self.checked_at = time.monotonic()
+
+    def expire(self):
+        self.checked_at = None
+
+
+def get_lookup_cache():
+    cache = current_app.extensions.get("lookups")
+    if cache is None:
+        cache = current_app.extensions.setdefault(
+            "lookups", LookupCache(current_app.config["LOOKUP_CACHE_CHECK_INTERVAL"]))
+    return cache
+
+
+def lookup(model):
+    """Return the cached ``LookupTable`` of ``model`` (``SourceType`` or ``FactType``)."""
+    return get_lookup_cache().table(model)
+
+
+def init_lookups(app):
+    """Warm ``app``'s lookup cache; skipped while the tables do not exist yet (e.g. before migrating)."""
+    with app.app_context():
+        try:
+            get_lookup_cache().refresh(force=True)
+        except SQLAlchemyError as exc:
+            app.logger.info("Lookup cache not warmed: %s", exc.__class__.__name__)
+        finally:
+            db.session.remove()
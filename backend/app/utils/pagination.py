@@ -0,0 +1,146 @@
+"""
+Keyset pagination and NDJSON streaming for collection endpoints.
+
+Collections are ordered by ``(created_at, id)`` so a page can be resumed with
+an indexed range scan instead of an ``OFFSET`` that grows with the tree.
+"""
+
+import base64
+from itertools import islice
+from datetime import datetime
+from uuid import UUID
+
+from flask import Response, current_app, jsonify, request, stream_with_context, url_for
+from sqlalchemy import DateTime, String, literal, tuple_
+from sqlalchemy.types import TypeDecorator
+
+from app.utils.instrumentation import serializing
+
+NDJSON_MIMETYPE = "application/x-ndjson"
+
+
+class InvalidCursor(ValueError):
+    """Raised when an ``after`` cursor cannot be decoded."""
+
+
+class CursorTimestamp(TypeDecorator):
+    """
+    Binds a cursor's ``created_at`` in the format the column is stored in.
+
+    SQLite compares timestamps as text. ``server_default=now()`` writes
+    ``YYYY-MM-DD HH:MM:SS``, but a bound datetime is rendered with six
+    fractional digits and so sorts after every row of its second, skipping
+    the rest of a tie. Other databases compare real timestamps.
+    """
+
+    impl = DateTime
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name == "sqlite":
+            return dialect.type_descriptor(String())
+        return dialect.type_descriptor(DateTime())
+
+    def process_bind_param(self, value, dialect):
+        if dialect.name == "sqlite" and value is not None:
+            return value.isoformat(" ", "microseconds" if value.microsecond else "seconds")
+        return value
+
+
+def encode_cursor(created_at, row_id):
+    raw = f"{created_at.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        created_at, row_id = base64.urlsafe_b64decode(padded).decode().split("|", 1)
+        return datetime.fromisoformat(created_at), UUID(row_id)
+    except (ValueError, UnicodeDecodeError) as exc:
+        raise InvalidCursor(cursor) from exc
+
+
+def parse_limit(value):
+    """Return the requested page size clamped to ``PAGINATION_MAX_LIMIT``, or None."""
+    if value is None:
+        return None
+    limit = int(value)
+    if limit < 1:
+        raise ValueError("limit must be positive")
+    return min(limit, current_app.config["PAGINATION_MAX_LIMIT"])
+
+
+def wants_ndjson():
+    if request.args.get("format") == "ndjson":
+        return True
+    return request.accept_mimetypes.best == NDJSON_MIMETYPE
+
+
+def apply_keyset(query, model, after):
+    """Order ``query`` by ``(created_at, id)`` and start it after ``after``."""
+    if after:
+        created_at, row_id = decode_cursor(after)
+        cursor = tuple_(literal(created_at, CursorTimestamp()), literal(row_id, model.id.type))
+        query = query.filter(tuple_(model.created_at, model.id) > cursor)
+    return query.order_by(model.created_at, model.id)
+
+
+def paginated_response(query, model, serializer, prepare=None):
+    """
+    Return one keyset page of ``query`` as a JSON list, or stream it as NDJSON.
+
+    ``limit`` bounds the page size and ``after`` resumes from the cursor sent
+    in the ``X-Next-Cursor`` (and ``Link: rel="next"``) header of the previous
+    page. Passing ``format=ndjson`` or ``Accept: application/x-ndjson`` streams
+    the remaining rows from a server-side cursor instead of building a page.
+
+    ``prepare``, if given, is called with each page (or streamed batch) of
+    rows before serialization, e.g. to bulk-load related objects.
+    """
+    try:
+        limit = parse_limit(request.args.get("limit"))
+        query = apply_keyset(query, model, request.args.get("after"))
+    except InvalidCursor:
+        return jsonify({"error": "Invalid 'after' cursor."}), 400
+    except ValueError:
+        return jsonify({"error": "'limit' must be a positive integer."}), 400
+
+    if wants_ndjson():
+        return stream_ndjson(query if limit is None else query.limit(limit), serializer, prepare)
+
+    limit = limit or current_app.config["PAGINATION_DEFAULT_LIMIT"]
+    rows = query.limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    if prepare is not None:
+        prepare(rows)
+
+    with serializing():
+        response = jsonify([serializer(r) for r in rows])
+    if has_more:
+        set_next_page(response, encode_cursor(rows[-1].created_at, rows[-1].id), limit)
+    return response
+
+
+def set_next_page(response, cursor, limit):
+    """Point ``response`` at the next page via ``X-Next-Cursor`` and ``Link: rel="next"``."""
+    args = {**request.args.to_dict(), "after": cursor, "limit": limit}
+    next_url = url_for(request.endpoint, **(request.view_args or {}), **args)
+    response.headers["X-Next-Cursor"] = cursor
+    response.headers["Link"] = f'<{next_url}>; rel="next"'
+
+
+def stream_ndjson(query, serializer, prepare=None):
+    """Stream ``query`` one JSON document per line, fetching ``STREAM_BATCH_SIZE`` rows at a time."""
+    batch_size = current_app.config["STREAM_BATCH_SIZE"]
+    rows = iter(query.yield_per(batch_size))
+
+    def generate():
+        while batch := list(islice(rows, batch_size)):
+            if prepare is not None:
+                prepare(batch)
+            for row in batch:
+                yield current_app.json.dumps(serializer(row)) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype=NDJSON_MIMETYPE)
@@ -0,0 +1,415 @@
+"""
+Phonetic keys for name matching.
+
+``soundex`` is American Soundex; ``double_metaphone`` follows Lawrence
+Philips' Double Metaphone, which returns a primary and an alternate key so
+that spellings from different language origins meet, e.g. "Schmidt" (XMT,
+SMT) and "Smith" (SM0, XMT). Accents are folded away before encoding.
+"""
+
+import re
+import unicodedata
+
+KEY_LENGTH = 4
+
+SOUNDEX_CODES = {
+    **dict.fromkeys("BFPV", "1"),
+    **dict.fromkeys("CGJKQSXZ", "2"),
+    **dict.fromkeys("DT", "3"),
+    "L": "4",
+    **dict.fromkeys("MN", "5"),
+    "R": "6",
+}
+
+VOWELS = frozenset("AEIOUY")
+
+
+def _fold(value):
+    """Upper-case ``value`` and strip accents and anything but letters and spaces."""
+    decomposed = unicodedata.normalize("NFKD", value or "")
+    ascii_only = decomposed.encode("ascii", "ignore").decode()
+    return re.sub(r"[^A-Z ]", "", ascii_only.upper()).strip()
+
+
+def soundex(value):
+    """Return the four-character Soundex code of ``value``, or None if it has no letters."""
+    word = _fold(value).replace(" ", "")
+    if not word:
+        return None
+    code = [word[0]]
+    previous = SOUNDEX_CODES.get(word[0])
+    for letter in word[1:]:
+        digit = SOUNDEX_CODES.get(letter)
+        if digit and digit != previous:
+            code.append(digit)
+        # H and W do not separate letters with the same code; vowels do
+        if letter not in "HW":
+            previous = digit
+    return "".join(code).ljust(KEY_LENGTH, "0")[:KEY_LENGTH]
+
+
+def double_metaphone(value):
+    """Return the ``(primary, alternate)`` Double Metaphone keys of ``value``, or ``(None, None)``."""
+    word = _fold(value)
+    if not word:
+        return None, None
+    return _DoubleMetaphone(word).encode()
+
+
+class _DoubleMetaphone:
+
+    def __init__(self, word):
+        self.word = word
+        self.length = len(word)
+        self.last = self.length - 1
+        self.padded = word + " " * 5
+        self.slavo_germanic = any(part in word for part in ("W", "K", "CZ", "WITZ"))
+        self.primary, self.secondary = [], []
+
+    def at(self, start, *options):
+        """True if the text at ``start`` is one of ``options`` (all of the same length)."""
+        if start < 0:
+            return False
+        return self.padded[start:start + len(options[0])] in options
+
+    def char(self, position):
+        return self.padded[position] if position >= 0 else " "
+
+    def vowel(self, position):
+        return 0 <= position < self.length and self.word[position] in VOWELS
+
+    def add(self, main, alternate=None):
+        self.primary.append(main)
+        self.secondary.append(main if alternate is None else alternate)
+
+    def encode(self):
+        position = 0
+        if self.at(0, "GN", "KN", "PN", "WR", "PS"):
+            position = 1
+        if self.word[0] == "X":
+            self.add("S")
+            position = 1
+        while position < self.length:
+            letter = self.word[position]
+            if letter in VOWELS:
+                if position == 0:
+                    self.add("A")
+                position += 1
+            elif letter == " ":
+                position += 1
+            else:
+                position = getattr(self, f"_{letter.lower()}")(position)
+        primary = "".join(self.primary)[:KEY_LENGTH]
+        secondary = "".join(self.secondary)[:KEY_LENGTH]
+        return primary or None, secondary or None
+
+    def _double(self, position, code, *followers):
+        self.add(code)
+        return position + 2 if self.char(position + 1) in (followers or (self.word[position],)) else position + 1
+
+    def _b(self, position):
+        return self._double(position, "P")
+
+    def _c(self, position):
+        at, char = self.at, self.char
+        if (position > 1 and not self.vowel(position - 2) and at(position - 1, "ACH")
+                and char(position + 2) != "I"
+                and (char(position + 2) != "E" or at(position - 2, "BACHER", "MACHER"))):
+            self.add("K")
+            return position + 2
+        if position == 0 and at(position, "CAESAR"):
+            self.add("S")
+            return position + 2
+        if at(position, "CHIA"):
+            self.add("K")
+            return position + 2
+        if at(position, "CH"):
+            if position > 0 and at(position, "CHAE"):
+                self.add("K", "X")
+            elif (position == 0 and (at(position + 1, "HARAC", "HARIS") or at(position + 1, "HOR", "HYM", "HIA", "HEM"))
+                    and not at(0, "CHORE")):
+                self.add("K")
+            elif (at(0, "VAN ", "VON ") or at(0, "SCH") or at(position - 2, "ORCHES", "ARCHIT", "ORCHID")
+                    or at(position + 2, "T", "S")
+                    or ((at(position - 1, "A", "O", "U", "E") or position == 0)
+                        and at(position + 2, "L", "R", "N", "M", "B", "H", "F", "V", "W", " "))):
+                self.add("K")
+            elif position > 0:
+                if at(0, "MC"):
+                    self.add("K")
+                else:
+                    self.add("X", "K")
+            else:
+                self.add("X")
+            return position + 2
+        if at(position, "CZ") and not at(position - 2, "WICZ"):
+            self.add("S", "X")
+            return position + 2
+        if at(position + 1, "CIA"):
+            self.add("X")
+            return position + 3
+        if at(position, "CC") and not (position == 1 and self.word[0] == "M"):
+            if at(position + 2, "I", "E", "H") and not at(position + 2, "HU"):
+                if (position == 1 and self.word[0] == "A") or at(position - 1, "UCCEE", "UCCES"):
+                    self.add("KS")
+                else:
+                    self.add("X")
+                return position + 3
+            self.add("K")
+            return position + 2
+        if at(position, "CK", "CG", "CQ"):
+            self.add("K")
+            return position + 2
+        if at(position, "CI", "CE", "CY"):
+            if at(position, "CIO", "CIE", "CIA"):
+                self.add("S", "X")
+            else:
+                self.add("S")
+            return position + 2
+        self.add("K")
+        if at(position + 1, " C", " Q", " G"):
+            return position + 3
+        if at(position + 1, "C", "K", "Q") and not at(position + 1, "CE", "CI"):
+            return position + 2
+        return position + 1
+
+    def _d(self, position):
+        if self.at(position, "DG"):
+            if self.at(position + 2, "I", "E", "Y"):
+                self.add("J")
+                return position + 3
+            self.add("TK")
+            return position + 2
+        if self.at(position, "DT", "DD"):
+            self.add("T")
+            return position + 2
+        self.add("T")
+        return position + 1
+
+    def _f(self, position):
+        return self._double(position, "F")
+
+    def _g(self, position):
+        at, char = self.at, self.char
+        if char(position + 1) == "H":
+            if position > 0 and not self.vowel(position - 1):
+                self.add("K")
+            elif position == 0:
+                if char(position + 2) == "I":
+                    self.add("J")
+                else:
+                    self.add("K")
+            elif ((position > 1 and at(position - 2, "B", "H", "D"))
+                    or (position > 2 and at(position - 3, "B", "H", "D"))
+                    or (position > 3 and at(position - 4, "B", "H"))):
+                pass
+            elif position > 2 and char(position - 1) == "U" and at(position - 3, "C", "G", "L", "R", "T"):
+                self.add("F")
+            elif char(position - 1) != "I":
+                self.add("K")
+            return position + 2
+        if char(position + 1) == "N":
+            if position == 1 and self.vowel(0) and not self.slavo_germanic:
+                self.add("KN", "N")
+            elif not at(position + 2, "EY") and not self.slavo_germanic:
+                self.add("N", "KN")
+            else:
+                self.add("KN")
+            return position + 2
+        if at(position + 1, "LI") and not self.slavo_germanic:
+            self.add("KL", "L")
+            return position + 2
+        if position == 0 and (char(position + 1) == "Y" or at(
+                position + 1, "ES", "EP", "EB", "EL", "EY", "IB", "IL", "IN", "IE", "EI", "ER")):
+            self.add("K", "J")
+            return position + 2
+        if ((at(position + 1, "ER") or char(position + 1) == "Y")
+                and not at(0, "DANGER", "RANGER", "MANGER")
+                and not at(position - 1, "E", "I") and not at(position - 1, "RGY", "OGY")):
+            self.add("K", "J")
+            return position + 2
+        if at(position + 1, "E", "I", "Y") or at(position - 1, "AGGI", "OGGI"):
+            if at(0, "VAN ", "VON ") or at(0, "SCH") or at(position + 1, "ET"):
+                self.add("K")
+            elif at(position + 1, "IER "):
+                self.add("J")
+            else:
+                self.add("J", "K")
+            return position + 2
+        return self._double(position, "K")
+
+    def _h(self, position):
+        if (position == 0 or self.vowel(position - 1)) and self.vowel(position + 1):
+            self.add("H")
+            return position + 2
+        return position + 1
+
+    def _j(self, position):
+        at = self.at
+        if at(position, "JOSE") or at(0, "SAN "):
+            if (position == 0 and self.char(position + 4) == " ") or at(0, "SAN "):
+                self.add("H")
+            else:
+                self.add("J", "H")
+            return position + 1
+        if position == 0:
+            self.add("J", "A")
+        elif self.vowel(position - 1) and not self.slavo_germanic and at(position + 1, "A", "O"):
+            self.add("J", "H")
+        elif position == self.last:
+            self.add("J", "")
+        elif not at(position + 1, "L", "T", "K", "S", "N", "M", "B", "Z") and not at(position - 1, "S", "K", "L"):
+            self.add("J")
+        return position + 2 if self.char(position + 1) == "J" else position + 1
+
+    def _k(self, position):
+        return self._double(position, "K")
+
+    def _l(self, position):
+        if self.char(position + 1) != "L":
+            self.add("L")
+            return position + 1
+        at, last = self.at, self.last
+        if ((position == self.length - 3 and at(position - 1, "ILLO", "ILLA", "ALLE"))
+                or ((at(last - 1, "AS", "OS") or at(last, "A", "O")) and at(position - 1, "ALLE"))):
+            # Spanish "-illo", "-illa", "-alle"
+            self.add("L", "")
+        else:
+            self.add("L")
+        return position + 2
+
+    def _m(self, position):
+        self.add("M")
+        if ((self.at(position - 1, "UMB") and (position + 1 == self.last or self.at(position + 2, "ER")))
+                or self.char(position + 1) == "M"):
+            return position + 2
+        return position + 1
+
+    def _n(self, position):
+        return self._double(position, "N")
+
+    def _p(self, position):
+        if self.char(position + 1) == "H":
+            self.add("F")
+            return position + 2
+        return self._double(position, "P", "P", "B")
+
+    def _q(self, position):
+        return self._double(position, "K")
+
+    def _r(self, position):
+        if (position == self.last and not self.slavo_germanic and self.at(position - 2, "IE")
+                and not self.at(position - 4, "ME", "MA")):
+            # French, e.g. "Rogier"
+            self.add("", "R")
+        else:
+            self.add("R")
+        return position + 2 if self.char(position + 1) == "R" else position + 1
+
+    def _s(self, position):
+        at, char = self.at, self.char
+        if at(position - 1, "ISL", "YSL"):
+            return position + 1
+        if position == 0 and at(position, "SUGAR"):
+            self.add("X", "S")
+            return position + 1
+        if at(position, "SH"):
+            if at(position + 1, "HEIM", "HOEK", "HOLM", "HOLZ"):
+                self.add("S")
+            else:
+                self.add("X")
+            return position + 2
+        if at(position, "SIO", "SIA") or at(position, "SIAN"):
+            if self.slavo_germanic:
+                self.add("S")
+            else:
+                self.add("S", "X")
+            return position + 3
+        if (position == 0 and at(position + 1, "M", "N", "L", "W")) or at(position + 1, "Z"):
+            self.add("S", "X")
+            return position + 2 if at(position + 1, "Z") else position + 1
+        if at(position, "SC"):
+            if char(position + 2) == "H":
+                if at(position + 3, "OO", "ER", "EN", "UY", "ED", "EM"):
+                    if at(position + 3, "ER", "EN"):
+                        self.add("X", "SK")
+                    else:
+                        self.add("SK")
+                elif position == 0 and not self.vowel(3) and char(3) != "W":
+                    self.add("X", "S")
+                else:
+                    self.add("X")
+            elif at(position + 2, "I", "E", "Y"):
+                self.add("S")
+            else:
+                self.add("SK")
+            return position + 3
+        if position == self.last and at(position - 2, "AI", "OI"):
+            # French, e.g. "Artois"
+            self.add("", "S")
+        else:
+            self.add("S")
+        return position + 2 if at(position + 1, "S", "Z") else position + 1
+
+    def _t(self, position):
+        at = self.at
+        if at(position, "TION") or at(position, "TIA", "TCH"):
+            self.add("X")
+            return position + 3
+        if at(position, "TH") or at(position, "TTH"):
+            if at(position + 2, "OM", "AM") or at(0, "VAN ", "VON ") or at(0, "SCH"):
+                self.add("T")
+            else:
+                self.add("0", "T")
+            return position + 2
+        return self._double(position, "T", "T", "D")
+
+    def _v(self, position):
+        return self._double(position, "F")
+
+    def _w(self, position):
+        at = self.at
+        if at(position, "WR"):
+            self.add("R")
+            return position + 2
+        if position == 0 and (self.vowel(position + 1) or at(position, "WH")):
+            if self.vowel(position + 1):
+                self.add("A", "F")
+            else:
+                self.add("A")
+        if ((position == self.last and self.vowel(position - 1))
+                or at(position - 1, "EWSKI", "EWSKY", "OWSKI", "OWSKY") or at(0, "SCH")):
+            self.add("", "F")
+            return position + 1
+        if at(position, "WICZ", "WITZ"):
+            self.add("TS", "FX")
+            return position + 4
+        return position + 1
+
+    def _x(self, position):
+        if not (position == self.last and (self.at(position - 3, "IAU", "EAU") or self.at(position - 2, "AU", "OU"))):
+            self.add("KS")
+        return position + 2 if self.at(position + 1, "C", "X") else position + 1
+
+    def _z(self, position):
+        if self.char(position + 1) == "H":
+            self.add("J")
+            return position + 2
+        if self.at(position + 1, "ZO", "ZI", "ZA") or (
+                self.slavo_germanic and position > 0 and self.char(position - 1) != "T"):
+            self.add("S", "TS")
+        else:
+            self.add("S")
+        return position + 2 if self.char(position + 1) == "Z" else position + 1
+
+
+def name_keys(given_names, surname):
+    """Return the phonetic key columns stored on ``Individual`` for a name."""
+    primary, alternate = double_metaphone(surname)
+    first_given = (given_names or "").split()
+    return {
+        "surname_soundex": soundex(surname),
+        "surname_metaphone": primary,
+        "surname_metaphone_alt": alternate,
+        "given_name_metaphone": double_metaphone(first_given[0])[0] if first_given else None,
+    }
@@ -0,0 +1,296 @@
+"""
+Latency and throughput of the read-only ``/api/*`` endpoints.
+
+Runs against the database the app is configured for (``DATABASE_URL``),
+normally one loaded with benchmarks/synthetic.py. Ids for the URL templates
+(individuals with parents, founders, facts, sources, pairs of cousins, ...)
+are sampled from that database with a fixed seed. Each endpoint is warmed up
+and then requested ``--requests`` times from ``--concurrency`` threads,
+in process through Flask's test client or, with ``--url``, over HTTP against
+a running server (gunicorn, the Docker setup), which also measures the WSGI
+server and connection pool.
+
+For each endpoint it reports p50/p90/p99/max latency in milliseconds,
+requests per second and non-2xx responses, and writes them with the commit,
+database, dataset size and settings to ``--output`` as JSON. Given a
+``--baseline`` file from an earlier run it prints the change per endpoint and
+exits with status 1 when a p50 or p99 grew by more than ``--threshold``.
+
+Usage (from backend/):
+    python benchmarks/api_load.py [--requests 200] [--concurrency 4] [--url http://localhost:5000]
+        [--endpoints individuals.list,individual.ancestors] [--output results.json] [--baseline old.json]
+"""
+
+import argparse
+import json
+import math
+import os
+import random
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import func, select  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import Citation, Fact, Individual, Relationship, Source  # noqa: E402
+from app.models.enums import RelationshipType  # noqa: E402
+from app.services.pedigree import ANCESTORS, DESCENDANTS, pedigree  # noqa: E402
+
+# Distinct ids sampled per placeholder
+SAMPLE_SIZE = 50
+
+# (name, URL template, heavy); heavy endpoints only run when named in --endpoints
+ENDPOINTS = (
+    ("individuals.list", "/api/individuals?limit=100", False),
+    ("individuals.list_fields", "/api/individuals?limit=100&fields=given_names,surname", False),
+    ("individuals.search", "/api/individuals/search?name={surname}&limit=20", False),
+    ("individual", "/api/individuals/{individual}", False),
+    ("individual.profile", "/api/individuals/{individual}/profile", False),
+    ("individual.facts", "/api/individuals/{individual}/facts", False),
+    ("individual.links", "/api/individuals/{individual}/links", False),
+    ("individual.ancestors", "/api/individuals/{child}/ancestors?generations=5", False),
+    ("individual.descendants", "/api/individuals/{founder}/descendants?generations=5", False),
+    ("individual.relation", "/api/individuals/{cousin}/relation-to/{other_cousin}", False),
+    ("fact.sources", "/api/facts/{fact}/sources", False),
+    ("relationships.list", "/api/relationships?limit=100", False),
+    ("relationship", "/api/relationships/{relationship}", False),
+    ("relationship.sources", "/api/relationships/{relationship}/sources", False),
+    ("relationship.qualifiers", "/api/relationships/{relationship}/qualifiers", False),
+    ("sources.list", "/api/sources?limit=100", False),
+    ("source", "/api/sources/{source}", False),
+    ("source.citations", "/api/sources/{source}/citations?limit=100", False),
+    ("source.reliability", "/api/sources/{source}/reliability-history", False),
+    ("collections.list", "/api/collections?limit=100", False),
+    ("search", "/api/search?q={surname}&limit=20", False),
+    ("export.gedcom", "/api/export/gedcom", True),
+)
+
+
+# ------------------------------
+# Sampling
+# ------------------------------
+
+def _sample(rng, query):
+    # Ordered so the same seed picks the same ids; a bounded prefix keeps this cheap on large tables
+    values = db.session.scalars(query.limit(SAMPLE_SIZE * 20)).all()
+    return rng.sample(values, min(SAMPLE_SIZE, len(values)))
+
+
+def sample_values(rng):
+    """Return lists of values for each URL template placeholder, drawn from the database."""
+    parent_edges = select(Relationship.individual2_id).where(
+        Relationship.relationship_type == RelationshipType.parent)
+    children = _sample(rng, parent_edges.order_by(Relationship.id))
+    founders = _sample(rng, select(Relationship.individual1_id).where(
+        Relationship.relationship_type == RelationshipType.parent,
+        Relationship.individual1_id.not_in(parent_edges),
+    ).order_by(Relationship.id))
+
+    # Cousins or siblings: two grandchildren of the same grandparent
+    cousins = []
+    for child in children:
+        grandparents = [ind.id for ind, _, generation in pedigree(child, ANCESTORS, 2) if generation == 2]
+        if not grandparents:
+            continue
+        grandchildren = {ind.id for ind, _, generation in pedigree(grandparents[0], DESCENDANTS, 2)
+                         if generation == 2} - {child}
+        if grandchildren:
+            cousins.append((child, rng.choice(sorted(grandchildren))))
+
+    return {
+        "individual": _sample(rng, select(Individual.id).order_by(Individual.id)),
+        "child": children,
+        "founder": founders,
+        "cousin": [pair[0] for pair in cousins],
+        "other_cousin": [pair[1] for pair in cousins],
+        "surname": _sample(rng, select(Individual.surname).distinct().order_by(Individual.surname)),
+        "fact": _sample(rng, select(Fact.id).order_by(Fact.id)),
+        "relationship": _sample(rng, select(Relationship.id).order_by(Relationship.id)),
+        "source": _sample(rng, select(Source.id).order_by(Source.id)),
+    }
+
+
+def build_urls(template, values, count):
+    """Return ``count`` URLs from ``template``, cycling through the sampled values; None if any are missing."""
+    names = [name for name in values if "{" + name + "}" in template]
+    if any(not values[name] for name in names):
+        return None
+    return [
+        template.format(**{name: values[name][index % len(values[name])] for name in names})
+        for index in range(count)
+    ]
+
+
+def dataset_size():
+    return {
+        model.__tablename__: db.session.scalar(select(func.count()).select_from(model))
+        for model in (Individual, Relationship, Fact, Source, Citation)
+    }
+
+
+# ------------------------------
+# Measuring
+# ------------------------------
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    index = max(0, math.ceil(fraction * len(sorted_values)) - 1)
+    return sorted_values[index]
+
+
+class Client:
+    """Issues GETs in process through the test client or over HTTP, one client per thread."""
+
+    def __init__(self, app, base_url):
+        self.app = app
+        self.base_url = base_url.rstrip("/") if base_url else None
+        self.local = threading.local()
+
+    def get(self, path):
+        """Return the status of a GET of ``path`` after reading the whole body."""
+        if self.base_url:
+            try:
+                with urllib.request.urlopen(self.base_url + path) as response:
+                    response.read()
+                    return response.status
+            except urllib.error.HTTPError as exc:
+                return exc.code
+        client = getattr(self.local, "client", None)
+        if client is None:
+            client = self.local.client = self.app.test_client()
+        response = client.get(path)
+        response.get_data()
+        return response.status_code
+
+
+def run_endpoint(client, urls, warmup, concurrency):
+    for url in urls[:warmup]:
+        client.get(url)
+    urls = urls[warmup:]
+
+    def timed(url):
+        started = time.perf_counter()
+        status = client.get(url)
+        return time.perf_counter() - started, status
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(timed, urls))
+    elapsed = time.perf_counter() - started
+
+    latencies = sorted(seconds * 1000 for seconds, _ in results)
+    errors = {}
+    for _, status in results:
+        if not 200 <= status < 300:
+            errors[str(status)] = errors.get(str(status), 0) + 1
+    return {
+        "requests": len(results),
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p90_ms": round(percentile(latencies, 0.90), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+        "max_ms": round(latencies[-1], 3),
+        "mean_ms": round(sum(latencies) / len(latencies), 3),
+        "requests_per_second": round(len(results) / elapsed, 1),
+        "errors": errors,
+    }
+
+
+# ------------------------------
+# Reporting
+# ------------------------------
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline, threshold):
+    """Print each endpoint's change against ``baseline`` and return the names that regressed."""
+    regressed = []
+    print(f"\nCompared with {baseline.get('commit') or 'baseline'} ({baseline.get('created_at')}):")
+    for name, current in results["endpoints"].items():
+        before = baseline.get("endpoints", {}).get(name)
+        if before is None:
+            print(f"  {name:28} new")
+            continue
+        changes = {key: current[key] / before[key] - 1 if before[key] else 0.0 for key in ("p50_ms", "p99_ms")}
+        worse = any(change > threshold for change in changes.values())
+        if worse:
+            regressed.append(name)
+        print(f"  {name:28} p50 {changes['p50_ms']:+7.1%}  p99 {changes['p99_ms']:+7.1%}"
+              + ("  REGRESSION" if worse else ""))
+    return regressed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=200, help="Measured requests per endpoint.")
+    parser.add_argument("--warmup", type=int, default=10, help="Unmeasured requests per endpoint first.")
+    parser.add_argument("--concurrency", type=int, default=1, help="Threads issuing requests.")
+    parser.add_argument("--url", help="Base URL of a running server; default: in process.")
+    parser.add_argument("--endpoints", help="Comma-separated endpoint names; default: all but heavy ones.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", default="benchmark-results.json", help="JSON results file.")
+    parser.add_argument("--baseline", type=argparse.FileType("r"), help="Earlier results to compare with.")
+    parser.add_argument("--threshold", type=float, default=0.10, help="Allowed p50/p99 growth (0.10 = 10%%).")
+    args = parser.parse_args()
+
+    known = {name for name, _, _ in ENDPOINTS}
+    selected = args.endpoints.split(",") if args.endpoints else [name for name, _, heavy in ENDPOINTS if not heavy]
+    unknown = [name for name in selected if name not in known]
+    if unknown:
+        parser.error(f"unknown endpoints: {', '.join(unknown)} (choose from {', '.join(sorted(known))})")
+
+    app = create_app()
+    with app.app_context():
+        size = dataset_size()
+        values = sample_values(random.Random(args.seed))
+        database = db.engine.dialect.name
+        db.session.remove()
+
+    print("Dataset: " + ", ".join(f"{count} {table}" for table, count in size.items()))
+    client = Client(app, args.url)
+    endpoints = {}
+    for name, template, _ in ENDPOINTS:
+        if name not in selected:
+            continue
+        urls = build_urls(template, values, args.warmup + args.requests)
+        if urls is None:
+            print(f"  {name:28} skipped: no rows to sample")
+            continue
+        endpoints[name] = result = run_endpoint(client, urls, args.warmup, args.concurrency)
+        errors = sum(result["errors"].values())
+        print(f"  {name:28} p50 {result['p50_ms']:9.2f} ms  p99 {result['p99_ms']:9.2f} ms  "
+              f"{result['requests_per_second']:9.1f} req/s" + (f"  {errors} errors" if errors else ""))
+
+    results = {
+        "commit": git_commit(),
+        "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "target": args.url or "in-process",
+        "database": database,
+        "dataset": size,
+        "settings": {"requests": args.requests, "warmup": args.warmup, "concurrency": args.concurrency,
+                     "seed": args.seed},
+        "endpoints": endpoints,
+    }
+    with open(args.output, "w") as output:
+        json.dump(results, output, indent=2)
+    print(f"Wrote {args.output}")
+
+    if args.baseline and compare(results, json.load(args.baseline), args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+"""
+Serialization throughput for individuals.
+
+Builds N in-memory individuals (no database needed) and reports rows/sec for
+turning them into a JSON list response:
+
+- before: the hand-written ``serialize_individual`` with Flask's stdlib JSON provider
+- compiled: the column-compiled serializer with the stdlib provider
+- after: the compiled serializer with the orjson provider (if installed)
+
+Usage (from backend/): python benchmarks/serialization.py [--rows 100000] [--repeat 3]
+"""
+
+import argparse
+import os
+import sys
+import time
+import uuid
+from datetime import date, datetime, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from flask import Flask  # noqa: E402
+
+from app.config import Config  # noqa: E402
+from app.models import Individual  # noqa: E402
+from app.models.enums import Gender  # noqa: E402
+from app.utils.json_provider import OrjsonProvider, orjson  # noqa: E402
+from app.utils.serialization import compile_serializer  # noqa: E402
+
+# Compiled the same way as app.api.individuals.serialize_individual
+serialize_individual = compile_serializer(Individual, exclude=(
+    "surname_soundex", "surname_metaphone", "surname_metaphone_alt", "given_name_metaphone",
+))
+
+
+def handwritten_serialize_individual(ind):
+    """The serializer as it was before compilation, kept as the baseline."""
+    return {
+        "id": str(ind.id),
+        "given_names": ind.given_names,
+        "surname": ind.surname,
+        "preferred_name": ind.preferred_name,
+        "gender": ind.gender.value if ind.gender else None,
+        "birth_date_estimated": ind.birth_date_estimated.isoformat() if ind.birth_date_estimated else None,
+        "death_date_estimated": ind.death_date_estimated.isoformat() if ind.death_date_estimated else None,
+        "birth_place": ind.birth_place,
+        "death_place": ind.death_place,
+        "notes": ind.notes,
+        "is_living": ind.is_living,
+        "created_at": ind.created_at.isoformat(),
+        "updated_at": ind.updated_at.isoformat() if ind.updated_at else None,
+        "created_by_user_id": str(ind.created_by_user_id)
+    }
+
+
+def make_individuals(count):
+    user_id, now = uuid.uuid4(), datetime(2024, 1, 1, 12, 0, 0)
+    genders = list(Gender)
+    return [
+        Individual(
+            id=uuid.uuid4(), given_names=f"Given{i}", surname=f"Surname{i % 5000}",
+            gender=genders[i % len(genders)],
+            birth_date_estimated=date(1800, 1, 1) + timedelta(days=i % 40000),
+            death_date_estimated=date(1860, 1, 1) + timedelta(days=i % 40000) if i % 3 else None,
+            preferred_name=None, birth_place="Springfield, IL", death_place=None, notes=None, is_living=False,
+            created_at=now, updated_at=now if i % 2 else None, created_by_user_id=user_id,
+        )
+        for i in range(count)
+    ]
+
+
+def measure(app, rows, serializer, repeat):
+    best = None
+    with app.app_context():
+        for _ in range(repeat):
+            start = time.perf_counter()
+            app.json.response([serializer(row) for row in rows]).get_data()
+            elapsed = time.perf_counter() - start
+            best = elapsed if best is None else min(best, elapsed)
+    return len(rows) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    stdlib_app = Flask("benchmark")
+    stdlib_app.config.from_object(Config)
+    cases = [
+        ("before (hand-written + stdlib json)", stdlib_app, handwritten_serialize_individual),
+        ("compiled + stdlib json", stdlib_app, serialize_individual),
+    ]
+    if orjson is not None:
+        orjson_app = Flask("benchmark")
+        orjson_app.config.from_object(Config)
+        orjson_app.json = OrjsonProvider(orjson_app)
+        cases.append(("after (compiled + orjson)", orjson_app, serialize_individual))
+    else:
+        print("orjson is not installed; skipping the orjson case.")
+
+    rows = make_individuals(args.rows)
+    baseline = None
+    for label, app, serializer in cases:
+        rate = measure(app, rows, serializer, args.repeat)
+        baseline = baseline or rate
+        print(f"{label:40} {rate:12,.0f} rows/sec  {rate / baseline:5.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,327 @@
+"""
+Synthetic genealogy generator for load tests and benchmarks.
+
+Bulk-loads a reproducible family forest into the database the app is
+configured for (``DATABASE_URL``): a number of independent families, each
+descending from one founding couple over ``--generations`` generations with
+``--branching`` children per couple. Every child except in the last
+generation marries someone from outside the family, so each generation
+doubles the couples of the one before it times the branching factor. Each
+person gets ``--facts`` facts (birth, death when dead, then others), each
+fact on average ``--citations`` citations of one of ``--sources`` sources.
+
+``--individuals`` picks the number of families so the forest reaches about
+that many people; the same options and ``--seed`` always produce the same
+rows, ids included, so results from different commits are comparable.
+
+All rows belong to a ``benchmark`` user and ``--reset`` deletes them before
+loading. Rows are written with multi-row ``INSERT`` statements and committed
+every ``--batch-size`` rows; profiles are rebuilt at the end unless
+``--no-profiles`` is given. The schema must exist (``flask db upgrade``);
+lookup tables are seeded if needed.
+
+Usage (from backend/): python benchmarks/synthetic.py --individuals 100k [--reset]
+"""
+
+import argparse
+import math
+import os
+import random
+import sys
+import time
+import uuid
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from sqlalchemy import delete, func, insert, select  # noqa: E402
+
+from app import create_app, db  # noqa: E402
+from app.models import (  # noqa: E402
+    Citation, Fact, FactType, Individual, IndividualProfile, Relationship, Source, SourceType, User,
+)
+from app.models.enums import ConfidenceLevel, EvidenceType, Gender, RelationshipType, SupportsClaim  # noqa: E402
+from app.models.profile import refresh_profiles  # noqa: E402
+from app.seed import seed  # noqa: E402
+from app.services.bulk import ROWS_PER_STATEMENT  # noqa: E402
+from app.utils.lookups import lookup  # noqa: E402
+
+BENCHMARK_USER = "benchmark"
+
+# Named sizes accepted by --individuals
+SCALES = {"10k": 10_000, "100k": 100_000, "1m": 1_000_000}
+
+# Insert order, parents before children
+MODELS = (Source, Individual, Relationship, Fact, Citation)
+
+MALE_NAMES = ("John", "William", "James", "George", "Charles", "Thomas", "Henry", "Joseph", "Samuel", "Edward",
+              "Robert", "Frederick", "Albert", "Walter", "Arthur", "Harry", "Peter", "Daniel", "Isaac", "Jacob")
+FEMALE_NAMES = ("Mary", "Elizabeth", "Sarah", "Anna", "Margaret", "Emma", "Alice", "Catherine", "Jane", "Ellen",
+                "Martha", "Clara", "Ida", "Bertha", "Florence", "Rose", "Grace", "Lydia", "Hannah", "Esther")
+SURNAME_STEMS = ("Ash", "Black", "Brad", "Brook", "Clay", "Crom", "Dal", "East", "Fair", "Green", "Hart", "Hol",
+                 "Kings", "Lang", "Marsh", "Mid", "North", "Red", "Stan", "Thorn", "West", "Whit", "Win", "Wood")
+SURNAME_ENDINGS = ("by", "field", "ford", "ham", "ley", "more", "ton", "well", "wick", "worth")
+PLACES = ("Boston, MA", "Springfield, IL", "Cork, Ireland", "Leeds, England", "Hamburg, Germany",
+          "Oslo, Norway", "Quebec, Canada", "Lyon, France", "Glasgow, Scotland", "Krakow, Poland")
+OTHER_FACT_TYPES = ("residence", "occupation", "census", "baptism", "burial", "religion", "immigration",
+                    "education", "military_service", "property")
+SOURCE_TYPES = ("birth_certificate", "death_certificate", "census", "church_record", "newspaper", "book")
+
+GENERATION_YEARS = 28
+FIRST_BIRTH_YEAR = 1700
+LIVING_AFTER_YEAR = 1935
+
+
+def individuals_per_family(generations, branching):
+    """People in one family: the founding couple, married children, and the unmarried last generation."""
+    married = sum(2 * branching ** generation for generation in range(1, generations - 1))
+    return 2 + married + (branching ** (generations - 1) if generations > 1 else 0)
+
+
+def parse_scale(value):
+    value = value.lower()
+    return SCALES[value] if value in SCALES else int(value.replace("_", ""))
+
+
+class Generator:
+    """Produces the rows of the forest, table by table, from a seeded random generator."""
+
+    def __init__(self, rng, user_id, generations, branching, facts, sources, citations):
+        self.rng = rng
+        self.user_id = user_id
+        self.generations = generations
+        self.branching = branching
+        self.facts = facts
+        self.citations = citations
+        self.surnames = [stem + ending for stem in SURNAME_STEMS for ending in SURNAME_ENDINGS]
+        self.fact_types = {key: lookup(FactType).id_of(key) for key in ("birth", "death", *OTHER_FACT_TYPES)}
+        self.fact_types = {key: value for key, value in self.fact_types.items() if value is not None}
+        source_type_ids = [lookup(SourceType).id_of(key) for key in SOURCE_TYPES]
+        self.source_type_ids = [value for value in source_type_ids if value is not None] or [
+            row.id for row in lookup(SourceType).by_id.values()]
+        self.source_ids = [self.uuid() for _ in range(sources)]
+        self.source_rows = [
+            {
+                "id": source_id,
+                "title": f"{self.rng.choice(('Parish register', 'Census return', 'Certificate', 'Newspaper'))} "
+                         f"{self.rng.choice(PLACES)} {1700 + index % 320}",
+                "source_type_id": self.rng.choice(self.source_type_ids),
+                "source_date": date(1700 + index % 320, 1, 1) + timedelta(days=self.rng.randrange(365)),
+                "location": self.rng.choice(PLACES),
+                "confidence_level": self.rng.choice(list(ConfidenceLevel)),
+                "is_active": True,
+                "created_by_user_id": self.user_id,
+            }
+            for index, source_id in enumerate(self.source_ids)
+        ]
+
+    def uuid(self):
+        return uuid.UUID(int=self.rng.getrandbits(128), version=4)
+
+    def person(self, gender, surname, generation):
+        birth = date(FIRST_BIRTH_YEAR + generation * GENERATION_YEARS, 1, 1) + timedelta(
+            days=self.rng.randrange(-3650, 3650))
+        death = birth + timedelta(days=self.rng.randrange(40 * 365, 90 * 365))
+        if death.year >= 2020:
+            death = None
+        names = MALE_NAMES if gender == Gender.male else FEMALE_NAMES
+        return {
+            "id": self.uuid(),
+            "given_names": " ".join(self.rng.sample(names, self.rng.choice((1, 1, 2)))),
+            "surname": surname,
+            "gender": gender,
+            "birth_date_estimated": birth,
+            "death_date_estimated": death,
+            "birth_place": self.rng.choice(PLACES),
+            "death_place": self.rng.choice(PLACES) if death else None,
+            "is_living": death is None and birth.year >= LIVING_AFTER_YEAR,
+            "created_by_user_id": self.user_id,
+        }
+
+    def relationship(self, first, second, relationship_type):
+        return {
+            "id": self.uuid(),
+            "individual1_id": first["id"],
+            "individual2_id": second["id"],
+            "relationship_type": relationship_type,
+            "confidence_level": ConfidenceLevel.high,
+            "created_by_user_id": self.user_id,
+        }
+
+    def person_facts(self, person):
+        """Yield ``(model, row)`` for a person's facts and their citations."""
+        kinds = [("birth", person["birth_date_estimated"], person["birth_place"])]
+        if person["death_date_estimated"]:
+            kinds.append(("death", person["death_date_estimated"], person["death_place"]))
+        others = [key for key in OTHER_FACT_TYPES if key in self.fact_types]
+        while len(kinds) < self.facts and others:
+            year = self.rng.randint(person["birth_date_estimated"].year,
+                                    (person["death_date_estimated"] or date(2020, 1, 1)).year)
+            kinds.append((self.rng.choice(others), date(year, 1, 1), self.rng.choice(PLACES)))
+
+        for key, fact_date, place in kinds[:self.facts]:
+            if key not in self.fact_types:
+                continue
+            fact = {
+                "id": self.uuid(),
+                "individual_id": person["id"],
+                "fact_type_id": self.fact_types[key],
+                "fact_date": fact_date,
+                "fact_place": place,
+                "confidence_level": self.rng.choice(list(ConfidenceLevel)),
+                "is_primary": key in ("birth", "death"),
+                "created_by_user_id": self.user_id,
+            }
+            yield Fact, fact
+            count = int(self.citations) + (self.rng.random() < self.citations % 1)
+            for _ in range(count if self.source_ids else 0):
+                yield Citation, {
+                    "id": self.uuid(),
+                    "cited_object_type": "fact",
+                    "cited_object_id": fact["id"],
+                    "source_id": self.rng.choice(self.source_ids),
+                    "evidence_type": self.rng.choice(list(EvidenceType)),
+                    "page_number": self.rng.randint(1, 400),
+                    "supports_claim": SupportsClaim.supports,
+                    "created_by_user_id": self.user_id,
+                }
+
+    def family(self):
+        """Yield ``(model, row)`` for every row of one family, people before what refers to them."""
+        surname = self.rng.choice(self.surnames)
+        couples = [(self.person(Gender.male, surname, 0),
+                    self.person(Gender.female, self.rng.choice(self.surnames), 0))]
+        for couple in couples:
+            yield from self.couple_rows(couple)
+
+        for generation in range(1, self.generations):
+            last = generation == self.generations - 1
+            next_couples = []
+            for father, mother in couples:
+                for _ in range(self.branching):
+                    gender = self.rng.choice((Gender.male, Gender.female))
+                    child = self.person(gender, father["surname"], generation)
+                    yield Individual, child
+                    yield from self.person_facts(child)
+                    yield Relationship, self.relationship(father, child, RelationshipType.parent)
+                    yield Relationship, self.relationship(mother, child, RelationshipType.parent)
+                    if last:
+                        continue
+                    if gender == Gender.male:
+                        couple = (child, self.person(Gender.female, self.rng.choice(self.surnames), generation))
+                        yield from self.couple_rows(couple, married_in=couple[1])
+                    else:
+                        couple = (self.person(Gender.male, self.rng.choice(self.surnames), generation), child)
+                        yield from self.couple_rows(couple, married_in=couple[0])
+                    next_couples.append(couple)
+            couples = next_couples
+
+    def couple_rows(self, couple, married_in=None):
+        for person in couple if married_in is None else (married_in,):
+            yield Individual, person
+            yield from self.person_facts(person)
+        yield Relationship, self.relationship(couple[0], couple[1], RelationshipType.spouse)
+
+
+class Loader:
+    """Buffers rows per table and writes them in insert order, committing every ``batch_size`` rows."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.buffers = {model: [] for model in MODELS}
+        self.pending = 0
+        self.counts = {model.__tablename__: 0 for model in MODELS}
+
+    def add(self, model, row):
+        self.buffers[model].append(row)
+        self.pending += 1
+        if self.pending >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        for model, rows in self.buffers.items():
+            for start in range(0, len(rows), ROWS_PER_STATEMENT):
+                db.session.execute(insert(model), rows[start:start + ROWS_PER_STATEMENT])
+            self.counts[model.__tablename__] += len(rows)
+            rows.clear()
+        self.pending = 0
+        db.session.commit()
+
+
+def benchmark_user():
+    user = User.query.filter_by(username=BENCHMARK_USER).first()
+    if user is None:
+        user = User(username=BENCHMARK_USER, email="benchmark@example.invalid", password_hash="!")
+        db.session.add(user)
+        db.session.commit()
+    return user.id
+
+
+def reset(user_id):
+    """Delete every row the benchmark user created, children first."""
+    individuals = select(Individual.id).where(Individual.created_by_user_id == user_id)
+    db.session.execute(delete(IndividualProfile).where(IndividualProfile.individual_id.in_(individuals)))
+    for model in reversed(MODELS):
+        db.session.execute(delete(model).where(model.created_by_user_id == user_id))
+    db.session.commit()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--individuals", type=parse_scale, default=SCALES["10k"],
+                        help="Approximate number of people: a count or one of " + ", ".join(SCALES))
+    parser.add_argument("--generations", type=int, default=6)
+    parser.add_argument("--branching", type=int, default=3, help="Children per couple.")
+    parser.add_argument("--facts", type=int, default=4, help="Facts per person.")
+    parser.add_argument("--sources", type=int, help="Sources to cite (default: one per 20 people).")
+    parser.add_argument("--citations", type=float, default=0.5, help="Average citations per fact.")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--batch-size", type=int, default=20000, help="Rows written per transaction.")
+    parser.add_argument("--reset", action="store_true", help="Delete earlier benchmark rows first.")
+    parser.add_argument("--no-profiles", action="store_true", help="Skip rebuilding individual profiles.")
+    args = parser.parse_args()
+    if args.generations < 1 or args.branching < 1:
+        parser.error("--generations and --branching must be at least 1.")
+
+    per_family = individuals_per_family(args.generations, args.branching)
+    families = max(1, math.ceil(args.individuals / per_family))
+    sources = args.sources if args.sources is not None else max(1, args.individuals // 20)
+
+    app = create_app()
+    with app.app_context():
+        seed()
+        user_id = benchmark_user()
+        if args.reset:
+            reset(user_id)
+            print("Deleted earlier benchmark rows.")
+
+        started = time.perf_counter()
+        generator = Generator(random.Random(args.seed), user_id, args.generations, args.branching,
+                              args.facts, sources, args.citations)
+        loader = Loader(args.batch_size)
+        for row in generator.source_rows:
+            loader.add(Source, row)
+        for number in range(1, families + 1):
+            for model, row in generator.family():
+                loader.add(model, row)
+            if number % 100 == 0:
+                print(f"  {number}/{families} families, {loader.counts['individuals']} individuals")
+        loader.flush()
+        print(f"Loaded {families} families of {per_family} in {time.perf_counter() - started:.1f}s: "
+              + ", ".join(f"{count} {table}" for table, count in loader.counts.items()))
+
+        if not args.no_profiles:
+            started = time.perf_counter()
+            ids = db.session.scalars(
+                select(Individual.id).where(Individual.created_by_user_id == user_id).order_by(Individual.id)).all()
+            for start in range(0, len(ids), args.batch_size):
+                refresh_profiles(db.session.connection(), ids[start:start + args.batch_size])
+                db.session.commit()
+            print(f"Rebuilt {len(ids)} profiles in {time.perf_counter() - started:.1f}s.")
+
+        total = db.session.scalar(select(func.count()).select_from(Individual))
+        print(f"The database now holds {total} individuals.")
+
+
+if __name__ == "__main__":
+    main()
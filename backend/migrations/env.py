@@ -5,6 +5,8 @@ from flask import current_app
 
 from alembic import context
 
+from app.models.search import SEARCH_OBJECTS
+
 # this is the Alembic Config object, which provides
 # access to the values within the .ini file in use.
 config = context.config
@@ -90,9 +92,15 @@ def run_migrations_online():
                 directives[:] = []
                 logger.info('No changes in schema detected.')
 
+    # generated search columns and their indexes are managed by hand in
+    # migrations and are not part of the model metadata
+    def include_object(object, name, type_, reflected, compare_to):
+        return not (reflected and compare_to is None and name in SEARCH_OBJECTS)
+
     conf_args = current_app.extensions['migrate'].configure_args
     if conf_args.get("process_revision_directives") is None:
         conf_args["process_revision_directives"] = process_revision_directives
+    conf_args.setdefault("include_object", include_object)
 
     connectable = get_engine()
 
@@ -0,0 +1,38 @@
+"""Add gedcom_imports
+
+Revision ID: 30ded0a59a3a
+Revises: 809f02a9300f
+Create Date: 2026-10-17 11:02:18.604551
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '30ded0a59a3a'
+down_revision = '809f02a9300f'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('gedcom_imports',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('file_name', sa.String(), nullable=False),
+    sa.Column('file_size', sa.BigInteger(), nullable=False),
+    sa.Column('phase', sa.String(length=8), nullable=False),
+    sa.Column('records_done', sa.Integer(), nullable=False),
+    sa.Column('status', sa.Enum('running', 'completed', 'failed', name='importstatus'), nullable=False),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.Column('created_by_user_id', sa.UUID(), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('gedcom_imports')
+    sa.Enum(name='importstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,23 @@
+"""Index research_notes.individual_id
+
+Revision ID: 4f2c8e6a9b17
+Revises: e8b5a1f7c3d6
+Create Date: 2026-10-18 00:31:55.120894
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2c8e6a9b17'
+down_revision = 'e8b5a1f7c3d6'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_research_notes_individual_id', 'research_notes', ['individual_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_research_notes_individual_id', table_name='research_notes')
@@ -0,0 +1,46 @@
+"""Add full-text search vectors
+
+Revision ID: 5b7e0c2d9f14
+Revises: 30ded0a59a3a
+Create Date: 2026-10-17 22:41:07.218340
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '5b7e0c2d9f14'
+down_revision = '30ded0a59a3a'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # tsvector columns and GIN indexes are PostgreSQL-only; SQLite searches its FTS5 tables instead
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.execute(
+        "ALTER TABLE sources ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(description, '')), 'B') || "
+        "setweight(to_tsvector('english', coalesce(source_text, '')), 'C') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'D')) STORED"
+    )
+    op.create_index('ix_sources_search_vector', 'sources', ['search_vector'], unique=False, postgresql_using='gin')
+    op.execute(
+        "ALTER TABLE individuals ADD COLUMN search_vector tsvector GENERATED ALWAYS AS ("
+        "setweight(to_tsvector('english', coalesce(given_names, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(surname, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(preferred_name, '')), 'A') || "
+        "setweight(to_tsvector('english', coalesce(notes, '')), 'D')) STORED"
+    )
+    op.create_index('ix_individuals_search_vector', 'individuals', ['search_vector'], unique=False, postgresql_using='gin')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'postgresql':
+        return
+    op.drop_index('ix_individuals_search_vector', table_name='individuals', postgresql_using='gin')
+    op.drop_column('individuals', 'search_vector')
+    op.drop_index('ix_sources_search_vector', table_name='sources', postgresql_using='gin')
+    op.drop_column('sources', 'search_vector')
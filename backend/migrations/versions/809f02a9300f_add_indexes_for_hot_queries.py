@@ -0,0 +1,47 @@
+"""Add indexes for hot foreign keys and filters
+
+Revision ID: 809f02a9300f
+Revises: ab398d6a91f4
+Create Date: 2026-10-17 09:12:44.318207
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '809f02a9300f'
+down_revision = 'ab398d6a91f4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index('ix_facts_individual_id', 'facts', ['individual_id'], unique=False)
+    op.create_index('ix_relationships_individual1_id', 'relationships', ['individual1_id'], unique=False)
+    op.create_index('ix_relationships_individual2_id', 'relationships', ['individual2_id'], unique=False)
+    op.create_index('ix_citations_cited_object', 'citations', ['cited_object_type', 'cited_object_id'], unique=False)
+    op.create_index('ix_citations_source_id_created_at_id', 'citations', ['source_id', 'created_at', 'id'], unique=False)
+    op.create_index('ix_external_links_individual_id', 'external_links', ['individual_id'], unique=False)
+    op.create_index('ix_relationship_qualifiers_relationship_id', 'relationship_qualifiers', ['relationship_id'], unique=False)
+
+    # Keyset pagination order (created_at, id) for the collection endpoints
+    op.create_index('ix_individuals_created_at_id', 'individuals', ['created_at', 'id'], unique=False)
+    op.create_index('ix_relationships_created_at_id', 'relationships', ['created_at', 'id'], unique=False)
+    op.create_index('ix_source_collections_created_at_id', 'source_collections', ['created_at', 'id'], unique=False)
+    op.create_index('ix_sources_active_created_at_id', 'sources', ['created_at', 'id'], unique=False,
+                    postgresql_where=sa.text('is_active'), sqlite_where=sa.text('is_active = 1'))
+
+
+def downgrade():
+    op.drop_index('ix_sources_active_created_at_id', table_name='sources')
+    op.drop_index('ix_source_collections_created_at_id', table_name='source_collections')
+    op.drop_index('ix_relationships_created_at_id', table_name='relationships')
+    op.drop_index('ix_individuals_created_at_id', table_name='individuals')
+    op.drop_index('ix_relationship_qualifiers_relationship_id', table_name='relationship_qualifiers')
+    op.drop_index('ix_external_links_individual_id', table_name='external_links')
+    op.drop_index('ix_citations_source_id_created_at_id', table_name='citations')
+    op.drop_index('ix_citations_cited_object', table_name='citations')
+    op.drop_index('ix_relationships_individual2_id', table_name='relationships')
+    op.drop_index('ix_relationships_individual1_id', table_name='relationships')
+    op.drop_index('ix_facts_individual_id', table_name='facts')
@@ -0,0 +1,37 @@
+"""Add conflict_scans and unique conflicting fact pairs
+
+Revision ID: 9d3e7b2c5a48
+Revises: 4f2c8e6a9b17
+Create Date: 2026-10-18 01:12:40.508317
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = '9d3e7b2c5a48'
+down_revision = '4f2c8e6a9b17'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('conflict_scans',
+    sa.Column('id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('started_at', sa.DateTime(), server_default=sa.text('now()'), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('individuals_scanned', sa.Integer(), nullable=True),
+    sa.Column('conflicts_found', sa.Integer(), nullable=True),
+    sa.Column('created_by_user_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.ForeignKeyConstraint(['created_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_unique_constraint('uq_conflicting_facts_pair', 'conflicting_facts', ['fact1_id', 'fact2_id'])
+    op.create_index('ix_conflicting_facts_fact2_id', 'conflicting_facts', ['fact2_id'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_conflicting_facts_fact2_id', table_name='conflicting_facts')
+    op.drop_constraint('uq_conflicting_facts_pair', 'conflicting_facts', type_='unique')
+    op.drop_table('conflict_scans')
@@ -0,0 +1,45 @@
+"""Add source_collection_closure
+
+Revision ID: a7c4f1e9d2b3
+Revises: 9d3e7b2c5a48
+Create Date: 2026-10-18 02:04:17.662031
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'a7c4f1e9d2b3'
+down_revision = '9d3e7b2c5a48'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('source_collection_closure',
+    sa.Column('ancestor_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('descendant_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('depth', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['ancestor_id'], ['source_collections.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['descendant_id'], ['source_collections.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('ancestor_id', 'descendant_id')
+    )
+    op.create_index('ix_source_collection_closure_descendant_id', 'source_collection_closure', ['descendant_id'], unique=False)
+
+    # Backfill from the existing parent links
+    op.execute("""
+        INSERT INTO source_collection_closure (ancestor_id, descendant_id, depth)
+        WITH RECURSIVE tree (ancestor_id, descendant_id, depth) AS (
+            SELECT id, id, 0 FROM source_collections
+            UNION ALL
+            SELECT tree.ancestor_id, child.id, tree.depth + 1
+            FROM tree JOIN source_collections child ON child.parent_collection_id = tree.descendant_id
+        )
+        SELECT ancestor_id, descendant_id, depth FROM tree
+    """)
+
+
+def downgrade():
+    op.drop_index('ix_source_collection_closure_descendant_id', table_name='source_collection_closure')
+    op.drop_table('source_collection_closure')
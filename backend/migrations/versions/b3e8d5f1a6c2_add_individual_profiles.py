@@ -0,0 +1,42 @@
+"""Add individual_profiles
+
+Revision ID: b3e8d5f1a6c2
+Revises: a7c4f1e9d2b3
+Create Date: 2026-10-18 03:21:09.114872
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = 'b3e8d5f1a6c2'
+down_revision = 'a7c4f1e9d2b3'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Filled by 'flask refresh-profiles', or per individual on first read
+    op.create_table('individual_profiles',
+    sa.Column('individual_id', postgresql.UUID(as_uuid=True), nullable=False),
+    sa.Column('display_name', sa.String(length=511), nullable=False),
+    sa.Column('gender', sa.String(length=16), nullable=True),
+    sa.Column('is_living', sa.Boolean(), nullable=True),
+    sa.Column('birth_date', sa.Date(), nullable=True),
+    sa.Column('birth_place', sa.String(), nullable=True),
+    sa.Column('death_date', sa.Date(), nullable=True),
+    sa.Column('death_place', sa.String(), nullable=True),
+    sa.Column('primary_facts', sa.JSON(), nullable=False),
+    sa.Column('parents', sa.JSON(), nullable=False),
+    sa.Column('spouses', sa.JSON(), nullable=False),
+    sa.Column('fact_count', sa.Integer(), nullable=False),
+    sa.Column('citation_count', sa.Integer(), nullable=False),
+    sa.Column('refreshed_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['individual_id'], ['individuals.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('individual_id')
+    )
+
+
+def downgrade():
+    op.drop_table('individual_profiles')
@@ -0,0 +1,42 @@
+"""Add phonetic name keys and surname trigram index
+
+Revision ID: c41a7d93e5b2
+Revises: 5b7e0c2d9f14
+Create Date: 2026-10-17 23:20:44.915307
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c41a7d93e5b2'
+down_revision = '5b7e0c2d9f14'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # New rows get their keys from the model; run 'flask backfill-name-keys' for existing rows
+    op.add_column('individuals', sa.Column('surname_soundex', sa.String(length=4), nullable=True))
+    op.add_column('individuals', sa.Column('surname_metaphone', sa.String(length=4), nullable=True))
+    op.add_column('individuals', sa.Column('surname_metaphone_alt', sa.String(length=4), nullable=True))
+    op.add_column('individuals', sa.Column('given_name_metaphone', sa.String(length=4), nullable=True))
+
+    op.create_index('ix_individuals_surname_soundex', 'individuals', ['surname_soundex'], unique=False)
+    op.create_index('ix_individuals_surname_metaphone', 'individuals', ['surname_metaphone'], unique=False)
+    op.create_index('ix_individuals_surname_metaphone_alt', 'individuals', ['surname_metaphone_alt'], unique=False)
+
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    op.create_index('ix_individuals_surname_trgm', 'individuals', ['surname'], unique=False,
+                    postgresql_using='gin', postgresql_ops={'surname': 'gin_trgm_ops'})
+
+
+def downgrade():
+    op.drop_index('ix_individuals_surname_trgm', table_name='individuals', postgresql_using='gin')
+    op.drop_index('ix_individuals_surname_metaphone_alt', table_name='individuals')
+    op.drop_index('ix_individuals_surname_metaphone', table_name='individuals')
+    op.drop_index('ix_individuals_surname_soundex', table_name='individuals')
+    op.drop_column('individuals', 'given_name_metaphone')
+    op.drop_column('individuals', 'surname_metaphone_alt')
+    op.drop_column('individuals', 'surname_metaphone')
+    op.drop_column('individuals', 'surname_soundex')
@@ -0,0 +1,28 @@
+"""Add lookup_versions
+
+Revision ID: c5f9a2d7e4b1
+Revises: b3e8d5f1a6c2
+Create Date: 2026-10-18 04:02:51.376920
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = 'c5f9a2d7e4b1'
+down_revision = 'b3e8d5f1a6c2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('lookup_versions',
+    sa.Column('table_name', sa.String(length=64), nullable=False),
+    sa.Column('version', sa.Integer(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.PrimaryKeyConstraint('table_name')
+    )
+
+
+def downgrade():
+    op.drop_table('lookup_versions')
@@ -0,0 +1,48 @@
+"""Add duplicate_candidates
+
+Revision ID: e8b5a1f7c3d6
+Revises: c41a7d93e5b2
+Create Date: 2026-10-17 23:58:12.407163
+
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = 'e8b5a1f7c3d6'
+down_revision = 'c41a7d93e5b2'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('duplicate_candidates',
+    sa.Column('id', sa.UUID(), nullable=False),
+    sa.Column('individual1_id', sa.UUID(), nullable=False),
+    sa.Column('individual2_id', sa.UUID(), nullable=False),
+    sa.Column('score', sa.Float(), nullable=False),
+    sa.Column('name_score', sa.Float(), nullable=False),
+    sa.Column('date_score', sa.Float(), nullable=False),
+    sa.Column('place_score', sa.Float(), nullable=False),
+    sa.Column('resolution_status', postgresql.ENUM('unresolved', 'resolved', 'dismissed', name='resolutionstatus', create_type=False), nullable=False),
+    sa.Column('resolution_notes', sa.Text(), nullable=True),
+    sa.Column('resolved_by_user_id', sa.UUID(), nullable=True),
+    sa.Column('resolved_at', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), server_default=sa.text('now()'), nullable=True),
+    sa.CheckConstraint('individual1_id < individual2_id', name='ck_duplicate_candidates_order'),
+    sa.ForeignKeyConstraint(['individual1_id'], ['individuals.id'], ),
+    sa.ForeignKeyConstraint(['individual2_id'], ['individuals.id'], ),
+    sa.ForeignKeyConstraint(['resolved_by_user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('individual1_id', 'individual2_id', name='uq_duplicate_candidates_pair')
+    )
+    op.create_index('ix_duplicate_candidates_individual2_id', 'duplicate_candidates', ['individual2_id'], unique=False)
+    op.create_index('ix_duplicate_candidates_status_score', 'duplicate_candidates', ['resolution_status', 'score'], unique=False)
+
+
+def downgrade():
+    op.drop_index('ix_duplicate_candidates_status_score', table_name='duplicate_candidates')
+    op.drop_index('ix_duplicate_candidates_individual2_id', table_name='duplicate_candidates')
+    op.drop_table('duplicate_candidates')
@@ -1,15 +1,21 @@
 import os
-from flask import Flask
+import socket
 from flask_migrate import Migrate
 from flask.cli import with_appcontext
 import click
 
 from app import create_app, db
 from app.models import FactType, SourceType  # Add more seed table models as needed
-from app.seeds.source_types import seed_source_types
-from app.seeds.fact_types import seed_fact_types
 
 from app.seed import seed as perform_seed  # ✅ Import the reusable function
+from app.models import Individual, User
+from app.models.profile import IndividualProfile, refresh_profiles
+from app.services.gedcom_import import GedcomImporter, GedcomImportError
+from app.services.gedcom_export import chunked, export_gedcom
+from app.services.conflicts import find_conflicts
+from app.services.duplicates import find_duplicates
+from app.services.jobs import run_worker
+from app.utils.phonetic import name_keys
 
 from dotenv import load_dotenv
 
@@ -33,12 +39,157 @@ def seed(reset):
         db.session.query(FactType).delete()
         db.session.commit()
     else:
-        click.echo("Seeding source_types and fact_types if missing...")
+        click.echo("Seeding source_types and fact_types...")
 
-    perform_seed()  # ✅ Use the function from app/seed.py
+    summary = perform_seed()  # ✅ Use the function from app/seed.py
+    for table, counts in summary.items():
+        click.echo(f"  {table}: {counts['inserted']} inserted, {counts['updated']} updated, "
+                   f"{counts['unchanged']} unchanged")
     click.echo("Seeding complete.")
 
 
+# GEDCOM import CLI command
+@app.cli.command("import-gedcom")
+@click.argument('path', type=click.Path(exists=True, dir_okay=False))
+@click.option('--user', 'username', help='Username recorded as creator of the imported rows.')
+@click.option('--resume', 'import_id', help='Id of an interrupted import to continue.')
+@click.option('--batch-size', default=1000, show_default=True, help='Records written per transaction.')
+@with_appcontext
+def import_gedcom(path, username, import_id, batch_size):
+    """Import a GEDCOM file in resumable batches."""
+    try:
+        if import_id:
+            importer = GedcomImporter.resume(path, import_id, batch_size)
+        else:
+            if not username:
+                raise click.UsageError("--user is required when starting a new import.")
+            user = User.query.filter_by(username=username).first()
+            if user is None:
+                raise click.BadParameter(f"No user named {username!r}.", param_hint='--user')
+            importer = GedcomImporter.start(path, user.id, batch_size)
+    except GedcomImportError as exc:
+        raise click.ClickException(str(exc))
+
+    click.echo(f"Importing {path} as import {importer.record.id}...")
+    importer.run(progress=lambda phase, done: click.echo(f"  {phase}: {done} records"))
+    click.echo("Import complete.")
+
+
+# GEDCOM export CLI command
+@app.cli.command("export-gedcom")
+@click.argument('output', type=click.File('w', encoding='utf-8'), default='-')
+@click.option('--batch-size', default=1000, show_default=True, help='Rows fetched per round trip.')
+@with_appcontext
+def export_gedcom_command(output, batch_size):
+    """Write the whole database as GEDCOM 5.5.1 to OUTPUT (default: stdout)."""
+    for chunk in chunked(export_gedcom(batch_size=batch_size)):
+        output.write(chunk)
+
+
+# Phonetic name key backfill CLI command
+@app.cli.command("backfill-name-keys")
+@click.option('--batch-size', default=1000, show_default=True, help='Individuals updated per transaction.')
+@with_appcontext
+def backfill_name_keys(batch_size):
+    """Recompute every individual's phonetic name keys, e.g. after adding the columns."""
+    individuals = Individual.__table__
+    update = (
+        individuals.update()
+        .where(individuals.c.id == db.bindparam('row_id'))
+        .values({key: db.bindparam(key) for key in name_keys('', '')})
+    )
+    last_id, updated = None, 0
+    while True:
+        query = db.select(individuals.c.id, individuals.c.given_names, individuals.c.surname)
+        if last_id is not None:
+            query = query.where(individuals.c.id > last_id)
+        rows = db.session.execute(query.order_by(individuals.c.id).limit(batch_size)).all()
+        if not rows:
+            break
+        db.session.execute(update, [{'row_id': row.id, **name_keys(row.given_names, row.surname)} for row in rows])
+        db.session.commit()
+        last_id, updated = rows[-1].id, updated + len(rows)
+    click.echo(f"Updated the name keys of {updated} individuals.")
+
+
+# Duplicate detection CLI command
+@app.cli.command("find-duplicates")
+@click.option('--min-score', type=float, help='Lowest score stored as a candidate (default: DUPLICATE_MIN_SCORE).')
+@click.option('--max-block-size', type=int, help='Larger blocks are skipped (default: DUPLICATE_MAX_BLOCK_SIZE).')
+@with_appcontext
+def find_duplicates_command(min_score, max_block_size):
+    """Score likely duplicate individuals and store ranked candidate pairs for review."""
+    summary = find_duplicates(
+        min_score if min_score is not None else app.config['DUPLICATE_MIN_SCORE'],
+        max_block_size or app.config['DUPLICATE_MAX_BLOCK_SIZE'],
+    )
+    click.echo(
+        f"Compared {summary['pairs_compared']} pairs of {summary['individuals']} individuals "
+        f"in {summary['blocks']} blocks; stored {summary['candidates']} candidates."
+    )
+    if summary['skipped_blocks']:
+        click.echo(f"Skipped {summary['skipped_blocks']} blocks larger than the maximum block size.")
+
+
+# Conflicting fact detection CLI command
+@app.cli.command("find-conflicts")
+@click.option('--user', 'username', required=True, help='Username recorded as creator of the conflicts found.')
+@click.option('--full', is_flag=True, help='Recheck every individual, not only those changed since the last run.')
+@with_appcontext
+def find_conflicts_command(username, full):
+    """Record conflicting facts of individuals changed since the last run."""
+    user = User.query.filter_by(username=username).first()
+    if user is None:
+        raise click.BadParameter(f"No user named {username!r}.", param_hint='--user')
+    summary = find_conflicts(user.id, full=full)
+    scope = "all" if summary['full'] else "changed"
+    click.echo(
+        f"Checked {summary['individuals']} {scope} individuals; recorded {summary['conflicts']} new conflicts "
+        f"and removed {summary['removed']} that no longer apply."
+    )
+
+
+# Individual profile rebuild CLI command
+@app.cli.command("refresh-profiles")
+@click.option('--batch-size', default=1000, show_default=True, help='Profiles rebuilt per transaction.')
+@click.option('--missing', is_flag=True, help='Only build the profiles of individuals that have none.')
+@with_appcontext
+def refresh_profiles_command(batch_size, missing):
+    """Rebuild every individual's profile, e.g. after creating the table or an outside data load."""
+    query = db.select(Individual.id).order_by(Individual.id)
+    if missing:
+        query = query.where(~db.select(IndividualProfile.individual_id).where(
+            IndividualProfile.individual_id == Individual.id).exists())
+    ids = db.session.scalars(query).all()
+    for start in range(0, len(ids), batch_size):
+        refresh_profiles(db.session.connection(), ids[start:start + batch_size])
+        db.session.commit()
+    click.echo(f"Rebuilt {len(ids)} profiles.")
+
+
+# Background job worker CLI command
+@app.cli.command("worker")
+@click.option('--once', is_flag=True, help='Exit when the queue is empty instead of waiting for more jobs.')
+@click.option('--max-jobs', type=int, help='Exit after running this many jobs.')
+@click.option('--poll-interval', type=float, help='Seconds between polls of an empty queue (default: JOB_POLL_INTERVAL).')
+@click.option('--name', help='Worker name recorded on the jobs it runs (default: host:pid).')
+@with_appcontext
+def worker_command(once, max_jobs, poll_interval, name):
+    """Run queued background jobs (imports, exports, duplicate and conflict scans) until stopped."""
+    name = name or f"{socket.gethostname()}:{os.getpid()}"
+    click.echo(f"Worker {name} waiting for jobs...")
+    ran = run_worker(
+        name,
+        poll_interval or app.config['JOB_POLL_INTERVAL'],
+        app.config['JOB_HEARTBEAT_INTERVAL'],
+        app.config['JOB_STALE_AFTER'],
+        once=once,
+        max_jobs=max_jobs,
+        echo=click.echo,
+    )
+    click.echo(f"Ran {ran} jobs.")
+
+
 if __name__ == '__main__':
     debug = os.getenv("FLASK_ENV") == "development"
     app.run(debug=debug, host='0.0.0.0', port=5000)
@@ -5,7 +5,9 @@ Test configuration and fixtures for the genealogical source management system.
 import pytest
 import tempfile
 import os
+from contextlib import contextmanager
 from datetime import datetime
+from sqlalchemy import event
 from app import create_app, db
 from app.models import User, Source, Individual, Fact
 
@@ -20,6 +22,8 @@ def app():
         'TESTING': True,
         'SQLALCHEMY_DATABASE_URI': f'sqlite:///{db_path}',
         'SQLALCHEMY_TRACK_MODIFICATIONS': False,
+        'EAGER_LOADING_STRICT': True,
+        'RESPONSE_CACHE_BACKEND': 'none',
         'WTF_CSRF_ENABLED': False,
         'SECRET_KEY': 'test-secret-key'
     })
@@ -27,6 +31,7 @@ def app():
     with app.app_context():
         db.create_all()
         yield app
+        db.session.remove()
         db.drop_all()
     
     os.close(db_fd)
@@ -115,6 +120,79 @@ def test_fact(app, test_user, test_individual):
         return fact
 
 
+@pytest.fixture
+def count_queries(app):
+    """Return a context manager that collects ``(statement, parameters)`` executed inside it."""
+    @contextmanager
+    def counter():
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append((statement, parameters))
+
+        event.listen(db.engine, 'before_cursor_execute', record)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', record)
+    return counter
+
+
+@pytest.fixture
+def assert_constant_queries(client, count_queries):
+    """Assert that a GET issues the same number of statements before and after more rows are added.
+
+    Usage: ``assert_constant_queries('/api/sources', lambda: add_sources(50))``
+    """
+    def check(url, grow):
+        # Fill per-process caches (lookup tables) so they are not counted
+        assert client.get(url).status_code == 200
+        # Both requests start from an expired session, whatever the test loaded or committed
+        db.session.expire_all()
+        with count_queries() as before:
+            assert client.get(url).status_code == 200
+        grow()
+        db.session.expire_all()
+        with count_queries() as after:
+            assert client.get(url).status_code == 200
+        assert len(after) == len(before), (
+            f'{url} issued {len(before)} statements before growth and {len(after)} after'
+        )
+    return check
+
+
+# Tables small enough that reading them whole is the plan we want (the lookup cache does)
+SCANNABLE_TABLES = ('lookup_versions', 'source_types', 'fact_types')
+
+
+@pytest.fixture
+def assert_no_seq_scan(client, count_queries):
+    """Assert that no SELECT issued by a GET is planned as a full table scan.
+
+    Plans are only meaningful on a seeded dataset large enough for the planner
+    to prefer an index; on a handful of rows a sequential scan is the right call.
+    Scans of ``SCANNABLE_TABLES`` are allowed.
+    """
+    def check(url):
+        with count_queries() as statements:
+            assert client.get(url).status_code == 200
+
+        conn = db.session.connection()
+        sqlite = db.engine.dialect.name == 'sqlite'
+        for statement, parameters in statements:
+            if not statement.lstrip().upper().startswith(('SELECT', 'WITH')):
+                continue
+            prefix = 'EXPLAIN QUERY PLAN ' if sqlite else 'EXPLAIN '
+            plan = [str(row[-1]) for row in conn.exec_driver_sql(prefix + statement, parameters)]
+            scans = [
+                line for line in plan
+                if ('Seq Scan' in line or (line.startswith('SCAN') and 'USING' not in line))
+                and not any(table in line for table in SCANNABLE_TABLES)
+            ]
+            assert not scans, f'{url} runs a full scan:\n{statement}\n' + '\n'.join(plan)
+    return check
+
+
 @pytest.fixture
 def auth_headers(test_user):
     """Create authentication headers for API requests."""
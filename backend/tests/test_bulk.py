@@ -0,0 +1,59 @@
+"""
+Bulk upserts through POST /api/bulk/<kind>.
+"""
+
+import uuid
+
+from app import db
+from app.models import Individual, User
+from app.models.enums import Gender
+
+
+def add_user():
+    user = User(username='loader', email='loader@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.commit()
+    return str(user.id)
+
+
+def test_upsert_only_overwrites_the_fields_an_item_carries(client):
+    user_id = add_user()
+    individual_id = str(uuid.uuid4())
+    created = client.post('/api/bulk/individuals', json=[{
+        'id': individual_id, 'given_names': 'Anna', 'surname': 'Smith', 'gender': 'female',
+        'birth_place': 'York', 'notes': 'From the parish register', 'is_living': False,
+        'created_by_user_id': user_id,
+    }])
+    assert created.get_json()['created'] == 1
+
+    updated = client.post('/api/bulk/individuals', json=[{
+        'id': individual_id, 'given_names': 'Anna', 'surname': 'Smyth', 'notes': None,
+        'created_by_user_id': user_id,
+    }])
+    assert updated.get_json()['updated'] == 1
+
+    db.session.expire_all()
+    individual = db.session.get(Individual, uuid.UUID(individual_id))
+    assert individual.surname == 'Smyth'
+    assert individual.surname_soundex == 'S530'
+    # Omitted fields keep their values instead of falling back to defaults
+    assert individual.gender == Gender.female
+    assert individual.birth_place == 'York'
+    assert individual.is_living is False
+    # An explicit null clears the field
+    assert individual.notes is None
+
+
+def test_new_rows_get_defaults_for_omitted_fields(client):
+    user_id = add_user()
+    response = client.post('/api/bulk/individuals', json=[
+        {'given_names': 'John', 'surname': 'Smith', 'created_by_user_id': user_id},
+        {'given_names': 'Mary', 'surname': 'Smith', 'gender': 'female', 'created_by_user_id': user_id},
+    ])
+    summary = response.get_json()
+    assert summary['created'] == 2 and not summary['errors']
+
+    db.session.expire_all()
+    john = db.session.get(Individual, uuid.UUID(summary['ids'][0]))
+    assert john.gender == Gender.unknown
+    assert john.is_living is True
@@ -0,0 +1,48 @@
+"""
+The response cache: conditional requests and invalidation by every write path.
+"""
+
+import os
+
+import pytest
+
+from app import db
+from app.models import User
+from app.seed import seed
+from app.services.gedcom_import import GedcomImporter
+
+FAMILY_GED = os.path.join(os.path.dirname(__file__), 'fixtures', 'family.ged')
+
+
+@pytest.fixture
+def cached_client(app, client):
+    app.config['RESPONSE_CACHE_BACKEND'] = 'memory'
+    seed()
+    return client
+
+
+def add_user():
+    user = User(username='cacher', email='cacher@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def test_revalidation_is_answered_from_the_cache(cached_client, count_queries):
+    first = cached_client.get('/api/sources')
+    assert first.status_code == 200 and first.headers['ETag']
+
+    with count_queries() as statements:
+        response = cached_client.get('/api/sources', headers={'If-None-Match': first.headers['ETag']})
+    assert response.status_code == 304
+    assert not statements
+
+
+def test_gedcom_import_invalidates_the_source_listing(cached_client):
+    etag = cached_client.get('/api/sources').headers['ETag']
+    assert cached_client.get('/api/sources').get_json() == []
+
+    GedcomImporter.start(FAMILY_GED, add_user()).run()
+    response = cached_client.get('/api/sources', headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.get_json()) == 2
@@ -0,0 +1,89 @@
+"""
+Source collection moves and the closure table behind the tree endpoints.
+"""
+
+import uuid
+
+from sqlalchemy import select
+
+from app import db
+from app.models import Source, SourceCollection, SourceCollectionClosure, SourceCollectionItem, SourceType, User
+from app.seed import seed
+
+
+def add_collections(*names):
+    user = User(username='archivist', email='archivist@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    collections = [SourceCollection(name=name, created_by_user_id=user.id) for name in names]
+    db.session.add_all(collections)
+    db.session.commit()
+    return collections
+
+
+def closure_rows():
+    return set(db.session.execute(select(
+        SourceCollectionClosure.ancestor_id, SourceCollectionClosure.descendant_id, SourceCollectionClosure.depth)))
+
+
+def test_move_relinks_the_subtree(client):
+    parish, county = add_collections('Parish', 'County')
+    response = client.put(f'/api/collections/{parish.id}', json={'parent_collection_id': str(county.id)})
+    assert response.status_code == 200
+    assert (county.id, parish.id, 1) in closure_rows()
+
+    response = client.put(f'/api/collections/{parish.id}', json={'parent_collection_id': None})
+    assert response.status_code == 200
+    assert (county.id, parish.id, 1) not in closure_rows()
+
+
+def test_rename_leaves_the_closure_alone(client, count_queries):
+    parish, county = add_collections('Parish', 'County')
+    client.put(f'/api/collections/{parish.id}', json={'parent_collection_id': str(county.id)})
+    before = closure_rows()
+
+    with count_queries() as statements:
+        response = client.put(f'/api/collections/{parish.id}', json={'name': 'Parish registers'})
+    assert response.status_code == 200
+    assert not [statement for statement, _ in statements if 'source_collection_closure' in statement]
+    assert closure_rows() == before
+
+
+def test_invalid_parent_id_is_rejected(client):
+    parish, = add_collections('Parish')
+    response = client.put(f'/api/collections/{parish.id}', json={'parent_collection_id': 'not-a-uuid'})
+    assert response.status_code == 400
+
+
+def test_create_checks_the_parent_id(client):
+    parish, = add_collections('Parish')
+    body = {'name': 'Registers', 'created_by_user_id': str(parish.created_by_user_id)}
+    response = client.post('/api/collections', json={**body, 'parent_collection_id': 'not-a-uuid'})
+    assert response.status_code == 400
+    response = client.post('/api/collections', json={**body, 'parent_collection_id': str(uuid.uuid4())})
+    assert response.status_code == 400
+    assert db.session.query(SourceCollection).count() == 1
+
+
+def test_collection_sources_leave_out_inactive_sources(client):
+    seed()
+    parish, county = add_collections('Parish', 'County')
+    client.put(f'/api/collections/{parish.id}', json={'parent_collection_id': str(county.id)})
+    source_type_id = db.session.scalar(select(SourceType.id).order_by(SourceType.id))
+    active, retired = (
+        Source(title=title, source_type_id=source_type_id, is_active=title == 'Active',
+               created_by_user_id=parish.created_by_user_id)
+        for title in ('Active', 'Retired')
+    )
+    db.session.add_all([active, retired])
+    db.session.flush()
+    db.session.add_all(
+        SourceCollectionItem(source_id=source.id, collection_id=parish.id, added_by_user_id=parish.created_by_user_id)
+        for source in (active, retired)
+    )
+    db.session.commit()
+
+    for url in (f'/api/collections/{parish.id}/sources', f'/api/collections/{county.id}/sources?recursive=true'):
+        response = client.get(url)
+        assert response.status_code == 200
+        assert [row['id'] for row in response.get_json()] == [str(active.id)]
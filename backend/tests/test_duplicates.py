@@ -0,0 +1,52 @@
+"""
+Duplicate-individual detection.
+"""
+
+from datetime import date
+
+import numpy as np
+
+from app import db
+from app.models import Individual, User
+from app.services.duplicates import IndividualTable, find_duplicates
+
+
+def add_individuals():
+    user = User(username='reviewer', email='reviewer@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    db.session.add_all([
+        Individual(given_names='John', surname='Smith', birth_date_estimated=date(1850, 3, 1),
+                   birth_place='York, England', created_by_user_id=user.id),
+        Individual(given_names='Jon', surname='Smyth', birth_date_estimated=date(1851, 1, 1),
+                   birth_place='York', created_by_user_id=user.id),
+        Individual(given_names='Mary', surname='Schmidt', birth_date_estimated=date(1852, 1, 1),
+                   created_by_user_id=user.id),
+        Individual(given_names='Anna', surname='Jones', created_by_user_id=user.id),
+    ])
+    db.session.commit()
+
+
+def same_values(array):
+    """Which positions of ``array`` hold equal values; codes themselves depend on the order they were assigned."""
+    return array[:, None] == array[None, :]
+
+
+def test_table_is_the_same_whatever_the_batch_size(app):
+    add_individuals()
+    whole, batched = IndividualTable.from_database(batch_size=100), IndividualTable.from_database(batch_size=1)
+    assert whole.ids == batched.ids
+    for name in ('birth', 'birth_year', 'death', 'gender'):
+        np.testing.assert_array_equal(getattr(whole, name), getattr(batched, name))
+    for name in ('surname', 'given', 'initial', 'given_metaphone', 'birth_place', 'place_token'):
+        np.testing.assert_array_equal(same_values(getattr(whole, name)), same_values(getattr(batched, name)))
+    # Primary and alternate surname codes share one coding across batches
+    np.testing.assert_array_equal(same_values(np.concatenate([whole.metaphone, whole.metaphone_alt])),
+                                  same_values(np.concatenate([batched.metaphone, batched.metaphone_alt])))
+
+
+def test_find_duplicates_proposes_similar_individuals(app):
+    add_individuals()
+    summary = find_duplicates(min_score=0.7, max_block_size=100)
+    assert summary['individuals'] == 4
+    assert summary['candidates'] == 1
@@ -0,0 +1,152 @@
+"""
+The in-process family graph behind /api/individuals/<id>/relation-to/<id>.
+"""
+
+import pytest
+
+from app import db
+from app.models import Individual, Relationship, User
+from app.models.enums import RelationshipType
+from app.services.family_graph import (
+    CHILD, PARENT, SIBLING, SPOUSE, FamilyGraph, describe_path, kinship_name, loaded_family_graph,
+    relationship_edges,
+)
+
+
+def build(*relationships):
+    """Build a graph from ``(individual1, individual2, relationship_type)`` triples."""
+    return FamilyGraph(edge for relationship in relationships for edge in relationship_edges(*relationship))
+
+
+@pytest.fixture
+def family():
+    # Two generations below the grandparent, a married couple and an unrelated couple
+    return build(
+        ('grandparent', 'father', 'parent'),
+        ('grandparent', 'aunt', 'parent'),
+        ('father', 'me', 'parent'),
+        ('aunt', 'cousin', 'parent'),
+        ('cousin', 'cousin_child', 'parent'),
+        ('me', 'wife', 'spouse'),
+        ('wife', 'wife_brother', 'sibling'),
+        ('stranger', 'stranger_wife', 'spouse'),
+    )
+
+
+def relation(graph, start, goal, max_depth=10):
+    path = graph.shortest_path(start, goal, max_depth)
+    return path and describe_path(path)
+
+
+def test_siblings_through_a_shared_parent(family):
+    path = family.shortest_path('father', 'aunt', 10)
+    assert path == [('father', None), ('grandparent', PARENT), ('aunt', CHILD)]
+    assert describe_path(path) == ('sibling', 'grandparent')
+
+
+def test_siblings_through_a_sibling_row(family):
+    assert family.shortest_path('wife', 'wife_brother', 10) == [('wife', None), ('wife_brother', SIBLING)]
+    assert relation(family, 'wife', 'wife_brother') == ('sibling', None)
+
+
+def test_cousins(family):
+    assert relation(family, 'me', 'cousin') == ('first cousin', 'grandparent')
+    assert relation(family, 'me', 'cousin_child') == ('first cousin once removed', 'grandparent')
+    assert relation(family, 'cousin_child', 'father') == ('great-aunt/uncle', 'grandparent')
+
+
+def test_in_laws_are_connected_but_not_named(family):
+    path = family.shortest_path('me', 'wife_brother', 10)
+    assert path == [('me', None), ('wife', SPOUSE), ('wife_brother', SIBLING)]
+    assert describe_path(path) == (None, None)
+    assert relation(family, 'me', 'wife') == ('spouse', None)
+
+
+def test_unrelated_and_unknown_individuals(family):
+    assert family.shortest_path('me', 'stranger', 10) is None
+    assert family.shortest_path('me', 'nobody', 10) is None
+    assert family.shortest_path('me', 'me', 10) == [('me', None)]
+
+
+def test_max_depth_bounds_the_search(family):
+    assert family.shortest_path('me', 'cousin', 3) is None
+    assert len(family.shortest_path('me', 'cousin', 4)) == 5
+
+
+@pytest.mark.parametrize('ups, downs, name', [
+    (0, 0, 'self'),
+    (1, 0, 'parent'),
+    (3, 0, 'great-grandparent'),
+    (0, 2, 'grandchild'),
+    (3, 1, 'great-aunt/uncle'),
+    (1, 2, 'niece/nephew'),
+    (2, 2, 'first cousin'),
+    (3, 3, 'second cousin'),
+    (2, 4, 'first cousin twice removed'),
+    (5, 2, 'first cousin 3 times removed'),
+    (12, 12, '11th cousin'),
+])
+def test_kinship_name(ups, downs, name):
+    assert kinship_name(ups, downs) == name
+
+
+def test_patches_add_and_remove_edges(family):
+    family.add_relationship('stranger', 'me', RelationshipType.sibling)
+    assert relation(family, 'stranger', 'me') == ('sibling', None)
+    assert relation(family, 'stranger_wife', 'father')[0] is None
+
+    # An overlay edge and an edge of the CSR arrays can both be removed
+    family.remove_relationship('stranger', 'me', RelationshipType.sibling)
+    assert family.shortest_path('stranger', 'me', 10) is None
+    family.remove_relationship('me', 'wife', RelationshipType.spouse)
+    assert family.shortest_path('me', 'wife_brother', 10) is None
+    assert relation(family, 'me', 'cousin') == ('first cousin', 'grandparent')
+
+
+def test_removing_an_unknown_relationship_is_ignored(family):
+    family.remove_relationship('me', 'nobody', RelationshipType.parent)
+    assert family.shortest_path('me', 'nobody', 10) is None
+
+
+def test_compact_folds_the_overlay_into_the_arrays(family):
+    family.add_relationship('stranger', 'me', RelationshipType.sibling)
+    family.remove_relationship('father', 'me', RelationshipType.parent)
+    edges_before = {
+        (family.ids[node], family.ids[neighbor], kind)
+        for node in range(len(family.ids)) for neighbor, kind in family.edges(node)
+    }
+
+    family._compact()
+    assert not family._overlay_size and not family._added and not family._removed
+    edges_after = {
+        (family.ids[node], family.ids[neighbor], kind)
+        for node in range(len(family.ids)) for neighbor, kind in family.edges(node)
+    }
+    assert edges_after == edges_before
+    assert ('me', 'stranger', SIBLING) in edges_after
+    assert ('me', 'father', PARENT) not in edges_after
+    assert relation(family, 'stranger', 'me') == ('sibling', None)
+
+
+def test_relationship_update_patches_the_loaded_graph(client):
+    user = User(username='kin', email='kin@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    first, second = (Individual(given_names=name, surname='Kin', created_by_user_id=user.id) for name in 'AB')
+    db.session.add_all([first, second])
+    db.session.flush()
+    relationship = Relationship(individual1_id=first.id, individual2_id=second.id,
+                                relationship_type=RelationshipType.sibling, created_by_user_id=user.id)
+    db.session.add(relationship)
+    db.session.commit()
+    url = f'/api/individuals/{first.id}/relation-to/{second.id}'
+
+    # The first request loads the graph; the update then patches it in place
+    assert client.get(url).get_json()['relationship'] == 'sibling'
+    graph = loaded_family_graph()
+    response = client.put(f'/api/relationships/{relationship.id}', json={'relationship_type': 'parent'})
+    assert response.status_code == 200
+    assert loaded_family_graph() is graph
+    body = client.get(url).get_json()
+    assert body['relationship'] == 'child'
+    assert [step['step'] for step in body['path']] == [None, 'child']
@@ -0,0 +1,168 @@
+"""
+GEDCOM parsing helpers, the resumable importer and the streaming export.
+"""
+
+import os
+from datetime import date
+
+import pytest
+from sqlalchemy import func, select, update
+
+from app import db
+from app.models import Citation, Fact, GedcomImport, Individual, Relationship, Source, User
+from app.models.enums import ImportStatus, RelationshipType
+from app.seed import seed
+from app.services.gedcom_import import GedcomImporter
+from app.utils.gedcom import GedcomSyntaxError, format_line, iter_records, parse_date, parse_name
+
+FAMILY_GED = os.path.join(os.path.dirname(__file__), 'fixtures', 'family.ged')
+
+# Rows family.ged imports to; the CHIL of F2 names an individual that is not in the file
+FAMILY_ROWS = {Source: 2, Individual: 4, Fact: 6, Relationship: 5, Citation: 3}
+
+
+# ------------------------------
+# Parsing
+# ------------------------------
+
+def test_iter_records_nests_lines_and_folds_continuations():
+    records = list(iter_records([
+        '0 @I1@ INDI\n',
+        '1 NAME John /Smith/\n',
+        '1 NOTE First line\n',
+        '2 CONT second line, \n',
+        '2 CONC continued\n',
+        '\n',
+        '1 BIRT\n',
+        '2 DATE 1820\n',
+        '0 TRLR\n',
+    ]))
+    assert [(record.xref, record.tag) for record in records] == [('@I1@', 'INDI'), (None, 'TRLR')]
+    individual = records[0]
+    assert individual.value_of('NAME') == 'John /Smith/'
+    assert individual.value_of('NOTE') == 'First line\nsecond line, continued'
+    assert individual.first('BIRT').value_of('DATE') == '1820'
+
+
+def test_iter_records_rejects_unparseable_lines():
+    with pytest.raises(GedcomSyntaxError) as error:
+        list(iter_records(['0 HEAD\n', 'not a gedcom line\n']))
+    assert error.value.line_number == 2
+
+
+@pytest.mark.parametrize('value, names', [
+    ('John Henry /Smith/', ('John Henry', 'Smith')),
+    ('John /Smith/ Jr', ('John Jr', 'Smith')),
+    ('/Smith/', ('', 'Smith')),
+    ('John', ('John', '')),
+    (None, ('', '')),
+])
+def test_parse_name(value, names):
+    assert parse_name(value) == names
+
+
+@pytest.mark.parametrize('value, parsed', [
+    ('12 MAR 1890', date(1890, 3, 12)),
+    ('ABT MAR 1890', date(1890, 3, 1)),
+    ('BET 1850 AND 1860', date(1850, 1, 1)),
+    ('31 FEB 1890', None),
+    ('unknown', None),
+    (None, None),
+])
+def test_parse_date(value, parsed):
+    assert parse_date(value) == parsed
+
+
+def test_format_line_round_trips_long_and_multiline_values():
+    value = 'x' * 30 + '\n' + 'y' * 5
+    lines = format_line(1, 'NOTE', value, max_length=10)
+    assert lines.splitlines()[:2] == ['1 NOTE xxxxxxxxxx', '2 CONC xxxxxxxxxx']
+    record, = iter_records(['0 @N1@ NOTE\n'] + lines.splitlines(keepends=True))
+    assert record.value_of('NOTE') == value
+
+
+# ------------------------------
+# Import
+# ------------------------------
+
+@pytest.fixture
+def user_id(app):
+    seed()
+    user = User(username='importer', email='importer@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def row_counts():
+    return {model: db.session.scalar(select(func.count()).select_from(model)) for model in FAMILY_ROWS}
+
+
+def test_import_converts_every_record(user_id):
+    record = GedcomImporter.start(FAMILY_GED, user_id).run()
+    assert record.status == ImportStatus.completed
+    assert row_counts() == FAMILY_ROWS
+
+    john = db.session.scalar(select(Individual).where(Individual.given_names == 'John'))
+    assert (john.surname, john.birth_date_estimated, john.is_living) == ('Smith', date(1820, 1, 1), False)
+    # The repeated CHIL of F1 gives one parent row per parent and child
+    parent_rows = db.session.scalars(
+        select(Relationship).where(Relationship.relationship_type == RelationshipType.parent)).all()
+    assert len({(row.individual1_id, row.individual2_id) for row in parent_rows}) == len(parent_rows) == 4
+
+
+class Interrupted(Exception):
+    pass
+
+
+@pytest.mark.parametrize('batches', [1, 4, 10])
+def test_interrupted_import_resumes_from_its_last_batch(user_id, batches):
+    calls = []
+
+    def interrupt(phase, done):
+        calls.append(phase)
+        if len(calls) == batches:
+            raise Interrupted(phase)
+
+    importer = GedcomImporter.start(FAMILY_GED, user_id, batch_size=1)
+    with pytest.raises(Interrupted):
+        importer.run(progress=interrupt)
+    import_id = importer.record.id
+    assert db.session.get(GedcomImport, import_id).status == ImportStatus.failed
+
+    record = GedcomImporter.resume(FAMILY_GED, import_id, batch_size=2).run()
+    assert record.status == ImportStatus.completed
+    assert row_counts() == FAMILY_ROWS
+
+
+# ------------------------------
+# Export
+# ------------------------------
+
+def walk(nodes):
+    for node in nodes:
+        yield node
+        yield from walk(node.children)
+
+
+def test_export_pointers_resolve(client, user_id):
+    GedcomImporter.start(FAMILY_GED, user_id).run()
+    # The census is cited by William's birth but inactive, so it is not exported
+    db.session.execute(update(Source).where(Source.title == '1881 census').values(is_active=False))
+    db.session.commit()
+
+    response = client.get('/api/export/gedcom')
+    assert response.status_code == 200
+    records = list(iter_records(response.get_data(as_text=True).splitlines(keepends=True)))
+    defined = {record.xref for record in records if record.xref}
+    pointers = {
+        node.value for node in walk(records)
+        if node.value and node.value.startswith('@') and node.value.endswith('@')
+    }
+
+    assert [record.tag for record in records].count('SOUR') == 1
+    assert [record.tag for record in records].count('INDI') == 4
+    assert pointers and pointers <= defined
+    # Only John's birth still cites a source
+    cited = [node.value for node in walk(records) if node.tag == 'SOUR' and node.value in pointers]
+    assert len(cited) == 1
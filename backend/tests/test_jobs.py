@@ -0,0 +1,70 @@
+"""
+The jobs queue: POST /api/jobs and claiming jobs for workers.
+"""
+
+from sqlalchemy import update
+
+from app import db
+from app.models import Job, User
+from app.models.enums import JobStatus
+from app.services.jobs import claim_job, enqueue
+
+
+def add_user():
+    user = User(username='scheduler', email='scheduler@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.commit()
+    return user.id
+
+
+def test_create_job_queues_it(client):
+    user_id = add_user()
+    response = client.post('/api/jobs', json={'kind': 'refresh_profiles', 'created_by_user_id': str(user_id)})
+    assert response.status_code == 202
+    assert response.get_json()['status'] == 'queued'
+    assert client.get(response.headers['Location']).status_code == 200
+
+
+def test_create_job_rejects_bodies_that_are_not_objects(client):
+    assert client.post('/api/jobs').status_code == 400
+    assert client.post('/api/jobs', data='not json', content_type='application/json').status_code == 400
+    assert client.post('/api/jobs', json=['refresh_profiles']).status_code == 400
+
+
+def test_claim_takes_each_job_once(app):
+    user_id = add_user()
+    first, second = enqueue('refresh_profiles', {}, user_id), enqueue('find_conflicts', {}, user_id)
+    db.session.commit()
+    first_id, second_id = first.id, second.id
+
+    claimed = claim_job('worker-1')
+    assert claimed.id in (first_id, second_id)
+    assert claimed.status == JobStatus.running and claimed.worker == 'worker-1'
+    other = claim_job('worker-2')
+    assert {claimed.id, other.id} == {first_id, second_id}
+    assert claim_job('worker-3') is None
+
+
+def test_claim_skips_a_job_taken_after_it_was_picked(app, monkeypatch):
+    user_id = add_user()
+    taken, waiting = enqueue('refresh_profiles', {}, user_id), enqueue('refresh_profiles', {}, user_id)
+    db.session.commit()
+    taken_id, waiting_id = taken.id, waiting.id
+    picks = []
+
+    # Another worker claims the job between this worker's pick and its update
+    original_scalar = db.session.scalar
+
+    def pick(statement, *args, **kwargs):
+        job_id = original_scalar(statement, *args, **kwargs)
+        if not picks:
+            job_id = taken_id
+            db.session.execute(update(Job).where(Job.id == taken_id).values(status=JobStatus.running, worker='other'))
+        picks.append(job_id)
+        return job_id
+
+    monkeypatch.setattr(db.session, 'scalar', pick)
+    claimed = claim_job('worker-1')
+    assert claimed.id == waiting_id
+    assert picks == [taken_id, waiting_id]
+    assert db.session.get(Job, taken_id).worker == 'other'
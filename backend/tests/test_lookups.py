@@ -0,0 +1,35 @@
+"""
+The per-process cache of the lookup tables.
+"""
+
+from app import db
+from app.models import FactType
+from app.seed import seed
+from app.utils.lookups import get_lookup_cache, lookup
+
+
+def test_cache_expires_when_a_lookup_write_commits(app):
+    seed()
+    cache = get_lookup_cache()
+    cache.refresh()
+    assert lookup(FactType).id_of('land_grant') is None
+
+    db.session.add(FactType(key='land_grant', label='Land grant'))
+    db.session.flush()
+    # Reloading before the commit would cache rows another worker cannot see yet
+    assert cache.checked_at is not None
+    db.session.commit()
+    assert cache.checked_at is None
+    assert lookup(FactType).id_of('land_grant') is not None
+
+
+def test_rolled_back_write_leaves_the_cache_alone(app):
+    seed()
+    cache = get_lookup_cache()
+    cache.refresh()
+
+    db.session.add(FactType(key='land_grant', label='Land grant'))
+    db.session.flush()
+    db.session.rollback()
+    assert cache.checked_at is not None
+    assert lookup(FactType).id_of('land_grant') is None
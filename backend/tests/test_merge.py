@@ -0,0 +1,120 @@
+"""
+Merging duplicate individuals with POST /api/individuals/<keep>/merge/<drop>.
+"""
+
+import uuid
+
+import pytest
+from sqlalchemy import or_, select
+
+from app import db
+from app.models import Citation, Individual, Relationship, RelationshipQualifier, Source, SourceType, User
+from app.models.enums import Qualifier, RelationshipType
+from app.seed import seed
+from app.services.merge import MergeError, merge_individuals
+
+
+class Family:
+    """A kept and a dropped individual with a few relatives, and helpers to link them."""
+
+    def __init__(self):
+        seed()
+        self.user = User(username='merger', email='merger@example.com', password_hash='!')
+        db.session.add(self.user)
+        db.session.flush()
+        self.source = Source(title='Parish register', created_by_user_id=self.user.id,
+                             source_type_id=db.session.scalar(select(SourceType.id).order_by(SourceType.id)))
+        self.people = {
+            name: Individual(given_names=name, surname='Merge', created_by_user_id=self.user.id)
+            for name in ('keep', 'drop', 'parent', 'child')
+        }
+        db.session.add(self.source)
+        db.session.add_all(self.people.values())
+        db.session.flush()
+
+    def id(self, name):
+        return self.people[name].id
+
+    def relate(self, first, second, relationship_type, citations=0):
+        relationship = Relationship(individual1_id=self.id(first), individual2_id=self.id(second),
+                                    relationship_type=relationship_type, created_by_user_id=self.user.id)
+        db.session.add(relationship)
+        db.session.flush()
+        db.session.add_all(
+            Citation(cited_object_type='relationship', cited_object_id=relationship.id, source_id=self.source.id,
+                     created_by_user_id=self.user.id)
+            for _ in range(citations)
+        )
+        db.session.flush()
+        return relationship.id
+
+    def relationships_of(self, name):
+        return db.session.scalars(select(Relationship).where(or_(
+            Relationship.individual1_id == self.id(name), Relationship.individual2_id == self.id(name)))).all()
+
+
+def citations_of(relationship_id):
+    return db.session.scalars(select(Citation.id).where(
+        Citation.cited_object_type == 'relationship', Citation.cited_object_id == relationship_id)).all()
+
+
+@pytest.fixture
+def family(app):
+    return Family()
+
+
+def test_shared_parent_is_folded_with_its_citations(client, family):
+    survivor = family.relate('parent', 'keep', RelationshipType.parent, citations=1)
+    duplicate = family.relate('parent', 'drop', RelationshipType.parent, citations=2)
+    db.session.add(RelationshipQualifier(relationship_id=duplicate, qualifier=Qualifier.biological,
+                                         created_by_user_id=family.user.id))
+    db.session.commit()
+
+    response = client.post(f"/api/individuals/{family.id('keep')}/merge/{family.id('drop')}")
+    assert response.status_code == 200
+    assert response.get_json()['moved']['citations_repointed'] == 2
+
+    db.session.expire_all()
+    assert [r.id for r in family.relationships_of('parent')] == [survivor]
+    assert db.session.get(Relationship, duplicate) is None
+    assert len(citations_of(survivor)) == 3
+    assert db.session.scalar(select(RelationshipQualifier.relationship_id)) == survivor
+    assert db.session.get(Individual, family.id('drop')) is None
+
+
+def test_relationship_between_the_two_is_removed(family):
+    between = family.relate('keep', 'drop', RelationshipType.sibling, citations=1)
+    other = family.relate('drop', 'child', RelationshipType.parent)
+
+    summary = merge_individuals(family.id('keep'), family.id('drop'))
+    assert summary['relationships_removed'] == 1
+    assert summary['citations_removed'] == 1
+    assert db.session.get(Relationship, between) is None
+    assert not citations_of(between)
+    moved = db.session.get(Relationship, other)
+    assert (moved.individual1_id, moved.individual2_id) == (family.id('keep'), family.id('child'))
+
+
+def test_child_row_folds_into_the_matching_parent_row(family):
+    family.relate('keep', 'child', RelationshipType.parent)
+    family.relate('child', 'drop', RelationshipType.child)
+
+    merge_individuals(family.id('keep'), family.id('drop'))
+    rows = family.relationships_of('child')
+    assert [(r.individual1_id, r.individual2_id, r.relationship_type) for r in rows] == [
+        (family.id('keep'), family.id('child'), RelationshipType.parent)]
+
+
+def test_merging_into_itself_is_rejected(client, family):
+    with pytest.raises(MergeError):
+        merge_individuals(family.id('keep'), family.id('keep'))
+    response = client.post(f"/api/individuals/{family.id('keep')}/merge/{family.id('keep')}")
+    assert response.status_code == 400
+
+
+def test_missing_individual_is_not_found(client, family):
+    missing = uuid.uuid4()
+    assert merge_individuals(family.id('keep'), missing) is None
+    assert client.post(f"/api/individuals/{family.id('keep')}/merge/{missing}").status_code == 404
+    assert client.post(f"/api/individuals/{missing}/merge/{family.id('drop')}").status_code == 404
+    assert db.session.get(Individual, family.id('drop')) is not None
@@ -0,0 +1,51 @@
+"""
+Keyset pagination of the collection endpoints.
+"""
+
+from sqlalchemy import func, update
+
+from app import db
+from app.models import Individual, User
+
+
+def add_individuals(count):
+    user = User(username='pager', email='pager@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    individuals = [
+        Individual(given_names=f'Given {n}', surname='Pager', created_by_user_id=user.id) for n in range(count)
+    ]
+    db.session.add_all(individuals)
+    db.session.flush()
+    # Tie every row on created_at, written by the database as server_default does
+    db.session.execute(update(Individual).values(created_at=func.now()))
+    db.session.commit()
+    return {str(individual.id) for individual in individuals}
+
+
+def walk(client, url):
+    """Follow ``X-Next-Cursor`` from ``url`` and return the ids of every page, in order."""
+    ids, pages = [], 0
+    while url:
+        response = client.get(url)
+        assert response.status_code == 200
+        ids.extend(row['id'] for row in response.get_json())
+        pages += 1
+        cursor = response.headers.get('X-Next-Cursor')
+        url = f'/api/individuals?limit=2&after={cursor}' if cursor else None
+    return ids, pages
+
+
+def test_pages_cover_rows_created_in_the_same_second(client):
+    expected = add_individuals(5)
+    assert db.session.query(Individual.created_at).distinct().count() == 1
+
+    ids, pages = walk(client, '/api/individuals?limit=2')
+    assert pages == 3
+    assert len(ids) == len(set(ids)) == 5
+    assert set(ids) == expected
+
+
+def test_invalid_cursor_is_rejected(client):
+    response = client.get('/api/individuals?after=not-a-cursor')
+    assert response.status_code == 400
@@ -0,0 +1,45 @@
+"""
+Ancestor and descendant endpoints.
+"""
+
+from app import db
+from app.models import Individual, Relationship, User
+from app.models.enums import RelationshipType
+
+
+def add_family(*names):
+    user = User(username='genealogist', email='genealogist@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    people = {name: Individual(given_names=name, surname='Collapse', created_by_user_id=user.id) for name in names}
+    db.session.add_all(people.values())
+    db.session.flush()
+    return user, people
+
+
+def add_parents(user, people, child, *parents):
+    db.session.add_all(
+        Relationship(individual1_id=people[parent].id, individual2_id=people[child].id,
+                     relationship_type=RelationshipType.parent, created_by_user_id=user.id)
+        for parent in parents
+    )
+
+
+def test_pedigree_collapse_lists_each_edge_once(client):
+    # The ancestor is the father's father and the mother's grandfather, so the
+    # line above the ancestor is reached at two different generations
+    user, people = add_family('root', 'father', 'mother', 'parent', 'ancestor', 'founder')
+    add_parents(user, people, 'root', 'father', 'mother')
+    add_parents(user, people, 'father', 'ancestor')
+    add_parents(user, people, 'mother', 'parent')
+    add_parents(user, people, 'parent', 'ancestor')
+    add_parents(user, people, 'ancestor', 'founder')
+    db.session.commit()
+
+    response = client.get(f"/api/individuals/{people['root'].id}/ancestors?generations=4")
+    assert response.status_code == 200
+    body = response.get_json()
+    edges = [(edge['parent_id'], edge['child_id']) for edge in body['edges']]
+    assert len(edges) == len(set(edges)) == 6
+    assert (str(people['founder'].id), str(people['ancestor'].id)) in edges
+    assert len(body['individuals']) == 5
@@ -0,0 +1,74 @@
+"""
+Precomputed individual profiles and the writes that rebuild them.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import delete, select
+
+from app import db
+from app.models import Fact, FactType, Individual, IndividualProfile, Relationship, User
+from app.models.enums import RelationshipType
+from app.seed import seed
+
+
+@pytest.fixture
+def people(app):
+    seed()
+    user = User(username='profiler', email='profiler@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    child, parent = (
+        Individual(given_names=name, surname='Profile', created_by_user_id=user.id) for name in ('Child', 'Parent')
+    )
+    db.session.add_all([child, parent])
+    db.session.commit()
+    return user, child, parent
+
+
+def profile_of(client, individual):
+    response = client.get(f'/api/individuals/{individual.id}/profile')
+    assert response.status_code == 200
+    return response.get_json()
+
+
+def test_fact_write_refreshes_the_profile(client, people):
+    user, child, _ = people
+    assert profile_of(client, child)['fact_count'] == 0
+
+    birth_type_id = db.session.scalar(select(FactType.id).where(FactType.key == 'birth'))
+    fact = Fact(individual_id=child.id, fact_type_id=birth_type_id, fact_date=date(1850, 2, 14), fact_place='York',
+                is_primary=True, created_by_user_id=user.id)
+    db.session.add(fact)
+    db.session.commit()
+    profile = profile_of(client, child)
+    assert profile['fact_count'] == 1
+    assert (profile['birth_date'], profile['birth_place']) == ('1850-02-14', 'York')
+
+    fact.fact_place = 'Leeds'
+    db.session.commit()
+    assert profile_of(client, child)['birth_place'] == 'Leeds'
+
+
+def test_relationship_write_refreshes_both_profiles(client, people):
+    user, child, parent = people
+    relationship = Relationship(individual1_id=parent.id, individual2_id=child.id,
+                                relationship_type=RelationshipType.parent, created_by_user_id=user.id)
+    db.session.add(relationship)
+    db.session.commit()
+    assert profile_of(client, child)['parents'] == [{'id': str(parent.id), 'name': 'Parent Profile'}]
+
+    response = client.put(f'/api/relationships/{relationship.id}', json={'relationship_type': 'spouse'})
+    assert response.status_code == 200
+    assert profile_of(client, child)['parents'] == []
+    assert profile_of(client, parent)['spouses'][0]['id'] == str(child.id)
+
+
+def test_missing_profile_is_not_built_on_read(client, people):
+    _, child, _ = people
+    db.session.execute(delete(IndividualProfile).where(IndividualProfile.individual_id == child.id))
+    db.session.commit()
+
+    assert client.get(f'/api/individuals/{child.id}/profile').status_code == 404
+    assert db.session.get(IndividualProfile, child.id) is None
@@ -0,0 +1,147 @@
+"""
+Statement counts of the read endpoints as the rows they return grow.
+
+Each endpoint is requested once with a single row to return and once with
+many more; it must issue the same number of statements both times, so no
+serializer falls back to one lazy SELECT per row.
+"""
+
+from datetime import date
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from app.models import (
+    Citation, ExternalLink, Fact, FactType, Individual, Relationship, RelationshipQualifier, Source,
+    SourceCollection, SourceCollectionItem, SourceReliabilityHistory, SourceType, User,
+)
+from app.models.enums import ExternalPlatform, Qualifier, RelationshipType, ReliabilityStatus
+from app.seed import seed
+
+GROWTH = 20
+
+
+class World:
+    """One row of everything, plus helpers adding more rows that the endpoints return."""
+
+    def __init__(self):
+        seed()
+        self.user = User(username='counter', email='counter@example.com', password_hash='!')
+        db.session.add(self.user)
+        db.session.flush()
+        self.fact_type_id = db.session.scalar(select(FactType.id).order_by(FactType.id))
+        self.source_type_id = db.session.scalar(select(SourceType.id).order_by(SourceType.id))
+
+        self.individual = self.add_individuals(1)[0]
+        self.relative = self.add_individuals(1)[0]
+        self.source = self.add_sources(1)[0]
+        self.fact = self.add_facts(1)[0]
+        self.relationship = self.add_relationships(1)[0]
+        self.collection = SourceCollection(name='Parish registers', created_by_user_id=self.user.id)
+        db.session.add(self.collection)
+        db.session.flush()
+        self.add_collection_items(1)
+        self.add_citations(1, 'fact', self.fact.id)
+        self.add_citations(1, 'relationship', self.relationship.id)
+        self.add_links(1)
+        self.add_qualifiers(1)
+        self.add_history(1)
+        db.session.commit()
+        self.ids = {
+            'individual': self.individual.id, 'source': self.source.id, 'fact': self.fact.id,
+            'relationship': self.relationship.id, 'collection': self.collection.id,
+        }
+
+    def _add(self, rows):
+        db.session.add_all(rows)
+        db.session.commit()
+        return rows
+
+    def add_individuals(self, count):
+        return self._add([
+            Individual(given_names=f'Given {n}', surname='Counter', created_by_user_id=self.user.id)
+            for n in range(count)
+        ])
+
+    def add_sources(self, count):
+        return self._add([
+            Source(title=f'Register {n}', source_type_id=self.source_type_id, created_by_user_id=self.user.id)
+            for n in range(count)
+        ])
+
+    def add_facts(self, count):
+        return self._add([
+            Fact(individual_id=self.individual.id, fact_type_id=self.fact_type_id, fact_date=date(1850, 1, 1),
+                 created_by_user_id=self.user.id)
+            for _ in range(count)
+        ])
+
+    def add_relationships(self, count):
+        return self._add([
+            Relationship(individual1_id=self.individual.id, individual2_id=self.relative.id,
+                         relationship_type=RelationshipType.parent, created_by_user_id=self.user.id)
+            for _ in range(count)
+        ])
+
+    def add_citations(self, count, object_type='fact', object_id=None):
+        return self._add([
+            Citation(cited_object_type=object_type, cited_object_id=object_id or self.fact.id,
+                     source_id=self.source.id, created_by_user_id=self.user.id)
+            for _ in range(count)
+        ])
+
+    def add_links(self, count):
+        return self._add([
+            ExternalLink(individual_id=self.individual.id, platform=ExternalPlatform.familysearch,
+                         external_id=f'FS-{n}', created_by_user_id=self.user.id)
+            for n in range(count)
+        ])
+
+    def add_qualifiers(self, count):
+        return self._add([
+            RelationshipQualifier(relationship_id=self.relationship.id, qualifier=Qualifier.biological,
+                                  created_by_user_id=self.user.id)
+            for _ in range(count)
+        ])
+
+    def add_history(self, count):
+        return self._add([
+            SourceReliabilityHistory(source_id=self.source.id, reliability_status=ReliabilityStatus.reliable,
+                                     changed_by_user_id=self.user.id)
+            for _ in range(count)
+        ])
+
+    def add_collection_items(self, count):
+        return self._add([
+            SourceCollectionItem(source_id=source.id, collection_id=self.collection.id,
+                                 added_by_user_id=self.user.id)
+            for source in self.add_sources(count)
+        ])
+
+
+@pytest.fixture
+def world(app):
+    return World()
+
+
+@pytest.mark.parametrize('url, grow', [
+    ('/api/individuals', lambda world: world.add_individuals(GROWTH)),
+    ('/api/individuals?fields=given_names,surname', lambda world: world.add_individuals(GROWTH)),
+    ('/api/individuals/{individual}/facts', lambda world: world.add_facts(GROWTH)),
+    ('/api/individuals/{individual}/links', lambda world: world.add_links(GROWTH)),
+    ('/api/facts/{fact}/sources', lambda world: world.add_citations(GROWTH)),
+    ('/api/relationships', lambda world: world.add_relationships(GROWTH)),
+    ('/api/relationships/{relationship}/sources',
+     lambda world: world.add_citations(GROWTH, 'relationship', world.relationship.id)),
+    ('/api/relationships/{relationship}/qualifiers', lambda world: world.add_qualifiers(GROWTH)),
+    ('/api/sources', lambda world: world.add_sources(GROWTH)),
+    ('/api/sources/{source}/citations', lambda world: world.add_citations(GROWTH)),
+    ('/api/sources/{source}/citations?expand=object', lambda world: (
+        world.add_citations(GROWTH), world.add_citations(GROWTH, 'relationship', world.relationship.id))),
+    ('/api/sources/{source}/reliability-history', lambda world: world.add_history(GROWTH)),
+    ('/api/collections/{collection}/sources', lambda world: world.add_collection_items(GROWTH)),
+    ('/api/collections/{collection}/items', lambda world: world.add_collection_items(GROWTH)),
+])
+def test_statement_count_does_not_grow_with_rows(world, assert_constant_queries, url, grow):
+    assert_constant_queries(url.format(**world.ids), lambda: grow(world))
@@ -0,0 +1,106 @@
+"""
+Query plans of the hot read endpoints on a seeded dataset.
+
+The tables are filled with enough rows, and ANALYZEd, for the planner to
+prefer an index over a full scan wherever one applies, so a missing or
+unusable index shows up as a failing plan rather than as latency in
+production.
+"""
+
+import uuid
+from datetime import date, timedelta
+
+import pytest
+from sqlalchemy import insert, select, text
+
+from app import db
+from app.models import Citation, ExternalLink, Fact, FactType, Individual, Relationship, Source, SourceType, User
+from app.models.enums import ConfidenceLevel, ExternalPlatform, Gender, RelationshipType
+from app.seed import seed
+
+INDIVIDUALS = 3000
+SOURCES = 300
+FACTS_PER_INDIVIDUAL = 2
+CITATIONS_PER_FACT = 1
+ROWS_PER_STATEMENT = 500
+
+
+def _insert(model, rows):
+    for start in range(0, len(rows), ROWS_PER_STATEMENT):
+        db.session.execute(insert(model), rows[start:start + ROWS_PER_STATEMENT])
+
+
+def seed_dataset():
+    """Load individuals with facts, links and parents, plus sources cited by the facts; return sample ids."""
+    seed()
+    user = User(username='planner', email='planner@example.com', password_hash='!')
+    db.session.add(user)
+    db.session.flush()
+    fact_type_id = db.session.scalar(select(FactType.id).order_by(FactType.id))
+    source_type_id = db.session.scalar(select(SourceType.id).order_by(SourceType.id))
+
+    sources = [
+        {'id': uuid.uuid4(), 'title': f'Register {n}', 'source_type_id': source_type_id,
+         'is_active': True, 'created_by_user_id': user.id}
+        for n in range(SOURCES)
+    ]
+    individuals = [
+        {'id': uuid.uuid4(), 'given_names': f'Given {n}', 'surname': f'Surname {n % 200}',
+         'gender': Gender.unknown, 'created_by_user_id': user.id}
+        for n in range(INDIVIDUALS)
+    ]
+    relationships = [
+        {'id': uuid.uuid4(), 'individual1_id': individuals[n // 2]['id'], 'individual2_id': individuals[n]['id'],
+         'relationship_type': RelationshipType.parent, 'confidence_level': ConfidenceLevel.high,
+         'created_by_user_id': user.id}
+        for n in range(1, INDIVIDUALS)
+    ]
+    facts = [
+        {'id': uuid.uuid4(), 'individual_id': person['id'], 'fact_type_id': fact_type_id,
+         'fact_date': date(1800, 1, 1) + timedelta(days=n), 'created_by_user_id': user.id}
+        for n, person in enumerate(individuals)
+        for _ in range(FACTS_PER_INDIVIDUAL)
+    ]
+    citations = [
+        {'id': uuid.uuid4(), 'cited_object_type': 'fact', 'cited_object_id': fact['id'],
+         'source_id': sources[n % SOURCES]['id'], 'created_by_user_id': user.id}
+        for n, fact in enumerate(facts)
+        for _ in range(CITATIONS_PER_FACT)
+    ]
+    links = [
+        {'id': uuid.uuid4(), 'individual_id': person['id'], 'platform': ExternalPlatform.familysearch,
+         'external_id': f'FS-{n}', 'created_by_user_id': user.id}
+        for n, person in enumerate(individuals)
+    ]
+    for model, rows in ((Source, sources), (Individual, individuals), (Relationship, relationships),
+                        (Fact, facts), (Citation, citations), (ExternalLink, links)):
+        _insert(model, rows)
+    db.session.commit()
+    db.session.execute(text('ANALYZE'))
+    db.session.commit()
+    return {'individual': individuals[INDIVIDUALS // 2]['id'], 'source': sources[SOURCES // 2]['id']}
+
+
+@pytest.fixture
+def dataset(app):
+    return seed_dataset()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/individuals?limit=50',
+    '/api/relationships?limit=50',
+    '/api/sources?limit=50',
+])
+def test_collections_use_keyset_index(client, dataset, assert_no_seq_scan, url):
+    assert_no_seq_scan(url)
+    cursor = client.get(url).headers['X-Next-Cursor']
+    assert_no_seq_scan(f'{url}&after={cursor}')
+
+
+@pytest.mark.parametrize('url', [
+    '/api/sources/{source}/citations?limit=50',
+    '/api/individuals/{individual}/facts',
+    '/api/individuals/{individual}/links',
+])
+def test_child_collections_use_foreign_key_index(dataset, assert_no_seq_scan, url):
+    assert_no_seq_scan(url.format(**dataset))